@@ -1,25 +1,31 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy import or_
 from app.db.session import get_db
 from app.db.models.user import User
 from app.schemas.user import UserCreate, UserLogin, UserResponse, TokenResponse, RefreshTokenRequest
-from app.core.auth import hash_password, verify_password, create_access_token, create_refresh_token, verify_refresh_token
-from app.services.seed_service import SeedService
+from app.core.auth import password_hasher, create_access_token, create_refresh_token, verify_refresh_token
+from app.core.password_hashing import PasswordHasherBusy
+from app.services.seed_tasks import SeedTaskService
 from datetime import timedelta
 import logging
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
-@router.post("/register", response_model=UserResponse)
-def register_user(user: UserCreate, db: Session = Depends(get_db)):
-    """
-    Register a new user with username, email, and password.
-    Password must be at least 7 characters and contain both letters and numbers.
-    """
-    logger.info(f"Registration attempt for username: {user.username}, email: {user.email}")
-    
+
+def password_hashing_busy() -> HTTPException:
+    """503 returned when the password hashing queue is full"""
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many sign-in requests, please try again shortly",
+        headers={"Retry-After": "1"},
+    )
+
+
+def _ensure_available(db: Session, user: UserCreate):
+    """Reject taken usernames and emails, then end the read transaction"""
     # Check if username already exists
     existing_user = db.query(User).filter(User.username == user.username).first()
     if existing_user:
@@ -37,64 +43,111 @@ def register_user(user: UserCreate, db: Session = Depends(get_db)):
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already exists",
         )
-    
-    hashed_password = hash_password(user.password)
+    # Don't hold a pooled connection while the password is being hashed
+    db.rollback()
+
+
+def _create_user(db: Session, user: UserCreate, hashed_password: str) -> User:
     new_user = User(
         username=user.username,
         email=user.email,
         hashed_password=hashed_password
     )
     db.add(new_user)
+    db.flush()
+    # Default recipes and spirit types are added in the background; the task
+    # is committed with the user so it survives a restart
+    SeedTaskService.create_task(db, new_user.id)
     db.commit()
     db.refresh(new_user)
     
     logger.info(f"User registered successfully: {user.username} ({user.email})")
-    
-    # Seed the new user account with default recipes and spirit types
-    try:
-        seed_result = SeedService.seed_user_data(db, new_user.id)
-        logger.info(f"Seeded user {new_user.id} with {seed_result['spirit_types']} spirit types and {seed_result['recipes']} recipes")
-    except Exception as e:
-        logger.error(f"Failed to seed data for user {new_user.id}: {e}")
-        # Don't fail registration if seeding fails, just log the error
-    
+    SeedTaskService.submit(new_user.id)
     return new_user
 
+
+def _find_credentials(db: Session, username_or_email: str):
+    """Return (user ID, username, password hash) for a login name, or None"""
+    # Query user by username OR email
+    db_user = db.query(User).filter(
+        or_(
+            User.username == username_or_email,
+            User.email == username_or_email
+        )
+    ).first()
+    credentials = (db_user.id, db_user.username, db_user.hashed_password) if db_user else None
+    # Don't hold a pooled connection while the password is being verified
+    db.rollback()
+    return credentials
+
+
+def _store_rehash(db: Session, user_id: int, hashed_password: str):
+    db_user = db.query(User).filter(User.id == user_id).first()
+    if db_user:
+        db_user.hashed_password = hashed_password
+        db.commit()
+
+
+@router.post("/register", response_model=UserResponse)
+async def register_user(user: UserCreate, db: Session = Depends(get_db)):
+    """
+    Register a new user with username, email, and password.
+    Password must be at least 7 characters and contain both letters and numbers.
+    The password is hashed in the password hashing pool; returns 503 when it is saturated.
+    Database work runs in the threadpool so the event loop never waits on it.
+    """
+    logger.info(f"Registration attempt for username: {user.username}, email: {user.email}")
+
+    await run_in_threadpool(_ensure_available, db, user)
+
+    try:
+        hashed_password = await password_hasher.hash(user.password)
+    except PasswordHasherBusy:
+        logger.warning(f"Registration shed for username '{user.username}': password hashing queue is full")
+        raise password_hashing_busy()
+
+    return await run_in_threadpool(_create_user, db, user, hashed_password)
+
 @router.post("/login", response_model=TokenResponse)
-def login_user(user: UserLogin, db: Session = Depends(get_db)):
+async def login_user(user: UserLogin, db: Session = Depends(get_db)):
     """
     Authenticate a user with username or email and password.
     Returns access and refresh tokens.
+    Hashes created with outdated bcrypt parameters are replaced on successful login.
     """
     logger.info(f"Login attempt for: {user.username_or_email}")
     
-    # Query user by username OR email
-    db_user = db.query(User).filter(
-        or_(
-            User.username == user.username_or_email,
-            User.email == user.username_or_email
-        )
-    ).first()
-    
-    if not db_user:
+    credentials = await run_in_threadpool(_find_credentials, db, user.username_or_email)
+    if not credentials:
         logger.warning(f"Login failed: User not found for '{user.username_or_email}'")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid credentials",
         )
+    user_id, username, hashed_password = credentials
     
-    if not verify_password(user.password, db_user.hashed_password):
-        logger.warning(f"Login failed: Invalid password for user '{db_user.username}'")
+    try:
+        valid, new_hash = await password_hasher.verify_and_update(user.password, hashed_password)
+    except PasswordHasherBusy:
+        logger.warning(f"Login shed for user '{username}': password hashing queue is full")
+        raise password_hashing_busy()
+
+    if not valid:
+        logger.warning(f"Login failed: Invalid password for user '{username}'")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid credentials",
         )
+
+    if new_hash:
+        await run_in_threadpool(_store_rehash, db, user_id, new_hash)
+        logger.info(f"Rehashed password for user '{username}' with current bcrypt settings")
     
     # Create both access and refresh tokens
-    access_token = create_access_token(data={"sub": db_user.username})
-    refresh_token = create_refresh_token(data={"sub": db_user.username})
+    access_token = create_access_token(data={"sub": username})
+    refresh_token = create_refresh_token(data={"sub": username})
     
-    logger.info(f"Login successful for user: {db_user.username}")
+    logger.info(f"Login successful for user: {username}")
     return {
         "access_token": access_token,
         "refresh_token": refresh_token,
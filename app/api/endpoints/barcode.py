@@ -1,44 +1,38 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import List, Union
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.db.session import get_db
+from app.db.session import get_async_db
 from app.schemas.barcode import (
     BarcodeRegistryCreate,
     BarcodeRegistryResponse,
     BarcodeLookupResponse,
+    BarcodeMatchResponse,
 )
-from app.services.barcode import BarcodeService
-from app.core.dependencies import get_current_user
-from app.db.models.user import User
+from app.services.barcode import AsyncBarcodeService
+from app.core.dependencies import get_async_read_db, get_current_user
+from app.services.user_cache import CurrentUser
 
 router = APIRouter()
 
 
 @router.get("/lookup/{barcode}", response_model=BarcodeLookupResponse)
-def lookup_barcode(
+async def lookup_barcode(
     barcode: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: Union[AsyncSession, Session] = Depends(get_async_read_db),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
     """
     Look up a barcode in the global registry.
     Returns bottle information if the barcode has been registered.
     """
-    result = BarcodeService.lookup_barcode(db, barcode)
+    result = await AsyncBarcodeService.lookup_barcode(db, barcode)
     
     if result:
         return BarcodeLookupResponse(
             found=True,
-            data=BarcodeRegistryResponse(
-                id=result.id,
-                barcode=result.barcode,
-                name=result.name,
-                brand=result.brand,
-                flavor_profile=result.flavor_profile,
-                capacity_ml=result.capacity_ml,
-                spirit_type_name=result.spirit_type_name,
-                created_at=result.created_at,
-            ),
+            data=result,
             message="Barcode found in registry"
         )
     else:
@@ -49,32 +43,39 @@ def lookup_barcode(
         )
 
 
+@router.get("/fuzzy", response_model=List[BarcodeMatchResponse])
+async def fuzzy_lookup_registry(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(10, ge=1, le=50),
+    threshold: float = Query(0.3, ge=0, le=1),
+    db: Union[AsyncSession, Session] = Depends(get_async_read_db),
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    """
+    Typo-tolerant lookup of registry entries by bottle name using the trigram index.
+    """
+    try:
+        return await AsyncBarcodeService.match_names(db, q, limit=limit, threshold=threshold)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error looking up barcodes: {str(e)}")
+
+
 @router.post("/register", response_model=BarcodeRegistryResponse)
-def register_barcode(
+async def register_barcode(
     barcode_data: BarcodeRegistryCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: Union[AsyncSession, Session] = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
     """
     Register a barcode with bottle information.
     This makes the bottle data available to all users who scan this barcode.
     """
     try:
-        result = BarcodeService.register_barcode(
+        return await AsyncBarcodeService.register_barcode(
             db=db,
             barcode_data=barcode_data,
             user_id=current_user.id
         )
-        return BarcodeRegistryResponse(
-            id=result.id,
-            barcode=result.barcode,
-            name=result.name,
-            brand=result.brand,
-            flavor_profile=result.flavor_profile,
-            capacity_ml=result.capacity_ml,
-            spirit_type_name=result.spirit_type_name,
-            created_at=result.created_at,
-        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error registering barcode: {str(e)}")
 
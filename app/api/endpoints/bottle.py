@@ -1,71 +1,172 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import List, Optional, Union
 
-from app.db.session import get_db
-from app.schemas.bottle import BottleCreate, BottleUpdate, BottleResponse
+from app.db.session import get_async_db, run_db
+from app.schemas.bottle import (
+    BottleCreate,
+    BottleUpdate,
+    BottleResponse,
+    BottleMatchResponse,
+    BottleBulkRequest,
+    BottleBulkResponse,
+)
 from app.schemas.bottle_import import BottleImportRequest, BottleImportResponse
-from app.services.bottle import BottleService
+from app.services.bottle import AsyncBottleService, BottleService
 from app.services.ollama import ollama_service
-from app.core.dependencies import get_current_user
-from app.db.models.user import User
+from app.core.dependencies import get_async_read_db, get_current_user
+from app.core.cache import cache_list_response, cached_response, serialize_list
+from app.core.fast_json import encode_bottle_rows
+from app.core.settings import settings
+from app.core.etag import collection_etag, is_not_modified
+from app.services.response_cache import ResponseCacheService
+from app.services.seed_tasks import SeedTaskService
+from app.services.spirit_type import AsyncSpiritTypeService
+from app.services.versions import BOTTLES
+from app.services.user_cache import CurrentUser
 
 router = APIRouter()
 
 @router.post("", response_model=BottleResponse)
-def create_bottle(
+async def create_bottle(
     bottle: BottleCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: Union[AsyncSession, Session] = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
     try:
         # Attach the user's ID to the bottle before creation
         # bottle_data = bottle.dict()
-        return BottleService.create_bottle(db=db, bottle_in=bottle, user_id=current_user.id)
+        return await AsyncBottleService.create_bottle(db=db, bottle_in=bottle, user_id=current_user.id)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error creating bottle: {str(e)}")
 
+# Largest number of operations accepted by POST /bottles/bulk
+MAX_BULK_ITEMS = 1000
+
+@router.post("/bulk", response_model=BottleBulkResponse)
+async def bulk_write_bottles(
+    bulk: BottleBulkRequest,
+    db: Union[AsyncSession, Session] = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    """
+    Create, update and delete many bottles in one request and one transaction.
+    Each item gets its own result; invalid items are skipped without failing the batch.
+    """
+    total = len(bulk.create) + len(bulk.update) + len(bulk.delete)
+    if total > MAX_BULK_ITEMS:
+        raise HTTPException(status_code=400, detail=f"Bulk requests are limited to {MAX_BULK_ITEMS} items")
+
+    try:
+        results = await AsyncBottleService.bulk_write(db=db, bulk_in=bulk, user_id=current_user.id)
+    except Exception as e:
+        await run_db(db, Session.rollback)
+        raise HTTPException(status_code=500, detail=f"Error writing bottles: {str(e)}")
+
+    succeeded = [r for r in results if r.success]
+    return BottleBulkResponse(
+        created=sum(1 for r in succeeded if r.op == "create"),
+        updated=sum(1 for r in succeeded if r.op == "update"),
+        deleted=sum(1 for r in succeeded if r.op == "delete"),
+        failed=len(results) - len(succeeded),
+        results=results,
+    )
+
 @router.get("", response_model=List[BottleResponse])
-def get_bottles(
+async def get_bottles(
+    request: Request,
     spirit_type_id: Optional[int] = None,
-    # name: Optional[str] = None,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    brand: Optional[str] = None,
+    name: Optional[str] = None,
+    min_capacity_ml: Optional[int] = Query(None, ge=0),
+    max_capacity_ml: Optional[int] = Query(None, ge=0),
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    cursor: Optional[str] = None,
+    db: Union[AsyncSession, Session] = Depends(get_async_read_db),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
     """
-    Fetch bottles created by the logged-in user with optional filters for spirit_type_id and name.
-    Supports pagination with skip and limit.
+    Fetch bottles created by the logged-in user with optional filters for spirit type,
+    brand, name prefix and capacity range.
+    Supports keyset pagination with limit and cursor; when more results may follow,
+    the cursor for the next page is returned in the X-Next-Cursor header.
+    Answers If-None-Match with 304 when the user's bottles have not changed, and
+    serves repeat reads from the response cache.
     """
+    etag = await collection_etag(request, db, current_user, BOTTLES)
+    seed_headers = SeedTaskService.status_headers(current_user)
+    if is_not_modified(request, etag):
+        return Response(status_code=304, headers={**seed_headers, "ETag": etag})
+    cache_key = ResponseCacheService.make_key(current_user.id, BOTTLES, etag)
+    cached = cached_response(cache_key, etag, seed_headers)
+    if cached is not None:
+        return cached
+
+    filters = dict(
+        spirit_type_id=spirit_type_id,
+        brand=brand,
+        name=name,
+        min_capacity_ml=min_capacity_ml,
+        max_capacity_ml=max_capacity_ml,
+        limit=limit,
+        cursor=cursor,
+    )
     try:
-        return BottleService.get_bottles(
-            db=db,
-            user_id=current_user.id,
-            spirit_type_id=spirit_type_id,
-            # Filter by the current user's ID
-        )
+        if settings.FAST_JSON_RESPONSES:
+            bottles = await AsyncBottleService.get_bottle_rows(db=db, user_id=current_user.id, **filters)
+            body = encode_bottle_rows(bottles)
+        else:
+            bottles = await AsyncBottleService.get_bottles(db=db, user_id=current_user.id, **filters)
+            body = serialize_list(BottleResponse, bottles)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         print(e)
         raise HTTPException(status_code=500, detail=f"Error retrieving bottles: {str(e)}")
 
+    headers = {}
+    if limit is not None and len(bottles) == limit:
+        headers["X-Next-Cursor"] = BottleService.encode_cursor(bottles[-1])
+    return cache_list_response(cache_key, etag, body, headers, seed_headers)
+
+@router.get("/fuzzy", response_model=List[BottleMatchResponse])
+async def fuzzy_lookup_bottles(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(10, ge=1, le=50),
+    threshold: float = Query(0.3, ge=0, le=1),
+    db: Union[AsyncSession, Session] = Depends(get_async_read_db),
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    """
+    Typo-tolerant bottle lookup by name using the trigram index.
+    """
+    try:
+        return await AsyncBottleService.match_names(
+            db, q, user_id=current_user.id, limit=limit, threshold=threshold
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error looking up bottles: {str(e)}")
+
 @router.get("/{bottle_id}", response_model=BottleResponse)
-def get_bottle(
+async def get_bottle(
     bottle_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: Union[AsyncSession, Session] = Depends(get_async_read_db),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
-    db_bottle = BottleService.get_bottle(db=db, bottle_id=bottle_id)
-    if not db_bottle or db_bottle.user_id != current_user.id:
+    db_bottle = await AsyncBottleService.get_bottle(db=db, bottle_id=bottle_id, user_id=current_user.id)
+    if not db_bottle:
         raise HTTPException(status_code=404, detail="Bottle not found")
     return db_bottle
 
 @router.put("/{bottle_id}", response_model=BottleResponse)
-def update_bottle(
+async def update_bottle(
     bottle_id: int,
     bottle: BottleUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: Union[AsyncSession, Session] = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
-    updated_bottle = BottleService.update_bottle(
+    updated_bottle = await AsyncBottleService.update_bottle(
         db=db, bottle_id=bottle_id, bottle_in=bottle, user_id=current_user.id
     )
     if not updated_bottle:
@@ -73,12 +174,12 @@ def update_bottle(
     return updated_bottle
 
 @router.delete("/{bottle_id}")
-def delete_bottle(
+async def delete_bottle(
     bottle_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: Union[AsyncSession, Session] = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
-    success = BottleService.delete_bottle(
+    success = await AsyncBottleService.delete_bottle(
         db=db, bottle_id=bottle_id, user_id=current_user.id
     )
     if not success:
@@ -89,24 +190,31 @@ def delete_bottle(
 @router.post("/import", response_model=BottleImportResponse)
 async def import_bottle_from_image(
     request: BottleImportRequest,
-    current_user: User = Depends(get_current_user),
+    db: Union[AsyncSession, Session] = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
     """
     Analyze a bottle image using AI and extract bottle information.
     Returns the extracted data for user review before saving.
+    The extracted spirit type is matched to the user's spirit types ignoring
+    case and spacing; on a match its ID and stored name are returned.
     Always returns 200 with success flag - check success field for result status.
     """
     try:
         result = await ollama_service.analyze_bottle_image(request.image_base64)
         
         if result.success and result.data:
+            spirit_type = await AsyncSpiritTypeService.get_spirit_type_by_name(
+                db=db, name=result.data.spirit_type, user_id=current_user.id
+            )
             return BottleImportResponse(
                 success=True,
                 name=result.data.name,
                 brand=result.data.brand,
                 flavor_profile=result.data.flavor_profile,
                 capacity_ml=result.data.capacity_ml,
-                spirit_type=result.data.spirit_type,
+                spirit_type=spirit_type.name if spirit_type else result.data.spirit_type,
+                spirit_type_id=spirit_type.id if spirit_type else None,
                 llm_response=result.llm_response
             )
         else:
@@ -0,0 +1,17 @@
+from fastapi import APIRouter, Depends, HTTPException
+
+from app.services.response_cache import ResponseCacheService
+from app.services.user_cache import CurrentUser, UserCacheService
+from app.core.dependencies import get_current_user
+
+router = APIRouter()
+
+
+@router.get("/stats")
+def get_cache_stats(current_user: CurrentUser = Depends(get_current_user)):
+    """
+    Hit/miss counters of the list response cache and the authenticated user cache (admin only).
+    """
+    if not current_user.is_admin:
+        raise HTTPException(status_code=403, detail="Admin access required")
+    return {"responses": ResponseCacheService.stats(), "users": UserCacheService.stats()}
@@ -0,0 +1,30 @@
+from fastapi import APIRouter, Depends, HTTPException
+
+from app.db.query_stats import QueryStatsService
+from app.services.user_cache import CurrentUser
+from app.core.dependencies import get_current_user
+
+router = APIRouter()
+
+
+def _require_admin(current_user: CurrentUser):
+    if not current_user.is_admin:
+        raise HTTPException(status_code=403, detail="Admin access required")
+
+
+@router.get("/queries")
+def get_query_stats(current_user: CurrentUser = Depends(get_current_user)):
+    """
+    Per-endpoint SQL statistics of this worker: requests, queries per request,
+    DB time and the slowest statements (admin only).
+    """
+    _require_admin(current_user)
+    return QueryStatsService.stats()
+
+
+@router.delete("/queries")
+def reset_query_stats(current_user: CurrentUser = Depends(get_current_user)):
+    """Start the per-endpoint SQL statistics over (admin only)"""
+    _require_admin(current_user)
+    QueryStatsService.clear()
+    return {"message": "Query statistics reset"}
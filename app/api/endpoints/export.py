@@ -0,0 +1,47 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from typing import Optional
+
+from app.db.session import SessionLocal
+from app.services.export import ExportService, COLLECTIONS
+from app.core.dependencies import get_current_user
+from app.services.user_cache import CurrentUser
+
+router = APIRouter()
+
+
+@router.get("")
+def export_collection(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    collection: Optional[str] = Query(None, pattern="^(spirit_types|bottles|recipes)$"),
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    """
+    Stream the user's spirit types, bottles and recipes.
+    NDJSON exports every collection unless one is selected; CSV exports a single collection.
+    """
+    if format == "csv" and collection is None:
+        raise HTTPException(status_code=400, detail="CSV exports need a collection: spirit_types, bottles or recipes")
+
+    user_id = current_user.id
+    collections = [collection] if collection else list(COLLECTIONS)
+    name = collection or "collection"
+
+    def body():
+        # The response is produced after the handler returns, so it uses its own session
+        db = SessionLocal()
+        try:
+            if format == "csv":
+                yield from ExportService.stream_csv(db, user_id, collection)
+            else:
+                yield from ExportService.stream_ndjson(db, user_id, collections)
+        finally:
+            db.close()
+
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    extension = "csv" if format == "csv" else "ndjson"
+    return StreamingResponse(
+        body(),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{name}.{extension}"'},
+    )
@@ -1,11 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException
+import json
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, UploadFile, File
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List
-from app.db.session import get_db
-from app.schemas.recipe import RecipeCreate, RecipeUpdate, RecipeResponse
-from app.services.recipe import RecipeService
-from app.core.dependencies import get_current_user
-from app.db.models.user import User
+from typing import List, Optional, Union
+from app.db.session import get_async_db, SessionLocal
+from app.schemas.recipe import RecipeCreate, RecipeUpdate, RecipeResponse, RecipeAvailabilityResponse
+from app.services.recipe import AsyncRecipeService
+from app.services.recipe_import import RecipeImportService
+from app.core.dependencies import get_async_read_db, get_current_user
+from app.core.cache import cache_list_response, cached_response, serialize_list
+from app.core.fast_json import encode_recipe_rows
+from app.core.settings import settings
+from app.core.etag import collection_etag, is_not_modified
+from app.services.response_cache import ResponseCacheService
+from app.services.seed_tasks import SeedTaskService
+from app.services.versions import BOTTLES, RECIPES
+from app.services.user_cache import CurrentUser
 
 router = APIRouter()
 
@@ -16,50 +27,130 @@ class RecipeNotFoundException(HTTPException):
         super().__init__(status_code=404, detail=detail)
 
 @router.post("", response_model=RecipeResponse)
-def create_recipe(
+async def create_recipe(
     recipe: RecipeCreate, 
-    db: Session = Depends(get_db), 
-    current_user: User = Depends(get_current_user)
+    db: Union[AsyncSession, Session] = Depends(get_async_db), 
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     try:
         # Attach the user's ID to the recipe before creation
-        return RecipeService.create_recipe(db=db, recipe_in=recipe, user_id=current_user.id)
+        return await AsyncRecipeService.create_recipe(db=db, recipe_in=recipe, user_id=current_user.id)
     except ValueError as e:  # Handle validation errors from RecipeService
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Unexpected error: {str(e)}")
 
+@router.post("/import")
+def import_recipes(
+    file: UploadFile = File(...),
+    format: Optional[str] = Query(None, pattern="^(json|csv)$"),
+    chunk_size: int = Query(RecipeImportService.CHUNK_SIZE, ge=1, le=5000),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """
+    Import recipes from an uploaded JSON (seed file shape or a bare array) or CSV file.
+    The file is parsed as a stream and written in chunks; progress is streamed back
+    as one JSON object per line after every chunk, ending with a line where done is true.
+    """
+    file_format = format
+    if file_format is None:
+        filename = (file.filename or "").lower()
+        if filename.endswith(".csv") or file.content_type == "text/csv":
+            file_format = "csv"
+        elif filename.endswith(".json") or file.content_type == "application/json":
+            file_format = "json"
+        else:
+            raise HTTPException(status_code=400, detail="Could not detect file format; pass format=json or format=csv")
+
+    if file_format == "csv":
+        records = RecipeImportService.iter_csv_records(file.file)
+    else:
+        records = RecipeImportService.iter_json_records(file.file)
+    user_id = current_user.id
+
+    def progress_lines():
+        # The import outlives the request handler, so it uses its own session
+        db = SessionLocal()
+        try:
+            for progress in RecipeImportService.import_recipes(db, records, user_id, chunk_size=chunk_size):
+                yield json.dumps(progress) + "\n"
+        finally:
+            db.close()
+
+    return StreamingResponse(progress_lines(), media_type="application/x-ndjson")
+
 @router.get("", response_model=List[RecipeResponse])
-def get_recipes(
-    db: Session = Depends(get_db), 
-    current_user: User = Depends(get_current_user)
+async def get_recipes(
+    request: Request,
+    db: Union[AsyncSession, Session] = Depends(get_async_read_db), 
+    current_user: CurrentUser = Depends(get_current_user)
 ):
+    etag = await collection_etag(request, db, current_user, RECIPES)
+    seed_headers = SeedTaskService.status_headers(current_user)
+    if is_not_modified(request, etag):
+        return Response(status_code=304, headers={**seed_headers, "ETag": etag})
+    cache_key = ResponseCacheService.make_key(current_user.id, RECIPES, etag)
+    cached = cached_response(cache_key, etag, seed_headers)
+    if cached is not None:
+        return cached
+
     try:
         # Fetch only recipes belonging to the current user
-        return RecipeService.get_recipes(db=db, user_id=current_user.id)
+        if settings.FAST_JSON_RESPONSES:
+            rows, spirit_types = await AsyncRecipeService.get_recipe_rows(db=db, user_id=current_user.id)
+            body = encode_recipe_rows(rows, spirit_types)
+        else:
+            recipes = await AsyncRecipeService.get_recipes(db=db, user_id=current_user.id)
+            body = serialize_list(RecipeResponse, recipes)
+        return cache_list_response(cache_key, etag, body, extra_headers=seed_headers)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error retrieving recipes: {str(e)}")
 
+@router.get("/available", response_model=List[RecipeAvailabilityResponse])
+async def get_available_recipes(
+    request: Request,
+    response: Response,
+    max_missing: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1),
+    db: Union[AsyncSession, Session] = Depends(get_async_read_db),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """
+    List the recipes the user can make with the bottles they own.
+    Recipes missing up to max_missing spirit types are included, fewest missing first.
+    """
+    etag = await collection_etag(request, db, current_user, BOTTLES, RECIPES)
+    if is_not_modified(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+
+    try:
+        return await AsyncRecipeService.get_available_recipes(
+            db=db, user_id=current_user.id, max_missing=max_missing, limit=limit
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error retrieving available recipes: {str(e)}")
+
 @router.get("/{recipe_id}", response_model=RecipeResponse)
-def get_recipe(
+async def get_recipe(
     recipe_id: int, 
-    db: Session = Depends(get_db), 
-    current_user: User = Depends(get_current_user)
+    db: Union[AsyncSession, Session] = Depends(get_async_read_db), 
+    current_user: CurrentUser = Depends(get_current_user)
 ):
-    recipe = RecipeService.get_recipe(db=db, recipe_id=recipe_id)
-    if not recipe or recipe.user_id != current_user.id:
+    recipe = await AsyncRecipeService.get_recipe(db=db, recipe_id=recipe_id, user_id=current_user.id)
+    if not recipe:
         raise RecipeNotFoundException(recipe_id)
     return recipe
 
 @router.put("/{recipe_id}", response_model=RecipeResponse)
-def update_recipe(
+async def update_recipe(
     recipe_id: int,
     recipe: RecipeUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: Union[AsyncSession, Session] = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     try:
-        updated_recipe = RecipeService.update_recipe(
+        updated_recipe = await AsyncRecipeService.update_recipe(
             db=db, recipe_id=recipe_id, recipe_in=recipe, user_id=current_user.id
         )
         if not updated_recipe:
@@ -71,12 +162,12 @@ def update_recipe(
         raise HTTPException(status_code=500, detail=f"Unexpected error: {str(e)}")
 
 @router.delete("/{recipe_id}")
-def delete_recipe(
+async def delete_recipe(
     recipe_id: int, 
-    db: Session = Depends(get_db), 
-    current_user: User = Depends(get_current_user)
+    db: Union[AsyncSession, Session] = Depends(get_async_db), 
+    current_user: CurrentUser = Depends(get_current_user)
 ):
-    success = RecipeService.delete_recipe(db=db, recipe_id=recipe_id, user_id=current_user.id)
+    success = await AsyncRecipeService.delete_recipe(db=db, recipe_id=recipe_id, user_id=current_user.id)
     if not success:
         raise RecipeNotFoundException(recipe_id)
     return {"message": "Recipe deleted successfully"}
@@ -0,0 +1,31 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from app.db.session import get_db
+from app.schemas.search import SearchResponse
+from app.services.search import SearchService
+from app.core.dependencies import get_current_user
+from app.services.user_cache import CurrentUser
+
+router = APIRouter()
+
+
+@router.get("", response_model=SearchResponse)
+def search(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    """
+    Full-text search across the user's bottles and recipes.
+    Results are ranked by relevance, best first, and include highlighted snippets.
+    """
+    try:
+        return SearchResponse(
+            query=q,
+            bottles=SearchService.search_bottles(db=db, query=q, user_id=current_user.id, limit=limit),
+            recipes=SearchService.search_recipes(db=db, query=q, user_id=current_user.id, limit=limit),
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error searching: {str(e)}")
@@ -0,0 +1,29 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+
+from app.db.session import get_db
+from app.schemas.seed import SeedStatusResponse
+from app.services.seed_tasks import DONE, SeedTaskService
+from app.core.dependencies import get_current_user
+from app.services.user_cache import CurrentUser
+
+router = APIRouter()
+
+
+@router.get("/status", response_model=SeedStatusResponse)
+def get_seed_status(
+    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    """
+    Status of the background task that adds the default recipes and spirit
+    types to a new account: pending, running, done or failed.
+    Accounts created before background seeding report done.
+    """
+    try:
+        task = SeedTaskService.get_task(db, current_user.id)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error retrieving seed status: {str(e)}")
+    if task is None:
+        return SeedStatusResponse(status=DONE)
+    return task
@@ -1,13 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Union
 from pydantic import BaseModel
 
-from app.db.session import get_db
-from app.schemas.spirit_type import SpiritTypeCreate, SpiritTypeResponse
-from app.services.spirit_type import SpiritTypeService
-from app.core.dependencies import get_current_user
-from app.db.models.user import User
+from app.db.session import get_async_db
+from app.schemas.spirit_type import SpiritTypeCreate, SpiritTypeResponse, SpiritTypeMatchResponse
+from app.services.spirit_type import AsyncSpiritTypeService
+from app.core.dependencies import get_async_read_db, get_current_user
+from app.core.cache import cache_list_response, cached_response, serialize_list
+from app.core.fast_json import encode_spirit_type_rows
+from app.core.settings import settings
+from app.core.etag import collection_etag, is_not_modified
+from app.services.response_cache import ResponseCacheService
+from app.services.seed_tasks import SeedTaskService
+from app.services.versions import SPIRIT_TYPES
+from app.services.user_cache import CurrentUser
 
 class SpiritTypeUpdate(BaseModel):
     name: str
@@ -15,68 +23,110 @@ class SpiritTypeUpdate(BaseModel):
 router = APIRouter()
 
 @router.post("", response_model=SpiritTypeResponse)
-def create_spirit_type(
+async def create_spirit_type(
     spirit_type: SpiritTypeCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: Union[AsyncSession, Session] = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     """
     Create a new spirit type for the current user.
     """
     try:
-        return SpiritTypeService.create_spirit_type(
+        return await AsyncSpiritTypeService.create_spirit_type(
             db=db, spirit_type_in=spirit_type, user_id=current_user.id
         )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error creating spirit type: {str(e)}")
 
 @router.get("", response_model=List[SpiritTypeResponse])
-def get_spirit_types(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+async def get_spirit_types(
+    request: Request,
+    db: Union[AsyncSession, Session] = Depends(get_async_read_db),
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     """
     Fetch spirit types for the current user.
+    Answers If-None-Match with 304 when the user's spirit types have not changed, and
+    serves repeat reads from the response cache.
     """
+    etag = await collection_etag(request, db, current_user, SPIRIT_TYPES)
+    seed_headers = SeedTaskService.status_headers(current_user)
+    if is_not_modified(request, etag):
+        return Response(status_code=304, headers={**seed_headers, "ETag": etag})
+    cache_key = ResponseCacheService.make_key(current_user.id, SPIRIT_TYPES, etag)
+    cached = cached_response(cache_key, etag, seed_headers)
+    if cached is not None:
+        return cached
+
     try:
-        return SpiritTypeService.get_spirit_types(
-            db=db, user_id=current_user.id,
-        )
+        if settings.FAST_JSON_RESPONSES:
+            body = encode_spirit_type_rows(
+                await AsyncSpiritTypeService.get_spirit_type_rows(db=db, user_id=current_user.id)
+            )
+        else:
+            spirit_types = await AsyncSpiritTypeService.get_spirit_types(db=db, user_id=current_user.id)
+            body = serialize_list(SpiritTypeResponse, spirit_types)
+        return cache_list_response(cache_key, etag, body, extra_headers=seed_headers)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error retrieving spirit types: {str(e)}")
 
 
+@router.get("/fuzzy", response_model=List[SpiritTypeMatchResponse])
+async def fuzzy_lookup_spirit_types(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(10, ge=1, le=50),
+    threshold: float = Query(0.3, ge=0, le=1),
+    db: Union[AsyncSession, Session] = Depends(get_async_read_db),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """
+    Typo-tolerant spirit type lookup by name using the trigram index.
+    """
+    try:
+        return await AsyncSpiritTypeService.match_names(
+            db, q, user_id=current_user.id, limit=limit, threshold=threshold
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error looking up spirit types: {str(e)}")
+
+
 @router.get("/{spirit_type_id}", response_model=SpiritTypeResponse)
-def get_spirit_type(
+async def get_spirit_type(
     spirit_type_id: int, 
-    db: Session = Depends(get_db), 
-    current_user: User = Depends(get_current_user)
+    db: Union[AsyncSession, Session] = Depends(get_async_read_db), 
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     """
     Retrieve a single spirit type by ID.
     """
-    spirit_type = SpiritTypeService.get_spirit_type(db=db, spirit_type_id=spirit_type_id)
-    if not spirit_type or spirit_type.user_id != current_user.id:
+    spirit_type = await AsyncSpiritTypeService.get_spirit_type(
+        db=db, spirit_type_id=spirit_type_id, user_id=current_user.id
+    )
+    if not spirit_type:
         raise HTTPException(status_code=403, detail="Forbidden: Not your spirit type")
     return spirit_type
 
 @router.put("/{spirit_type_id}", response_model=SpiritTypeResponse)
-def update_spirit_type(
+async def update_spirit_type(
     spirit_type_id: int, 
     spirit_type: SpiritTypeUpdate, 
-    db: Session = Depends(get_db), 
-    current_user: User = Depends(get_current_user)
+    db: Union[AsyncSession, Session] = Depends(get_async_db), 
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     """
     Update an existing spirit type.
     """
-    existing_spirit_type = SpiritTypeService.get_spirit_type(db=db, spirit_type_id=spirit_type_id)
-    if not existing_spirit_type or existing_spirit_type.user_id != current_user.id:
+    existing_spirit_type = await AsyncSpiritTypeService.get_spirit_type(
+        db=db, spirit_type_id=spirit_type_id, user_id=current_user.id
+    )
+    if not existing_spirit_type:
         raise HTTPException(status_code=403, detail="Forbidden: Not your spirit type")
     
     try:
-        updated_spirit_type = SpiritTypeService.update_spirit_type(
-            db=db, spirit_type_id=spirit_type_id, name=spirit_type.name
+        updated_spirit_type = await AsyncSpiritTypeService.update_spirit_type(
+            db=db, spirit_type_id=spirit_type_id, name=spirit_type.name, user_id=current_user.id
         )
         return updated_spirit_type
     except ValueError as e:
@@ -85,19 +135,24 @@ def update_spirit_type(
         raise HTTPException(status_code=500, detail=f"Unexpected error: {str(e)}")
     
 @router.delete("/{spirit_type_id}")
-def delete_spirit_type(
+async def delete_spirit_type(
     spirit_type_id: int, 
-    db: Session = Depends(get_db), 
-    current_user: User = Depends(get_current_user)
+    db: Union[AsyncSession, Session] = Depends(get_async_db), 
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     """
-    Delete a spirit type by ID.
+    Delete a spirit type by ID. Spirit types still used by bottles cannot be deleted.
     """
-    spirit_type = SpiritTypeService.get_spirit_type(db=db, spirit_type_id=spirit_type_id)
-    if not spirit_type or spirit_type.user_id != current_user.id:
+    spirit_type = await AsyncSpiritTypeService.get_spirit_type(
+        db=db, spirit_type_id=spirit_type_id, user_id=current_user.id
+    )
+    if not spirit_type:
         raise HTTPException(status_code=403, detail="Forbidden: Not your spirit type")
     
-    success = SpiritTypeService.delete_spirit_type(db=db, spirit_type_id=spirit_type_id)
+    try:
+        success = await AsyncSpiritTypeService.delete_spirit_type(db=db, spirit_type_id=spirit_type_id, user_id=current_user.id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     if not success:
         raise HTTPException(status_code=404, detail="Spirit type not found")
     return {"message": "Spirit type deleted successfully"}
@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from app.api.endpoints import bottle, recipe, spirit_type, auth, barcode
+from app.api.endpoints import bottle, recipe, spirit_type, auth, barcode, search, export, cache, debug, seed
 
 api_router = APIRouter()
 api_router.include_router(bottle.router, prefix="/bottles", tags=["Bottles"])
@@ -7,3 +7,8 @@ api_router.include_router(recipe.router, prefix="/recipes", tags=["Recipes"])
 api_router.include_router(spirit_type.router, prefix="/spirit_types", tags=["spirit_types"])
 api_router.include_router(auth.router, prefix="/auth", tags=["auth"])
 api_router.include_router(barcode.router, prefix="/barcode", tags=["Barcode"])
+api_router.include_router(search.router, prefix="/search", tags=["Search"])
+api_router.include_router(export.router, prefix="/export", tags=["Export"])
+api_router.include_router(cache.router, prefix="/cache", tags=["Cache"])
+api_router.include_router(debug.router, prefix="/debug", tags=["Debug"])
+api_router.include_router(seed.router, prefix="/seed", tags=["Seed"])
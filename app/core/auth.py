@@ -1,7 +1,7 @@
-from passlib.context import CryptContext
 from datetime import datetime, timedelta
 from jose import JWTError, jwt
 
+from app.core.password_hashing import PasswordHasher, crypt_context
 from app.core.settings import settings
 
 # Secret key and algorithm for JWT
@@ -9,7 +9,14 @@ SECRET_KEY = settings.SECRET_KEY
 ALGORITHM = settings.H_ALGORITHM
 
 # Bcrypt password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = crypt_context(settings.BCRYPT_ROUNDS)
+
+# Process pool used by the auth endpoints so bcrypt never blocks request threads
+password_hasher = PasswordHasher(
+    rounds=settings.BCRYPT_ROUNDS,
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+)
 
 
 def hash_password(password: str) -> str:
@@ -0,0 +1,47 @@
+from typing import Dict, List, Optional, Type
+
+from fastapi import Response
+from pydantic import BaseModel, TypeAdapter
+
+from app.services.response_cache import ResponseCacheService
+
+_list_adapters: Dict[type, TypeAdapter] = {}
+
+
+def serialize_list(schema: Type[BaseModel], items) -> bytes:
+    """
+    Serialize ORM objects to JSON through a response schema, producing the
+    same body FastAPI would for response_model=List[schema].
+    """
+    adapter = _list_adapters.get(schema)
+    if adapter is None:
+        adapter = _list_adapters[schema] = TypeAdapter(List[schema])
+    return adapter.dump_json(adapter.validate_python(items, from_attributes=True))
+
+
+def cached_response(key: str, etag: str, extra_headers: Optional[Dict[str, str]] = None) -> Optional[Response]:
+    """Build a response from the cache, or return None on a miss"""
+    cached = ResponseCacheService.get(key)
+    if cached is None:
+        return None
+    body, headers = cached
+    return Response(
+        content=body, media_type="application/json", headers={**headers, **(extra_headers or {}), "ETag": etag}
+    )
+
+
+def cache_list_response(
+    key: str,
+    etag: str,
+    body: bytes,
+    headers: Optional[Dict[str, str]] = None,
+    extra_headers: Optional[Dict[str, str]] = None,
+) -> Response:
+    """
+    Store a serialized list response under key and return it.
+    `headers` are cached with the body; `extra_headers` only go on this response.
+    """
+    ResponseCacheService.set(key, body, headers)
+    return Response(
+        content=body, media_type="application/json", headers={**(headers or {}), **(extra_headers or {}), "ETag": etag}
+    )
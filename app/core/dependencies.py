@@ -1,18 +1,38 @@
 from fastapi import Depends, HTTPException, status
 from jose import jwt
 from app.core.auth import SECRET_KEY, ALGORITHM
-from app.db.session import get_db
-from app.db.models.user import User
 from sqlalchemy.orm import Session
+from app.db.routing import ReadYourWritesService
+from app.db.session import open_async_db, run_db
+from app.db.models.user import User
+from app.db.models.seed_task import SeedTask
+from app.services.user_cache import CurrentUser, UserCacheService
 from fastapi.security import OAuth2PasswordBearer
 
 # Define the OAuth2 scheme for token extraction
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
-def get_current_user(db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)) -> User:
+def _load_current_user(db: Session, username: str) -> CurrentUser:
+    row = (
+        db.query(User, SeedTask.status)
+        .outerjoin(SeedTask, SeedTask.user_id == User.id)
+        .filter(User.username == username)
+        .first()
+    )
+    if row is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User not found",
+        )
+    return CurrentUser.from_user(row[0], seed_status=row[1])
+
+async def get_current_user(token: str = Depends(oauth2_scheme)) -> CurrentUser:
     """
     Extract the current user from the JWT token.
     Only accepts access tokens, not refresh tokens.
+    Users are resolved through UserCacheService, so a database session is only
+    opened on a cache miss and endpoints that need no data do not need get_db.
+    Async, so a cache hit costs no threadpool hop.
     """
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
@@ -36,10 +56,20 @@ def get_current_user(db: Session = Depends(get_db), token: str = Depends(oauth2_
             detail="Invalid token or token expired",
         )
 
-    user = db.query(User).filter(User.username == username).first()
-    if user is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found",
-        )
-    return user
+    current_user = UserCacheService.get(username)
+    if current_user is not None:
+        return current_user
+
+    async with open_async_db() as db:
+        current_user = await run_db(db, _load_current_user, username)
+
+    UserCacheService.put(current_user)
+    return current_user
+
+async def get_async_read_db(current_user: CurrentUser = Depends(get_current_user)):
+    """
+    Session for read-only endpoints: reads go to a read replica unless the
+    user wrote within READ_YOUR_WRITES_SECONDS and must see their own changes.
+    """
+    async with open_async_db(replica=not ReadYourWritesService.is_sticky(current_user.id)) as db:
+        yield db
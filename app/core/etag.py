@@ -0,0 +1,46 @@
+import hashlib
+from typing import Union
+
+from fastapi import Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.services.user_cache import CurrentUser
+from app.services.versions import AsyncCollectionVersionService
+
+
+async def collection_etag(request: Request, db: Union[AsyncSession, Session], user: CurrentUser, *collections: str) -> str:
+    """
+    Build a weak ETag for a list response from the user's collection versions
+    and the request's query string, so filtered or paged views get their own tag.
+    The versions are read through db rather than taken from the cached user,
+    so a write made on another worker changes the tag at once.
+
+    Call it before reading the rows, on the same session: on a read replica
+    the tag then carries the versions of the replica that serves the rows,
+    which are at least as new as those versions, so rows a lagging replica
+    returns are never tagged or cached under a newer version.
+    """
+    versions = await AsyncCollectionVersionService.get_versions(db, user.id, *collections)
+    query = "&".join(sorted(f"{k}={v}" for k, v in request.query_params.multi_items()))
+    query_hash = hashlib.sha1(query.encode("utf-8")).hexdigest()[:12] if query else "all"
+    return f'W/"{user.id}-{"-".join(str(versions[name]) for name in collections)}-{query_hash}"'
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    """
+    Check If-None-Match against an ETag using weak comparison.
+    """
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
@@ -0,0 +1,51 @@
+"""
+Fast-path JSON encoding for list endpoints.
+
+Builds the response documents straight from column rows and encodes them with
+orjson in a single call. Rows come from our own database, so they are trusted
+to already have the shape the response models describe and are not validated
+again. Field names and order match BottleResponse, RecipeResponse and
+SpiritTypeResponse, so clients cannot tell which path produced a body.
+"""
+from typing import Dict, Iterable, List, Tuple
+
+import orjson
+from sqlalchemy import Row
+
+
+def encode_spirit_type_rows(rows: Iterable[Row]) -> bytes:
+    return orjson.dumps([{"name": name, "id": spirit_type_id} for spirit_type_id, name in rows])
+
+
+def encode_bottle_rows(rows: Iterable[Row]) -> bytes:
+    return orjson.dumps([
+        {
+            "name": row.name,
+            "brand": row.brand,
+            "flavor_profile": row.flavor_profile,
+            "capacity_ml": row.capacity_ml,
+            "spirit_type_id": row.spirit_type_id,
+            "id": row.id,
+            "spirit_type": (
+                {"id": row.spirit_type_id, "name": row.spirit_type_name}
+                if row.spirit_type_name is not None else None
+            ),
+        }
+        for row in rows
+    ])
+
+
+def encode_recipe_rows(rows: Iterable[Row], spirit_types: Dict[int, List[Tuple[int, str]]]) -> bytes:
+    return orjson.dumps([
+        {
+            "name": name,
+            "instructions": instructions,
+            "ingredients": ingredients,
+            "id": recipe_id,
+            "spirit_types": [
+                {"name": spirit_type_name, "id": spirit_type_id}
+                for spirit_type_id, spirit_type_name in spirit_types.get(recipe_id, ())
+            ],
+        }
+        for recipe_id, name, instructions, ingredients in rows
+    ])
@@ -0,0 +1,124 @@
+"""
+Off-loop, concurrency-limited bcrypt.
+
+Hashing and verification run in a dedicated process pool so a burst of logins
+uses every core without tying up the threadpool that sync endpoints share.
+The number of operations queued or running is capped; past that cap callers
+get PasswordHasherBusy straight away, which the auth endpoints turn into a 503.
+
+This module only depends on passlib so pool workers start without importing
+the rest of the app.
+"""
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor
+from functools import lru_cache
+from typing import Optional, Tuple
+
+from passlib.context import CryptContext
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when too many hashing operations are already queued"""
+
+
+@lru_cache(maxsize=None)
+def crypt_context(rounds: int) -> CryptContext:
+    """
+    Bcrypt context for a cost factor. Pinning min and max rounds to the cost
+    makes any hash created with a different cost report that it needs updating.
+    """
+    return CryptContext(
+        schemes=["bcrypt"],
+        deprecated="auto",
+        bcrypt__default_rounds=rounds,
+        bcrypt__min_rounds=rounds,
+        bcrypt__max_rounds=rounds,
+    )
+
+
+def hash_with_rounds(password: str, rounds: int) -> str:
+    return crypt_context(rounds).hash(password)
+
+
+def verify_and_update_with_rounds(password: str, hashed_password: str, rounds: int) -> Tuple[bool, Optional[str]]:
+    return crypt_context(rounds).verify_and_update(password, hashed_password)
+
+
+class PasswordHasher:
+    """
+    Async front end to bcrypt backed by a bounded process pool.
+
+    Args:
+        rounds: Bcrypt cost factor for new hashes
+        workers: Pool size; None uses one process per core, 0 runs bcrypt in
+            the shared threadpool instead of a process pool
+        max_pending: Operations allowed to be queued or running at once
+    """
+
+    def __init__(self, rounds: int, workers: Optional[int], max_pending: int):
+        self.rounds = rounds
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self.max_pending = max_pending
+        self._executor: Optional[Executor] = None
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> Executor:
+        # Created on first use; spawn keeps workers from inheriting the app's threads and connections
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=multiprocessing.get_context("spawn"),
+                    )
+        return self._executor
+
+    def _release(self, _=None):
+        with self._lock:
+            self._pending -= 1
+
+    async def _run(self, fn, *args):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise PasswordHasherBusy("Password hashing queue is full")
+            self._pending += 1
+
+        if self.workers == 0:
+            # Imported here so pool workers, which import this module, do not load starlette
+            from starlette.concurrency import run_in_threadpool
+
+            try:
+                return await run_in_threadpool(fn, *args)
+            finally:
+                self._release()
+
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except Exception:
+            self._release()
+            raise
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    async def hash(self, password: str) -> str:
+        return await self._run(hash_with_rounds, password, self.rounds)
+
+    async def verify_and_update(self, password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """
+        Verify a password. When it matches but the stored hash uses different
+        parameters, also return a fresh hash to store in its place.
+        """
+        return await self._run(verify_and_update_with_rounds, password, hashed_password, self.rounds)
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
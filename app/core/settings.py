@@ -4,6 +4,55 @@ from pydantic_settings import BaseSettings
 class Settings(BaseSettings):
     # Database
     DATABASE_URL: str
+
+    # Connection pool (pre-ping and recycling apply to server databases such
+    # as PostgreSQL) and the longest a PostgreSQL statement may run, 0 = no limit
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_SECONDS: float = 30.0
+    DB_POOL_PRE_PING: bool = True
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    DB_STATEMENT_TIMEOUT_MS: int = 30000
+
+    # Comma-separated read replica URLs for the bottle, recipe, spirit type and
+    # barcode list and lookup endpoints; empty reads everything from the primary.
+    # A user who wrote reads from the primary for READ_YOUR_WRITES_SECONDS
+    # afterwards, which should exceed the replicas' lag
+    DATABASE_REPLICA_URLS: str = ""
+    READ_YOUR_WRITES_SECONDS: float = 5.0
+    READ_YOUR_WRITES_MAX_USERS: int = 10000
+
+    # Per-request SQL instrumentation: query count, DB time and the slowest
+    # statements of each request, aggregated per endpoint at GET /debug/queries.
+    # SQL_DEBUG_HEADERS adds them to every response as X-DB-* headers, and a
+    # positive SQL_STRICT_MAX_REPEATS fails (500) any request that runs the same
+    # statement more often than that, to catch N+1 queries in tests
+    SQL_INSTRUMENTATION: bool = True
+    SQL_DEBUG_HEADERS: bool = False
+    SQL_SLOWEST_STATEMENTS: int = 5
+    SQL_STRICT_MAX_REPEATS: int = 0
+
+    # Bring the schema up to date when the app starts. Meant for single-process
+    # development servers and scripts; deployments run `python -m app.db.migrate`
+    # once before starting the workers instead
+    DB_MIGRATE_ON_STARTUP: bool = False
+
+    # SQLite profile applied to every new connection: WAL so readers are not
+    # blocked by commits, memory-mapped reads, page cache size, how long a
+    # writer waits for the lock before "database is locked", and foreign key
+    # enforcement. Disable it to keep SQLite's defaults
+    SQLITE_PROFILE_ENABLED: bool = True
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_MMAP_SIZE_BYTES: int = 256 * 1024 * 1024
+    SQLITE_CACHE_SIZE_KB: int = 64 * 1024
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_FOREIGN_KEYS: bool = True
+
+    # Run the bottle, recipe, spirit type and barcode endpoints on an
+    # AsyncSession (aiosqlite/asyncpg) instead of a sync Session in the
+    # threadpool; turn off to compare against the sync path
+    ASYNC_DB_SESSIONS: bool = True
     
     # Security / JWT
     SECRET_KEY: str
@@ -17,6 +66,33 @@ class Settings(BaseSettings):
     OLLAMA_HOST: str
     OLLAMA_MODEL: str
 
+    # Response cache for list endpoints (serialized JSON per user)
+    RESPONSE_CACHE_ENABLED: bool = True
+    RESPONSE_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+
+    # Serve list endpoints from column rows encoded with orjson, skipping ORM
+    # objects and response model validation
+    FAST_JSON_RESPONSES: bool = False
+
+    # Authenticated user cache used by get_current_user
+    AUTH_USER_CACHE_TTL_SECONDS: int = 60
+    AUTH_USER_CACHE_MAX_SIZE: int = 10000
+
+    # Password hashing: bcrypt cost factor (stored hashes with a different cost
+    # are rehashed on login), hashing processes (unset = one per core, 0 = use
+    # the request threadpool) and how many hashes may be queued before 503s
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int | None = None
+    PASSWORD_HASH_MAX_PENDING: int = 32
+
+    # Background seeding of new accounts: attempts before a seed task is marked
+    # failed, the delay before the first retry (doubled on each retry), and how
+    # long a running task is left to its worker before a restarted process may
+    # take it over
+    SEED_MAX_ATTEMPTS: int = 5
+    SEED_RETRY_DELAY_SECONDS: float = 5.0
+    SEED_TASK_LEASE_SECONDS: int = 600
+
     class Config:
         env_file = "./app/.env"
         case_sensitive = True
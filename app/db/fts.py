@@ -0,0 +1,123 @@
+"""
+Full-text indexes for bottles and recipes.
+
+On SQLite these are FTS5 virtual tables using external content (the rows live
+in `bottles` and `recipes`), kept in sync by triggers, so every write path -
+services, seeding and bulk imports - updates the index without extra
+application code. On PostgreSQL they are GIN indexes over weighted tsvector
+expressions of the same columns, which the database maintains itself.
+
+Recipes are searched on their ingredient names only (`recipes.ingredient_names`);
+the ingredients JSON also holds keys and units such as "quantity" or "oz"
+that would match every recipe.
+"""
+import logging
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+logger = logging.getLogger(__name__)
+
+# (virtual table, content table, indexed columns)
+FTS_TABLES = [
+    ("bottles_fts", "bottles", ["name", "brand", "flavor_profile"]),
+    ("recipes_fts", "recipes", ["name", "instructions", "ingredient_names"]),
+]
+
+# PostgreSQL: content table -> tsvector expression and the text snippets are cut from.
+# Weights follow the FTS5 column weights used for ranking in SearchService.
+PG_DOCUMENTS = {
+    "bottles": (
+        "setweight(to_tsvector('simple', coalesce(name, '')), 'A') || "
+        "setweight(to_tsvector('simple', coalesce(brand, '')), 'B') || "
+        "setweight(to_tsvector('simple', coalesce(flavor_profile, '')), 'D')",
+        "concat_ws(' ', name, brand, flavor_profile)",
+    ),
+    "recipes": (
+        "setweight(to_tsvector('simple', coalesce(name, '')), 'A') || "
+        "setweight(to_tsvector('simple', coalesce(ingredient_names, '')), 'B') || "
+        "setweight(to_tsvector('simple', coalesce(instructions, '')), 'D')",
+        "concat_ws(' ', name, instructions)",
+    ),
+}
+
+# The indexes as created by migrations 002 to 013, over the whole ingredients
+# JSON. Those migrations run before recipes.ingredient_names exists.
+LEGACY_FTS_TABLES = [
+    FTS_TABLES[0],
+    ("recipes_fts", "recipes", ["name", "instructions", "ingredients"]),
+]
+LEGACY_PG_DOCUMENTS = {
+    "bottles": PG_DOCUMENTS["bottles"],
+    "recipes": (
+        "setweight(to_tsvector('simple', coalesce(name, '')), 'A') || "
+        "setweight(to_tsvector('simple', coalesce(ingredients::text, '')), 'B') || "
+        "setweight(to_tsvector('simple', coalesce(instructions, '')), 'D')",
+        "concat_ws(' ', name, instructions)",
+    ),
+}
+
+
+def _table_ddl(fts_table: str, content_table: str, columns: list) -> list:
+    cols = ", ".join(columns)
+    new_values = ", ".join(f"new.{c}" for c in columns)
+    old_values = ", ".join(f"old.{c}" for c in columns)
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts_table} USING fts5("
+        f"{cols}, content='{content_table}', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts_table}_ai AFTER INSERT ON {content_table} BEGIN "
+        f"INSERT INTO {fts_table}(rowid, {cols}) VALUES (new.id, {new_values}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts_table}_ad AFTER DELETE ON {content_table} BEGIN "
+        f"INSERT INTO {fts_table}({fts_table}, rowid, {cols}) VALUES ('delete', old.id, {old_values}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts_table}_au AFTER UPDATE ON {content_table} BEGIN "
+        f"INSERT INTO {fts_table}({fts_table}, rowid, {cols}) VALUES ('delete', old.id, {old_values}); "
+        f"INSERT INTO {fts_table}(rowid, {cols}) VALUES (new.id, {new_values}); END",
+    ]
+
+
+def create_fts_tables(conn: Connection, fts_tables: list = FTS_TABLES, pg_documents: dict = PG_DOCUMENTS):
+    """
+    Create the FTS5 tables and sync triggers if missing, and populate any
+    table that was just created from its existing content rows. On
+    PostgreSQL, create the GIN expression indexes instead. Migrations pass
+    the definitions as of their revision.
+    """
+    if conn.dialect.name == "postgresql":
+        for content_table, (document, _) in pg_documents.items():
+            conn.execute(text(
+                f"CREATE INDEX IF NOT EXISTS ix_{content_table}_search ON {content_table} USING gin (({document}))"
+            ))
+        return
+    if conn.dialect.name != "sqlite":
+        return
+
+    for fts_table, content_table, columns in fts_tables:
+        exists = conn.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+            {"name": fts_table},
+        ).first()
+        for statement in _table_ddl(fts_table, content_table, columns):
+            conn.execute(text(statement))
+        if not exists:
+            conn.execute(text(f"INSERT INTO {fts_table}({fts_table}) VALUES ('rebuild')"))
+            logger.info(f"Created full-text index {fts_table}")
+
+
+def drop_fts_tables(conn: Connection):
+    """Drop the FTS5 tables and their triggers, or the PostgreSQL search indexes"""
+    if conn.dialect.name == "postgresql":
+        for content_table in PG_DOCUMENTS:
+            conn.execute(text(f"DROP INDEX IF EXISTS ix_{content_table}_search"))
+        return
+    if conn.dialect.name != "sqlite":
+        return
+
+    for fts_table, _, _ in FTS_TABLES:
+        for suffix in ("ai", "ad", "au"):
+            conn.execute(text(f"DROP TRIGGER IF EXISTS {fts_table}_{suffix}"))
+        conn.execute(text(f"DROP TABLE IF EXISTS {fts_table}"))
+
+
+def ensure_fts_tables(engine: Engine):
+    """Create the full-text indexes on startup if they do not exist yet"""
+    with engine.begin() as conn:
+        create_fts_tables(conn)
@@ -0,0 +1,76 @@
+"""
+Bring the database schema up to date. Deployments run this once, before the
+workers start, instead of every worker creating tables on import:
+
+    python -m app.db.migrate
+
+An empty database is created from the models and stamped with the latest
+Alembic revision, since the migrations start from an existing schema; a
+database Alembic already tracks is upgraded to the latest revision. Either
+way the SQLite full-text tables and the trigram index are then created or
+backfilled if missing.
+"""
+import logging
+from pathlib import Path
+from typing import Optional
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import inspect
+
+from app.core.settings import settings
+from app.db.base import Base
+from app.db.fts import ensure_fts_tables
+from app.db.session import create_db_engine
+from app.services.trigram import ensure_trigram_index
+
+# Register every model with Base.metadata
+from app.db.models.barcode_registry import BarcodeRegistry  # noqa: F401
+from app.db.models.bottle import Bottle  # noqa: F401
+from app.db.models.name_trigram import NameTrigram  # noqa: F401
+from app.db.models.recipe import Recipe  # noqa: F401
+from app.db.models.seed_task import SeedTask  # noqa: F401
+from app.db.models.seed_version import SeedVersion  # noqa: F401
+from app.db.models.spirit_type import SpiritType  # noqa: F401
+from app.db.models.user import User  # noqa: F401
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+
+def alembic_config(database_url: str) -> Config:
+    """The project's Alembic config, pointed at database_url instead of the URL in alembic.ini"""
+    config = Config(str(PROJECT_ROOT / "alembic.ini"))
+    config.set_main_option("script_location", str(PROJECT_ROOT / "migrations"))
+    # Config values are interpolated, and URL-encoded passwords contain %
+    config.set_main_option("sqlalchemy.url", database_url.replace("%", "%%"))
+    return config
+
+
+def migrate(database_url: Optional[str] = None):
+    database_url = database_url or settings.DATABASE_URL
+    engine = create_db_engine(database_url)
+    try:
+        tables = set(inspect(engine).get_table_names())
+        config = alembic_config(database_url)
+        if "alembic_version" in tables:
+            command.upgrade(config, "head")
+        elif tables & set(Base.metadata.tables):
+            raise RuntimeError(
+                "The database has tables but no Alembic revision. Stamp the revision its schema "
+                "matches with `alembic stamp <revision>`, then run the migrations again."
+            )
+        else:
+            Base.metadata.create_all(bind=engine)
+            command.stamp(config, "head")
+            logger.info("Created the database schema")
+        ensure_fts_tables(engine)
+        ensure_trigram_index(engine)
+    finally:
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    migrate()
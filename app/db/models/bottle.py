@@ -1,9 +1,14 @@
-from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy import Column, Index, Integer, String, ForeignKey
 from sqlalchemy.orm import relationship
 from app.db.base import Base
 
 class Bottle(Base):
     __tablename__ = "bottles"
+    __table_args__ = (
+        # Every lookup is scoped to the owner: by ID, and listed by (name, id)
+        Index("ix_bottles_user_id_id", "user_id", "id"),
+        Index("ix_bottles_user_id_name", "user_id", "name", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False, index=True)
@@ -11,7 +16,7 @@ class Bottle(Base):
     flavor_profile = Column(String, nullable=True)
     capacity_ml = Column(Integer, nullable=True)
 
-    spirit_type_id = Column(Integer, ForeignKey("spirit_types.id"), nullable=True)
+    spirit_type_id = Column(Integer, ForeignKey("spirit_types.id"), nullable=True, index=True)
     spirit_type = relationship("SpiritType")
 
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
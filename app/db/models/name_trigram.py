@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, String
+from app.db.base import Base
+
+
+class NameTrigram(Base):
+    """
+    Trigram postings for fuzzy name lookup.
+    One row per (entity, owner, trigram, entity_id). The primary key leads with
+    the lookup columns so counting shared trigrams is an index range scan
+    instead of a LIKE scan over names. Writes recompute the old name's trigrams
+    and delete them by primary key, so no second index is needed.
+    """
+    __tablename__ = "name_trigrams"
+
+    entity = Column(String, primary_key=True)  # "bottle", "spirit_type" or "barcode"
+    user_id = Column(Integer, primary_key=True)  # Owner, 0 for the global barcode registry
+    trigram = Column(String, primary_key=True)
+    entity_id = Column(Integer, primary_key=True)
@@ -1,15 +1,47 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, JSON
-from sqlalchemy.orm import relationship
+from typing import Optional
+from sqlalchemy import Column, Index, Integer, String, ForeignKey, JSON, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import relationship, validates
 from app.db.base import Base
 from app.db.models.shared_table import recipes_to_spirits
 
+
+def join_ingredient_names(ingredients) -> Optional[str]:
+    """Names of a recipe's structured ingredients, without quantities or units, for full-text search"""
+    names = [
+        ingredient["name"]
+        for ingredient in ingredients or []
+        if isinstance(ingredient, dict) and isinstance(ingredient.get("name"), str)
+    ]
+    return ", ".join(names) or None
+
+
+def _ingredient_names_default(context) -> Optional[str]:
+    # Core inserts (seeding, reseeding) only pass the ingredients
+    return join_ingredient_names(context.get_current_parameters().get("ingredients"))
+
+
 class Recipe(Base):
     __tablename__ = "recipes"
+    __table_args__ = (
+        # Catalog recipes are matched to the seed file by name
+        Index(
+            "ux_recipes_catalog_name",
+            "name",
+            unique=True,
+            sqlite_where=text("user_id IS NULL"),
+            postgresql_where=text("user_id IS NULL"),
+        ),
+        Index("ix_recipes_user_id_id", "user_id", "id"),
+        Index("ix_recipes_user_id_name", "user_id", "name"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
     instructions = Column(String, nullable=False)
-    ingredients = Column(JSON, nullable=True)  # Structured JSON for ingredients
+    ingredients = Column(JSON().with_variant(JSONB(), "postgresql"), nullable=True)  # Structured JSON for ingredients
+    # Indexed for full-text search instead of the ingredients JSON, whose keys and units would match every recipe
+    ingredient_names = Column(String, nullable=True, default=_ingredient_names_default)
 
     # Many-to-many relationship with SpiritType
     spirit_types = relationship(
@@ -18,5 +50,17 @@ class Recipe(Base):
         back_populates="recipes",
     )
 
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    user = relationship("User", back_populates="recipes")
\ No newline at end of file
+    # NULL for recipes in the shared default catalog
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    user = relationship("User", back_populates="recipes")
+
+    # Catalog recipe this is the owner's edited copy of, if any
+    catalog_recipe_id = Column(Integer, ForeignKey("recipes.id"), nullable=True, index=True)
+
+    # Hash of a catalog recipe's seed content, compared when syncing the catalog with the seed file
+    content_hash = Column(String, nullable=True)
+
+    @validates("ingredients")
+    def _index_ingredient_names(self, key, ingredients):
+        self.ingredient_names = join_ingredient_names(ingredients)
+        return ingredients
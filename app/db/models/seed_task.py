@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy.sql import func
+from app.db.base import Base
+
+
+class SeedTask(Base):
+    """
+    Background job that seeds a new user's account with the default catalog.
+    One row per user; it survives restarts so unfinished seeds are picked up again.
+    """
+    __tablename__ = "seed_tasks"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), unique=True, nullable=False, index=True)
+    status = Column(String, nullable=False, default="pending")  # pending, running, done or failed
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    last_error = Column(String, nullable=True)
+    # When a worker claimed the task; a running task is taken over after SEED_TASK_LEASE_SECONDS
+    started_at = Column(DateTime(timezone=True), nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -0,0 +1,16 @@
+from sqlalchemy import Column, String, JSON, DateTime
+from sqlalchemy.sql import func
+from app.db.base import Base
+
+
+class SeedVersion(Base):
+    """
+    Default spirit types of a seed version, recorded when the catalog is synced
+    with it, so reseeding can tell which defaults a user's version did not have.
+    """
+    __tablename__ = "seed_versions"
+
+    version = Column(String, primary_key=True)
+    spirit_types = Column(JSON, nullable=False)  # Normalized names of the default spirit types
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -1,4 +1,4 @@
-from sqlalchemy import Table, Column, Integer, ForeignKey
+from sqlalchemy import Table, Column, Index, Integer, ForeignKey
 from app.db.base import Base
 
 # Define the shared association table
@@ -7,4 +7,16 @@ recipes_to_spirits = Table(
     Base.metadata,
     Column("spirit_type_id", Integer, ForeignKey("spirit_types.id"), primary_key=True),
     Column("recipe_id", Integer, ForeignKey("recipes.id"), primary_key=True),
+    # The primary key leads with spirit_type_id; loading a recipe's spirit types needs this one
+    Index("ix_recipes_to_spirits_recipe_id", "recipe_id", "spirit_type_id"),
+)
+
+# Catalog recipes a user has deleted or replaced with their own copy
+hidden_catalog_recipes = Table(
+    "hidden_catalog_recipes",
+    Base.metadata,
+    Column("user_id", Integer, ForeignKey("users.id"), primary_key=True),
+    Column("recipe_id", Integer, ForeignKey("recipes.id"), primary_key=True),
+    # Foreign key checks on recipe deletes look rows up by recipe_id
+    Index("ix_hidden_catalog_recipes_recipe_id", "recipe_id"),
 )
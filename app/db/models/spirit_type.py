@@ -1,13 +1,39 @@
-from sqlalchemy import Column, Integer, String, ForeignKey
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Index, Integer, String, ForeignKey, text
+from sqlalchemy.orm import relationship, validates
 from app.db.base import Base
 from app.db.models.shared_table import recipes_to_spirits
 
+
+def normalize_spirit_type_name(name: str) -> str:
+    """Casefold and collapse whitespace, so "Rye  Whiskey" and "rye whiskey" are the same spirit type"""
+    return " ".join(name.casefold().split())
+
+
+def _normalized_name_default(context) -> str:
+    # Core inserts (seeding, reseeding) only pass the name
+    return normalize_spirit_type_name(context.get_current_parameters()["name"])
+
+
 class SpiritType(Base):
     __tablename__ = "spirit_types"
+    __table_args__ = (
+        Index("ix_spirit_types_user_id_id", "user_id", "id"),
+        Index("ix_spirit_types_user_id_name", "user_id", "name"),
+        # A user's spirit type names are unique ignoring case and spacing
+        Index("ux_spirit_types_user_id_normalized_name", "user_id", "normalized_name", unique=True),
+        # The index above does not cover catalog spirit types, whose user_id is NULL
+        Index(
+            "ux_spirit_types_catalog_normalized_name",
+            "normalized_name",
+            unique=True,
+            sqlite_where=text("user_id IS NULL"),
+            postgresql_where=text("user_id IS NULL"),
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False, unique=False)
+    normalized_name = Column(String, nullable=False, default=_normalized_name_default)
 
     # Relationships
     recipes = relationship(
@@ -16,5 +42,14 @@ class SpiritType(Base):
         back_populates="spirit_types",
     )
 
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    # NULL for the spirit types of the shared default catalog
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
     user = relationship("User", back_populates="spirit_types")
+
+    # Catalog spirit type this one stands in for when showing catalog recipes to its owner
+    catalog_spirit_type_id = Column(Integer, ForeignKey("spirit_types.id"), nullable=True, index=True)
+
+    @validates("name")
+    def _normalize_name(self, key, name):
+        self.normalized_name = normalize_spirit_type_name(name)
+        return name
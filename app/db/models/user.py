@@ -11,6 +11,16 @@ class User(Base):
     hashed_password = Column(String, nullable=False)
     is_admin = Column(Boolean, default=False) 
 
+    # Change counters for the user's collections, bumped on every write and used as ETags
+    bottles_version = Column(Integer, nullable=False, default=0, server_default="0")
+    recipes_version = Column(Integer, nullable=False, default=0, server_default="0")
+    spirit_types_version = Column(Integer, nullable=False, default=0, server_default="0")
+
+    # Whether the shared default recipe catalog is part of the user's recipes
+    recipe_catalog = Column(Boolean, nullable=False, default=False, server_default="0")
+    # Version of the seed data last applied to the user, None before the first
+    seed_version = Column(String, nullable=True)
+
     bottles = relationship("Bottle", back_populates="user")
     recipes = relationship("Recipe", back_populates="user")
     spirit_types = relationship("SpiritType", back_populates="user")
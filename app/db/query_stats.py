@@ -0,0 +1,191 @@
+"""
+Per-request SQL instrumentation.
+
+instrument_engine() hooks an engine's cursor execution. Statements run while
+a request is being tracked (track_queries(), entered by the app middleware)
+are counted and timed on that request's RequestQueries. Statements outside a
+request, such as the seed worker or startup, are not recorded. The tracker
+lives in a context variable, so it follows the request into the threadpool
+and into AsyncSession's greenlets.
+
+Statements are grouped by shape: the SQL text with whitespace collapsed and
+IN lists folded to one placeholder. The same shape running many times in
+one request is the signature of an N+1, such as lazy loading spirit_types
+per recipe. SQL_STRICT_MAX_REPEATS turns that into a failed request.
+
+QueryStatsService aggregates the finished requests per endpoint for
+GET /debug/queries. Like the other in-process stats, each worker keeps its
+own.
+"""
+import heapq
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.settings import settings
+
+# Longest statement text kept in headers and stats
+MAX_STATEMENT_LENGTH = 500
+
+# A parenthesized list of two or more placeholders: ?, :name, %(name)s, %s or $1
+_PLACEHOLDER = r"(?:\?|:\w+|%\(\w+\)s|%s|\$\d+)"
+_PLACEHOLDER_LIST_RE = re.compile(rf"\(\s*{_PLACEHOLDER}(?:\s*,\s*{_PLACEHOLDER})+\s*\)")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    """statement with whitespace collapsed and IN lists of any length folded to (?)"""
+    shape = _WHITESPACE_RE.sub(" ", statement).strip()
+    return _PLACEHOLDER_LIST_RE.sub("(?)", shape)
+
+
+def _truncate(statement: str) -> str:
+    if len(statement) <= MAX_STATEMENT_LENGTH:
+        return statement
+    return statement[:MAX_STATEMENT_LENGTH - 3] + "..."
+
+
+class RequestQueries:
+    """Statements run during one request"""
+
+    def __init__(self, keep_slowest: int = settings.SQL_SLOWEST_STATEMENTS):
+        self.count = 0
+        self.duration = 0.0
+        self.shapes: Counter = Counter()
+        self._keep_slowest = keep_slowest
+        self._slowest: List[Tuple[float, str]] = []  # Min-heap of the slowest (duration, shape)
+        self._lock = threading.Lock()
+
+    def record(self, statement: str, duration: float):
+        shape = statement_shape(statement)
+        # Streamed responses and run_in_threadpool can record from several threads
+        with self._lock:
+            self.count += 1
+            self.duration += duration
+            self.shapes[shape] += 1
+            if len(self._slowest) < self._keep_slowest:
+                heapq.heappush(self._slowest, (duration, shape))
+            elif self._slowest and duration > self._slowest[0][0]:
+                heapq.heapreplace(self._slowest, (duration, shape))
+
+    def slowest(self) -> List[Tuple[float, str]]:
+        """The slowest statements as (seconds, shape), slowest first"""
+        return sorted(self._slowest, reverse=True)
+
+    def repeated(self, max_repeats: int) -> List[Tuple[str, int]]:
+        """Shapes that ran more than max_repeats times, most repeated first"""
+        return [(shape, count) for shape, count in self.shapes.most_common() if count > max_repeats]
+
+    def headers(self) -> Dict[str, str]:
+        headers = {
+            "X-DB-Query-Count": str(self.count),
+            "X-DB-Time-Ms": f"{self.duration * 1000:.1f}",
+        }
+        if self.shapes:
+            headers["X-DB-Max-Repeats"] = str(self.shapes.most_common(1)[0][1])
+        slowest = self.slowest()
+        if slowest:
+            duration, shape = slowest[0]
+            headers["X-DB-Slowest"] = f"{duration * 1000:.1f}ms {_truncate(shape)}"
+        return headers
+
+
+# Debug headers added to responses when SQL_DEBUG_HEADERS is on
+DEBUG_HEADERS = ["X-DB-Query-Count", "X-DB-Time-Ms", "X-DB-Max-Repeats", "X-DB-Slowest"]
+
+_current_request: ContextVar[Optional[RequestQueries]] = ContextVar("current_request_queries", default=None)
+
+
+@contextmanager
+def track_queries() -> Iterator[RequestQueries]:
+    """Record the statements run in this context, and the tasks and threads it starts, until exit"""
+    queries = RequestQueries()
+    token = _current_request.set(queries)
+    try:
+        yield queries
+    finally:
+        _current_request.reset(token)
+
+
+def instrument_engine(engine: Engine):
+    """Time every statement engine runs and record it on the current request, if any"""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def start_timer(conn, cursor, statement, parameters, context, executemany):
+        if _current_request.get() is not None:
+            conn.info.setdefault("query_start_times", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def record_statement(conn, cursor, statement, parameters, context, executemany):
+        queries = _current_request.get()
+        start_times = conn.info.get("query_start_times")
+        if queries is not None and start_times:
+            queries.record(statement, time.perf_counter() - start_times.pop())
+
+    @event.listens_for(engine, "handle_error")
+    def discard_timer(exception_context):
+        # A failed statement never reaches after_cursor_execute
+        connection = exception_context.connection
+        if connection is not None and connection.info.get("query_start_times"):
+            connection.info["query_start_times"].pop()
+
+
+class QueryStatsService:
+    """Query counts and DB time of finished requests, per endpoint"""
+
+    _endpoints: Dict[str, dict] = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def record(cls, endpoint: str, queries: RequestQueries):
+        with cls._lock:
+            stats = cls._endpoints.setdefault(
+                endpoint, {"requests": 0, "queries": 0, "db_seconds": 0.0, "max_queries": 0, "slowest": []}
+            )
+            stats["requests"] += 1
+            stats["queries"] += queries.count
+            stats["db_seconds"] += queries.duration
+            stats["max_queries"] = max(stats["max_queries"], queries.count)
+            slowest = stats["slowest"]
+            for duration, shape in queries.slowest():
+                # Keep each shape once, at its slowest
+                for i, (seen_duration, seen_shape) in enumerate(slowest):
+                    if seen_shape == shape:
+                        slowest[i] = (max(duration, seen_duration), shape)
+                        break
+                else:
+                    slowest.append((duration, shape))
+            slowest.sort(reverse=True)
+            del slowest[settings.SQL_SLOWEST_STATEMENTS:]
+
+    @classmethod
+    def stats(cls) -> Dict[str, dict]:
+        """Per endpoint: requests, mean and max queries per request, DB time and slowest statements"""
+        with cls._lock:
+            return {
+                endpoint: {
+                    "requests": stats["requests"],
+                    "queries": stats["queries"],
+                    "mean_queries": round(stats["queries"] / stats["requests"], 2),
+                    "max_queries": stats["max_queries"],
+                    "db_ms": round(stats["db_seconds"] * 1000, 1),
+                    "mean_db_ms": round(stats["db_seconds"] * 1000 / stats["requests"], 2),
+                    "slowest": [
+                        {"ms": round(duration * 1000, 2), "statement": _truncate(shape)}
+                        for duration, shape in stats["slowest"]
+                    ],
+                }
+                for endpoint, stats in sorted(cls._endpoints.items())
+            }
+
+    @classmethod
+    def clear(cls):
+        with cls._lock:
+            cls._endpoints.clear()
@@ -0,0 +1,73 @@
+"""
+Read replica routing.
+
+Sessions are RoutingSession instances. A session opened for a read-only
+request carries a replica engine in session.info[READ_REPLICA], and its
+queries go to that replica; flushes and INSERT, UPDATE and DELETE
+statements still go to the primary, so a read session that writes stays
+correct. Sessions without a replica use the primary for everything.
+
+Replicas lag behind the primary, so a user who just wrote reads from the
+primary for READ_YOUR_WRITES_SECONDS afterwards. ReadYourWritesService
+records the last write of each user; like the other in-process caches it is
+per worker, so a request landing on a worker that did not see the write, or
+arriving after the window while a replica still lags, can read older rows.
+Those rows are never passed off as current: list endpoints read the
+collection versions for their ETags and response cache keys on the same
+replica session, before the rows (see app.core.etag.collection_etag).
+"""
+import threading
+import time
+from typing import Dict
+
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.dml import UpdateBase
+
+from app.core.settings import settings
+
+# session.info key holding the sync engine a read-only session reads from
+READ_REPLICA = "read_replica"
+
+
+class RoutingSession(Session):
+    """Session that sends reads to its replica, if it has one, and writes to the primary"""
+
+    def get_bind(self, mapper=None, *, clause=None, **kw):
+        replica = self.info.get(READ_REPLICA)
+        if replica is not None and not self._flushing and not isinstance(clause, UpdateBase):
+            return replica
+        return super().get_bind(mapper, clause=clause, **kw)
+
+
+class ReadYourWritesService:
+    """Which users wrote recently enough that their reads must go to the primary"""
+
+    _written_at: Dict[int, float] = {}
+    _window = settings.READ_YOUR_WRITES_SECONDS
+    _lock = threading.Lock()
+
+    @classmethod
+    def mark(cls, user_id: int):
+        """Record that user_id committed a write just now"""
+        now = time.monotonic()
+        with cls._lock:
+            cls._written_at[user_id] = now
+            if len(cls._written_at) > settings.READ_YOUR_WRITES_MAX_USERS:
+                cls._prune(now)
+
+    @classmethod
+    def is_sticky(cls, user_id: int) -> bool:
+        """Whether user_id wrote within the window, so their reads must see the primary"""
+        written_at = cls._written_at.get(user_id)
+        return written_at is not None and time.monotonic() - written_at < cls._window
+
+    @classmethod
+    def clear(cls):
+        with cls._lock:
+            cls._written_at.clear()
+
+    @classmethod
+    def _prune(cls, now: float):
+        expired = [user_id for user_id, written_at in cls._written_at.items() if now - written_at >= cls._window]
+        for user_id in expired:
+            del cls._written_at[user_id]
@@ -1,11 +1,196 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+"""
+Database engine and session factory.
+
+The engine is configured from DATABASE_URL with settings suited to its
+dialect. SQLite connections may be used from any thread, in-memory
+databases share one connection, and every new connection runs the SQLite
+profile from settings (WAL, mmap, cache size, busy timeout, foreign keys),
+whose PRAGMA statements are built once per engine. Server databases such as
+PostgreSQL get a sized connection pool with pre-ping and recycling, plus a
+per-statement timeout.
+
+Async endpoints get an AsyncSession on a second engine with the same
+options, using the dialect's asyncio driver (aiosqlite or asyncpg). The
+services stay synchronous: run_db() runs them on the AsyncSession's
+connection without a thread, or on a sync Session in the threadpool when
+ASYNC_DB_SESSIONS is off.
+
+Each URL in DATABASE_REPLICA_URLS gets the same pair of engines. Sessions
+are RoutingSessions (see app.db.routing): one opened with replica=True
+reads from a randomly chosen replica and writes to the primary.
+
+With SQL_INSTRUMENTATION on, every app engine records the statements each
+request runs (see app.db.query_stats).
+"""
+import random
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, List, Optional, TypeVar, Union
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import URL, Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+from starlette.concurrency import run_in_threadpool
 from app.core.settings import settings
+from app.db.query_stats import instrument_engine
+from app.db.routing import READ_REPLICA, RoutingSession
+
+T = TypeVar("T")
+
+
+def sqlite_pragmas(in_memory: bool = False) -> List[str]:
+    """PRAGMA statements of the configured SQLite profile"""
+    pragmas = []
+    if not in_memory:
+        # In-memory databases have their own journal and nothing to map
+        pragmas.append(f"PRAGMA journal_mode={settings.SQLITE_JOURNAL_MODE}")
+        pragmas.append(f"PRAGMA mmap_size={settings.SQLITE_MMAP_SIZE_BYTES}")
+    pragmas += [
+        f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}",
+        # A negative cache_size is in KiB rather than pages
+        f"PRAGMA cache_size={-settings.SQLITE_CACHE_SIZE_KB}",
+        f"PRAGMA busy_timeout={settings.SQLITE_BUSY_TIMEOUT_MS}",
+        f"PRAGMA foreign_keys={'ON' if settings.SQLITE_FOREIGN_KEYS else 'OFF'}",
+    ]
+    return pragmas
+
+
+def apply_sqlite_profile(engine: Engine, in_memory: bool = False):
+    """Run the SQLite profile's PRAGMA statements on every new connection of engine"""
+    pragmas = sqlite_pragmas(in_memory)
+
+    @event.listens_for(engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+
+def _engine_options(database_url: URL, in_memory: bool, **overrides) -> dict:
+    """create_engine() options for database_url, with overrides applied"""
+    dialect = database_url.get_backend_name()
+    connect_args = {}
+    options = {}
+
+    if dialect == "sqlite":
+        # Sessions are used from the threadpool, the seed worker and streamed responses
+        connect_args["check_same_thread"] = False
+        if in_memory:
+            # Every connection to :memory: is a new database, so share one
+            options["poolclass"] = StaticPool
+        else:
+            options.update(
+                pool_size=settings.DB_POOL_SIZE,
+                max_overflow=settings.DB_MAX_OVERFLOW,
+                pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+            )
+    else:
+        options.update(
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+            pool_pre_ping=settings.DB_POOL_PRE_PING,
+            pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+        )
+        if dialect == "postgresql" and settings.DB_STATEMENT_TIMEOUT_MS:
+            if database_url.get_driver_name() == "asyncpg":
+                connect_args["server_settings"] = {"statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS)}
+            else:
+                connect_args["options"] = f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"
+
+    options["connect_args"] = connect_args
+    options.update(overrides)
+    return options
+
+
+def _is_in_memory(database_url: URL) -> bool:
+    return database_url.get_backend_name() == "sqlite" and database_url.database in (None, "", ":memory:")
+
+
+def create_db_engine(url: str, sqlite_profile: Optional[bool] = None, **overrides) -> Engine:
+    """
+    Create an engine for url; keyword arguments override the chosen options.
+    sqlite_profile turns the SQLite profile on or off, defaulting to settings.
+    """
+    database_url = make_url(url)
+    in_memory = _is_in_memory(database_url)
+    engine = create_engine(database_url, **_engine_options(database_url, in_memory, **overrides))
+
+    if sqlite_profile is None:
+        sqlite_profile = settings.SQLITE_PROFILE_ENABLED
+    if database_url.get_backend_name() == "sqlite" and sqlite_profile:
+        apply_sqlite_profile(engine, in_memory)
+    return engine
+
+
+# asyncio drivers used for each dialect's AsyncSession engine
+_ASYNC_DRIVERS = {
+    "sqlite": "aiosqlite",
+    "postgresql": "asyncpg",
+}
+
+
+def async_database_url(url: str) -> URL:
+    """url with its driver swapped for the dialect's asyncio driver"""
+    database_url = make_url(url)
+    dialect = database_url.get_backend_name()
+    if dialect not in _ASYNC_DRIVERS:
+        raise NotImplementedError(f"Async sessions are not supported on {dialect}")
+    return database_url.set(drivername=f"{dialect}+{_ASYNC_DRIVERS[dialect]}")
+
+
+def create_async_db_engine(url: str, sqlite_profile: Optional[bool] = None, **overrides) -> AsyncEngine:
+    """Async counterpart of create_db_engine, connecting through the dialect's asyncio driver"""
+    database_url = async_database_url(url)
+    in_memory = _is_in_memory(database_url)
+    engine = create_async_engine(database_url, **_engine_options(database_url, in_memory, **overrides))
+
+    if sqlite_profile is None:
+        sqlite_profile = settings.SQLITE_PROFILE_ENABLED
+    if database_url.get_backend_name() == "sqlite" and sqlite_profile:
+        apply_sqlite_profile(engine.sync_engine, in_memory)
+    return engine
+
 
 SQLALCHEMY_DATABASE_URL = settings.DATABASE_URL
-engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+engine = create_db_engine(SQLALCHEMY_DATABASE_URL)
+
+REPLICA_DATABASE_URLS = [url.strip() for url in settings.DATABASE_REPLICA_URLS.split(",") if url.strip()]
+replica_engines = [create_db_engine(url) for url in REPLICA_DATABASE_URLS]
+
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine, class_=RoutingSession)
+
+# The CRUD endpoints use AsyncSession on the event loop unless ASYNC_DB_SESSIONS is off
+async_engine = create_async_db_engine(SQLALCHEMY_DATABASE_URL) if settings.ASYNC_DB_SESSIONS else None
+async_replica_engines = (
+    [create_async_db_engine(url) for url in REPLICA_DATABASE_URLS] if settings.ASYNC_DB_SESSIONS else []
+)
+AsyncSessionLocal = (
+    async_sessionmaker(autocommit=False, autoflush=False, bind=async_engine, sync_session_class=RoutingSession)
+    if async_engine is not None else None
+)
+
+if settings.SQL_INSTRUMENTATION:
+    for instrumented in [engine, *replica_engines]:
+        instrument_engine(instrumented)
+    for instrumented in [async_engine, *async_replica_engines]:
+        if instrumented is not None:
+            instrument_engine(instrumented.sync_engine)
+
+async def dispose_engines():
+    """Close the pooled connections of the primary and replica engines, at application shutdown"""
+    engine.dispose()
+    for replica in replica_engines:
+        replica.dispose()
+    if async_engine is not None:
+        await async_engine.dispose()
+    for replica in async_replica_engines:
+        await replica.dispose()
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 def get_db():
     db = SessionLocal()
@@ -13,3 +198,45 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+@asynccontextmanager
+async def open_async_db(replica: bool = False) -> AsyncIterator[Union[AsyncSession, Session]]:
+    """
+    Session for async code: an AsyncSession, or a sync Session when
+    ASYNC_DB_SESSIONS is off. Either way, use it through run_db. With
+    replica=True its reads go to a read replica, if any are configured.
+    """
+    if AsyncSessionLocal is not None:
+        async with AsyncSessionLocal() as db:
+            if replica and async_replica_engines:
+                db.info[READ_REPLICA] = random.choice(async_replica_engines).sync_engine
+            yield db
+        return
+    db = SessionLocal()
+    if replica and replica_engines:
+        db.info[READ_REPLICA] = random.choice(replica_engines)
+    try:
+        yield db
+    finally:
+        # Close on the loop: queueing it behind the threadpool would keep the
+        # connection checked out while threads wait on the pool for one.
+        db.close()
+
+
+async def get_async_db():
+    async with open_async_db() as db:
+        yield db
+
+
+async def run_db(db: Union[AsyncSession, Session], fn: Callable[..., T], *args, **kwargs) -> T:
+    """
+    Call fn(session, *args, **kwargs) with a sync Session. On an AsyncSession
+    it runs on the event loop through SQLAlchemy's greenlet bridge, with
+    every statement awaited on the asyncio driver; on a sync Session it runs
+    in the threadpool. fn must not leave lazy loads for the caller, so it
+    should return plain values or response models rather than ORM objects.
+    """
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(fn, *args, **kwargs)
+    return await run_in_threadpool(fn, db, *args, **kwargs)
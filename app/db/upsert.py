@@ -0,0 +1,42 @@
+"""
+Dialect-specific INSERT ... ON CONFLICT statements.
+
+SQLite and PostgreSQL both support ON CONFLICT, but SQLAlchemy builds it from
+each dialect's own insert() construct, so these helpers pick the one for the
+session's database.
+"""
+from typing import Iterable, Optional
+
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+_DIALECT_INSERTS = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
+
+def dialect_insert(db: Session, table):
+    """insert() for the session's database, supporting on_conflict_do_nothing/do_update"""
+    dialect = db.get_bind().dialect.name
+    if dialect not in _DIALECT_INSERTS:
+        raise NotImplementedError(f"Upserts are not supported on {dialect}")
+    return _DIALECT_INSERTS[dialect](table)
+
+
+def insert_ignore(db: Session, table, index_elements: Optional[Iterable] = None, index_where=None):
+    """INSERT that skips rows conflicting with a unique or primary key constraint"""
+    return dialect_insert(db, table).on_conflict_do_nothing(index_elements=index_elements, index_where=index_where)
+
+
+def upsert(db: Session, table, index_elements: Iterable, update_columns: Iterable[str], index_where=None):
+    """
+    INSERT that updates update_columns from the new values when a row with
+    the same index_elements already exists
+    """
+    statement = dialect_insert(db, table)
+    return statement.on_conflict_do_update(
+        index_elements=index_elements,
+        index_where=index_where,
+        set_={column: statement.excluded[column] for column in update_columns},
+    )
@@ -1,48 +1,110 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from app.api.router import api_router
-from app.db.session import engine
-from app.db.base import Base
+from app.core.auth import password_hasher
+from app.db.query_stats import DEBUG_HEADERS, QueryStatsService, track_queries
+from app.db.session import dispose_engines
+from app.services.ollama import ollama_service
+from app.services.seed_service import SeedService
+from app.services.seed_tasks import SeedTaskService
 from app.core.settings import settings
 
-# Import models to ensure they're registered with Base.metadata
-from app.db.models.barcode_registry import BarcodeRegistry  # noqa: F401
-
-# Create database tables
-Base.metadata.create_all(bind=engine)
-
-app = FastAPI()
-
-allowed_origins = [
-    origin for origin in [
-        settings.FRONTEND_URL,  # Development: http://localhost:3000
-        "https://barapp.dannysickels.com",  # Production frontend
-    ] if origin is not None
-]
-
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=allowed_origins,  # Only allow specific origins
-    allow_credentials=True,
-    allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],  # Explicitly allow these methods
-    allow_headers=["Content-Type", "Authorization"],  # Explicitly allow these headers
-)
-
-# Include the API router
-app.include_router(api_router)
-
-# Add middleware to log requests and responses
-@app.middleware("http")
-async def log_requests(request: Request, call_next):
-    try:
-        print(f"Incoming request: {request.method} {request.url}")
-        response = await call_next(request)
-        print(f"Response status: {response.status_code}")
-        return response
-    except Exception as e:
-        print(f"Error processing request: {request.method} {request.url}, Error: {e}")
-        raise e
-
-@app.get("/")
-def read_root():
-    return {"message": "Welcome to the Bottle API"}
+
+def _endpoint_name(request: Request) -> str:
+    """Method and path of the matched route, with path parameters as {name}, for the query stats"""
+    if request.scope.get("endpoint") is None:
+        # Keep requests for unknown paths from each getting an entry
+        return f"{request.method} (unmatched)"
+    segments = request.url.path.split("/")
+    for name, value in request.path_params.items():
+        if str(value) in segments:
+            segments[segments.index(str(value))] = f"{{{name}}}"
+    return f"{request.method} {'/'.join(segments)}"
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Startup and shutdown work, kept out of import time so importing the app
+    (workers, scripts, tooling) does not touch the database.
+    """
+    if settings.DB_MIGRATE_ON_STARTUP:
+        from app.db.migrate import migrate
+
+        migrate()
+    # Apply seed file changes to the shared recipe catalog before it is read
+    SeedService.ensure_catalog()
+    # Pick up seed tasks a previous process did not finish
+    SeedTaskService.resume_pending()
+    yield
+    password_hasher.shutdown()
+    await ollama_service.close()
+    await dispose_engines()
+
+
+def create_app() -> FastAPI:
+    app = FastAPI(lifespan=lifespan)
+
+    allowed_origins = [
+        origin for origin in [
+            settings.FRONTEND_URL,  # Development: http://localhost:3000
+            "https://barapp.dannysickels.com",  # Production frontend
+        ] if origin is not None
+    ]
+
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=allowed_origins,  # Only allow specific origins
+        allow_credentials=True,
+        allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],  # Explicitly allow these methods
+        allow_headers=["Content-Type", "Authorization", "If-None-Match"],  # Explicitly allow these headers
+        # Let the frontend read the pagination cursor, ETags, seeding state and SQL debug headers
+        expose_headers=["X-Next-Cursor", "ETag", "X-Seed-Status"] + (DEBUG_HEADERS if settings.SQL_DEBUG_HEADERS else []),
+    )
+
+    # Include the API router
+    app.include_router(api_router)
+
+    if settings.SQL_INSTRUMENTATION:
+        @app.middleware("http")
+        async def instrument_queries(request: Request, call_next):
+            # Statements a streamed body runs after the headers are sent are not counted
+            with track_queries() as queries:
+                response = await call_next(request)
+            QueryStatsService.record(_endpoint_name(request), queries)
+
+            max_repeats = settings.SQL_STRICT_MAX_REPEATS
+            repeated = queries.repeated(max_repeats) if max_repeats > 0 else []
+            if repeated:
+                shape, count = repeated[0]
+                return JSONResponse(
+                    status_code=500,
+                    content={"detail": f"Statement ran {count} times, more than {max_repeats}: {shape}"},
+                )
+            if settings.SQL_DEBUG_HEADERS:
+                response.headers.update(queries.headers())
+            return response
+
+    # Add middleware to log requests and responses
+    @app.middleware("http")
+    async def log_requests(request: Request, call_next):
+        try:
+            print(f"Incoming request: {request.method} {request.url}")
+            response = await call_next(request)
+            print(f"Response status: {response.status_code}")
+            return response
+        except Exception as e:
+            print(f"Error processing request: {request.method} {request.url}, Error: {e}")
+            raise e
+
+    @app.get("/")
+    def read_root():
+        return {"message": "Welcome to the Bottle API"}
+
+    return app
+
+
+app = create_app()
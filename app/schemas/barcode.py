@@ -33,3 +33,8 @@ class BarcodeLookupResponse(BaseModel):
     data: Optional[BarcodeRegistryResponse] = None
     message: Optional[str] = None
 
+
+class BarcodeMatchResponse(BaseModel):
+    """Fuzzy name match against the barcode registry"""
+    entry: BarcodeRegistryResponse
+    similarity: float  # Trigram similarity between 0 and 1
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, ConfigDict
-from typing import Optional
+from typing import List, Optional
 
 class SpiritTypeResponse(BaseModel):
     id: int
@@ -29,3 +29,32 @@ class BottleResponse(BottleBase):
     spirit_type: Optional[SpiritTypeResponse]  # Include nested spirit type object
 
     model_config = ConfigDict(from_attributes=True)
+
+class BottleMatchResponse(BaseModel):
+    bottle: BottleResponse
+    similarity: float  # Trigram similarity between 0 and 1
+
+class BottleBulkUpdate(BottleUpdate):
+    id: int  # ID of the bottle to update
+
+class BottleBulkRequest(BaseModel):
+    create: List[BottleCreate] = []
+    update: List[BottleBulkUpdate] = []
+    delete: List[int] = []  # IDs of bottles to delete
+
+class BottleBulkResult(BaseModel):
+    op: str  # "create", "update" or "delete"
+    index: int  # Position of the item within its operation list
+    id: Optional[int] = None
+    success: bool
+    error: Optional[str] = None
+    bottle: Optional[BottleResponse] = None  # Saved bottle for successful creates/updates
+
+    model_config = ConfigDict(from_attributes=True)
+
+class BottleBulkResponse(BaseModel):
+    created: int
+    updated: int
+    deleted: int
+    failed: int
+    results: List[BottleBulkResult]
@@ -16,6 +16,7 @@ class BottleImportResponse(BaseModel):
     flavor_profile: Optional[str] = None
     capacity_ml: Optional[int] = None
     spirit_type: Optional[str] = None
+    spirit_type_id: Optional[int] = None  # The user's spirit type matching spirit_type, if they have one
     # LLM response info
     llm_response: Optional[str] = None  # Raw text response from the LLM
     error: Optional[str] = None  # Error message if failed
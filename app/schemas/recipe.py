@@ -1,5 +1,5 @@
-from pydantic import BaseModel, ConfigDict
-from typing import List, Optional, Dict, Any
+from pydantic import BaseModel, ConfigDict, StringConstraints
+from typing import Annotated, List, Optional, Dict, Any
 
 from app.schemas.bottle import BottleResponse
 from app.schemas.spirit_type import SpiritTypeResponse
@@ -18,6 +18,10 @@ class RecipeBase(BaseModel):
 class RecipeCreate(RecipeBase):
     spirit_type_ids: List[int]  # List of spirit type IDs
 
+class RecipeImportRecord(RecipeBase):
+    """A recipe record of an import file; spirit types are given by name"""
+    spirit_types: Optional[List[Annotated[str, StringConstraints(strip_whitespace=True, min_length=1)]]] = None
+
 class RecipeUpdate(BaseModel):
     name: Optional[str] = None
     instructions: Optional[str] = None
@@ -29,3 +33,9 @@ class RecipeResponse(RecipeBase):
     spirit_types: List[SpiritTypeResponse]  # Many-to-many relationship with spirit types
 
     model_config = ConfigDict(from_attributes=True)
+
+class RecipeAvailabilityResponse(BaseModel):
+    """A recipe ranked by how many of its spirit types the user has in stock"""
+    recipe: RecipeResponse
+    missing_count: int
+    missing_spirit_types: List[SpiritTypeResponse]
@@ -0,0 +1,17 @@
+from pydantic import BaseModel
+from typing import List
+
+
+class SearchHit(BaseModel):
+    """A single full-text search match"""
+    id: int
+    name: str
+    snippet: str  # Matching text with terms wrapped in <mark></mark>
+    score: float  # BM25 score (negated ts_rank on PostgreSQL), lower is a better match
+
+
+class SearchResponse(BaseModel):
+    """Full-text search results grouped by collection"""
+    query: str
+    bottles: List[SearchHit]
+    recipes: List[SearchHit]
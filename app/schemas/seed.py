@@ -0,0 +1,11 @@
+from datetime import datetime
+from pydantic import BaseModel, ConfigDict
+from typing import Optional
+
+class SeedStatusResponse(BaseModel):
+    status: str  # pending, running, done or failed
+    attempts: int = 0
+    last_error: Optional[str] = None
+    updated_at: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
@@ -10,3 +10,7 @@ class SpiritTypeResponse(SpiritTypeBase):
     id: int
 
     model_config = ConfigDict(from_attributes=True)
+
+class SpiritTypeMatchResponse(BaseModel):
+    spirit_type: SpiritTypeResponse
+    similarity: float  # Trigram similarity between 0 and 1
@@ -0,0 +1,221 @@
+"""
+Recipe availability ("what can I make?") engine.
+
+Keeps a per-user inverted index from spirit type to the recipes that require it,
+plus the number of bottles the user holds of each spirit type. The index is built
+from the database on first use and then updated incrementally by the bottle,
+recipe and spirit type services, so answering a query never scans recipes.
+
+The index lives in process memory, so it records the bottles and recipes
+versions of the data it reflects. Each query reads the user's current
+versions (one primary key lookup) and rebuilds the index when they differ,
+which picks up writes made by other workers or by the reseed job. A commit
+in this process advances the recorded versions by its own bumps, since the
+service that made it updates the index right after committing.
+
+The lock is never held while the database is queried, since on an AsyncSession
+a query yields to the event loop and another request would then block the loop
+waiting for the lock. A build that saw a write land while it was reading is
+still used to answer, but is not kept.
+"""
+import logging
+import threading
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import event, func
+from sqlalchemy.orm import Session
+
+from app.db.models.bottle import Bottle
+from app.db.models.recipe import Recipe
+from app.db.models.shared_table import recipes_to_spirits
+from app.services.recipe_catalog import RecipeCatalogService
+from app.services.versions import BOTTLES, RECIPES, CollectionVersionService
+
+logger = logging.getLogger(__name__)
+
+
+class _UserIndex:
+    """In-memory availability index for a single user"""
+
+    def __init__(self, versions: Dict[str, int]):
+        # Bottles and recipes versions of the data the index reflects
+        self.versions = versions
+        self.recipes_by_spirit: Dict[int, Set[int]] = defaultdict(set)
+        self.spirits_by_recipe: Dict[int, Set[int]] = {}
+        self.bottle_counts: Dict[int, int] = defaultdict(int)
+
+    def set_recipe(self, recipe_id: int, spirit_type_ids: Iterable[int]):
+        self.remove_recipe(recipe_id)
+        required = set(spirit_type_ids)
+        self.spirits_by_recipe[recipe_id] = required
+        for spirit_type_id in required:
+            self.recipes_by_spirit[spirit_type_id].add(recipe_id)
+
+    def remove_recipe(self, recipe_id: int):
+        for spirit_type_id in self.spirits_by_recipe.pop(recipe_id, ()):
+            recipe_ids = self.recipes_by_spirit.get(spirit_type_id)
+            if recipe_ids is not None:
+                recipe_ids.discard(recipe_id)
+                if not recipe_ids:
+                    del self.recipes_by_spirit[spirit_type_id]
+
+    def adjust_bottles(self, spirit_type_id: Optional[int], delta: int):
+        if spirit_type_id is None:
+            return
+        count = self.bottle_counts[spirit_type_id] + delta
+        if count > 0:
+            self.bottle_counts[spirit_type_id] = count
+        else:
+            self.bottle_counts.pop(spirit_type_id, None)
+
+
+class RecipeAvailabilityService:
+    """Service answering which recipes a user can make with the bottles they own"""
+
+    _indexes: Dict[int, _UserIndex] = {}
+    # Per-user count of writes recorded, to detect writes made during a build
+    _changes: Dict[int, int] = defaultdict(int)
+    _lock = threading.Lock()
+
+    @staticmethod
+    def _build_index(db: Session, user_id: int, versions: Dict[str, int]) -> _UserIndex:
+        index = _UserIndex(versions)
+
+        recipe_ids = db.query(Recipe.id).filter(Recipe.user_id == user_id).all()
+        for (recipe_id,) in recipe_ids:
+            index.spirits_by_recipe[recipe_id] = set()
+
+        pairs = (
+            db.query(recipes_to_spirits.c.recipe_id, recipes_to_spirits.c.spirit_type_id)
+            .join(Recipe, Recipe.id == recipes_to_spirits.c.recipe_id)
+            .filter(Recipe.user_id == user_id)
+            .all()
+        )
+        for recipe_id, spirit_type_id in pairs:
+            index.spirits_by_recipe[recipe_id].add(spirit_type_id)
+            index.recipes_by_spirit[spirit_type_id].add(recipe_id)
+
+        for recipe in RecipeCatalogService.get_visible_recipes(db, user_id):
+            index.set_recipe(recipe.id, [spirit_type.id for spirit_type in recipe.spirit_types])
+
+        counts = (
+            db.query(Bottle.spirit_type_id, func.count(Bottle.id))
+            .filter(Bottle.user_id == user_id, Bottle.spirit_type_id.isnot(None))
+            .group_by(Bottle.spirit_type_id)
+            .all()
+        )
+        for spirit_type_id, count in counts:
+            index.bottle_counts[spirit_type_id] = count
+
+        logger.debug(f"Built availability index for user {user_id}: {len(index.spirits_by_recipe)} recipes")
+        return index
+
+    @staticmethod
+    def _get_index(db: Session, user_id: int) -> _UserIndex:
+        # Read before the rows, so an index built from newer rows than these
+        # versions is rebuilt rather than kept
+        versions = CollectionVersionService.get_versions(db, user_id, BOTTLES, RECIPES)
+        with RecipeAvailabilityService._lock:
+            index = RecipeAvailabilityService._indexes.get(user_id)
+            changes = RecipeAvailabilityService._changes[user_id]
+        if index is not None and index.versions == versions:
+            return index
+
+        index = RecipeAvailabilityService._build_index(db, user_id, versions)
+        with RecipeAvailabilityService._lock:
+            existing = RecipeAvailabilityService._indexes.get(user_id)
+            if existing is not None and existing.versions == versions:
+                return existing
+            if RecipeAvailabilityService._changes[user_id] == changes:
+                RecipeAvailabilityService._indexes[user_id] = index
+        return index
+
+    @staticmethod
+    def get_available_recipes(
+        db: Session,
+        user_id: int,
+        max_missing: int = 0,
+        limit: Optional[int] = None,
+    ) -> List[Tuple[int, Set[int]]]:
+        """
+        Rank a user's recipes by how many of their required spirit types are not in stock.
+
+        Args:
+            db: Database session (only used to build the index on first use)
+            user_id: ID of the user
+            max_missing: Largest number of missing spirit types a recipe may have
+            limit: Optional maximum number of results
+
+        Returns:
+            List of (recipe_id, missing spirit type IDs), fewest missing first
+        """
+        index = RecipeAvailabilityService._get_index(db, user_id)
+        with RecipeAvailabilityService._lock:
+            # Count in-stock spirit types per recipe by walking the inverted index
+            in_stock: Dict[int, int] = defaultdict(int)
+            for spirit_type_id in index.bottle_counts:
+                for recipe_id in index.recipes_by_spirit.get(spirit_type_id, ()):
+                    in_stock[recipe_id] += 1
+
+            results = []
+            for recipe_id, required in index.spirits_by_recipe.items():
+                missing_count = len(required) - in_stock.get(recipe_id, 0)
+                if missing_count <= max_missing:
+                    missing = {s for s in required if s not in index.bottle_counts} if missing_count else set()
+                    results.append((missing_count, recipe_id, missing))
+
+        results.sort(key=lambda item: (item[0], item[1]))
+        if limit is not None:
+            results = results[:limit]
+        return [(recipe_id, missing) for _, recipe_id, missing in results]
+
+    @staticmethod
+    def bottle_changed(user_id: int, old_spirit_type_id: Optional[int], new_spirit_type_id: Optional[int]):
+        """
+        Record a bottle write. Pass None as the old spirit type for a create and
+        as the new spirit type for a delete.
+        """
+        with RecipeAvailabilityService._lock:
+            RecipeAvailabilityService._changes[user_id] += 1
+            index = RecipeAvailabilityService._indexes.get(user_id)
+            if index is None:
+                return
+            index.adjust_bottles(old_spirit_type_id, -1)
+            index.adjust_bottles(new_spirit_type_id, 1)
+
+    @staticmethod
+    def recipe_changed(user_id: int, recipe_id: int, spirit_type_ids: Optional[Iterable[int]]):
+        """
+        Record a recipe write. Pass None as spirit_type_ids when the recipe was deleted.
+        """
+        with RecipeAvailabilityService._lock:
+            RecipeAvailabilityService._changes[user_id] += 1
+            index = RecipeAvailabilityService._indexes.get(user_id)
+            if index is None:
+                return
+            if spirit_type_ids is None:
+                index.remove_recipe(recipe_id)
+            else:
+                index.set_recipe(recipe_id, spirit_type_ids)
+
+    @staticmethod
+    def invalidate(user_id: int):
+        """Drop a user's index so it is rebuilt on the next query"""
+        with RecipeAvailabilityService._lock:
+            RecipeAvailabilityService._changes[user_id] += 1
+            RecipeAvailabilityService._indexes.pop(user_id, None)
+
+
+# insert=True: runs before versions.py's listener drops changed_collections
+@event.listens_for(Session, "after_commit", insert=True)
+def _advance_index_versions(session: Session):
+    changed = session.info.get("changed_collections")
+    if not changed:
+        return
+    with RecipeAvailabilityService._lock:
+        for user_id, bumps in changed.items():
+            index = RecipeAvailabilityService._indexes.get(user_id)
+            if index is not None:
+                for collection in (BOTTLES, RECIPES):
+                    index.versions[collection] += bumps[collection]
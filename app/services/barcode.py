@@ -1,7 +1,11 @@
-from typing import Optional
+from typing import List, Optional, Union
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.db.models.barcode_registry import BarcodeRegistry
-from app.schemas.barcode import BarcodeRegistryCreate
+from app.db.routing import ReadYourWritesService
+from app.db.session import run_db
+from app.schemas.barcode import BarcodeMatchResponse, BarcodeRegistryCreate, BarcodeRegistryResponse
+from app.services.trigram import ENTITY_BARCODE, TrigramIndexService
 
 
 class BarcodeService:
@@ -47,12 +51,16 @@ class BarcodeService:
         
         if existing:
             # Update existing entry
+            old_name = existing.name
             existing.name = barcode_data.name
             existing.brand = barcode_data.brand
             existing.flavor_profile = barcode_data.flavor_profile
             existing.capacity_ml = barcode_data.capacity_ml
             existing.spirit_type_name = barcode_data.spirit_type_name
+            if existing.name != old_name:
+                TrigramIndexService.index_name(db, ENTITY_BARCODE, existing.id, existing.name, old_name=old_name)
             db.commit()
+            BarcodeService._mark_written(user_id)
             db.refresh(existing)
             return existing
         
@@ -68,7 +76,60 @@ class BarcodeService:
         )
         
         db.add(registry_entry)
+        db.flush()
+        TrigramIndexService.index_name(db, ENTITY_BARCODE, registry_entry.id, registry_entry.name)
         db.commit()
+        BarcodeService._mark_written(user_id)
         db.refresh(registry_entry)
         return registry_entry
 
+    @staticmethod
+    def _mark_written(user_id: Optional[int]):
+        # The registry is not a versioned collection, so make the registering
+        # user's next lookups read from the primary here
+        if user_id is not None:
+            ReadYourWritesService.mark(user_id)
+
+
+class AsyncBarcodeService:
+    """
+    BarcodeService for async endpoints. Each method runs the sync service
+    through run_db and returns response models rather than ORM objects.
+    """
+
+    @staticmethod
+    async def lookup_barcode(db: Union[AsyncSession, Session], barcode: str) -> Optional[BarcodeRegistryResponse]:
+        def lookup(session: Session) -> Optional[BarcodeRegistryResponse]:
+            entry = BarcodeService.lookup_barcode(session, barcode)
+            return BarcodeRegistryResponse.model_validate(entry) if entry else None
+
+        return await run_db(db, lookup)
+
+    @staticmethod
+    async def register_barcode(
+        db: Union[AsyncSession, Session],
+        barcode_data: BarcodeRegistryCreate,
+        user_id: Optional[int] = None
+    ) -> BarcodeRegistryResponse:
+        def register(session: Session) -> BarcodeRegistryResponse:
+            return BarcodeRegistryResponse.model_validate(
+                BarcodeService.register_barcode(session, barcode_data, user_id)
+            )
+
+        return await run_db(db, register)
+
+    @staticmethod
+    async def match_names(
+        db: Union[AsyncSession, Session], query: str, limit: int = 10, threshold: float = 0.3
+    ) -> List[BarcodeMatchResponse]:
+        """Typo-tolerant lookup of registry entries by bottle name"""
+        def match(session: Session) -> List[BarcodeMatchResponse]:
+            matches = TrigramIndexService.match(
+                session, ENTITY_BARCODE, query, user_id=None, limit=limit, threshold=threshold
+            )
+            return [
+                BarcodeMatchResponse(entry=BarcodeRegistryResponse.model_validate(entry), similarity=score)
+                for entry, score in matches
+            ]
+
+        return await run_db(db, match)
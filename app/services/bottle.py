@@ -1,8 +1,24 @@
-from typing import Optional
+import base64
+import json
+from typing import Dict, List, Optional, Union
+from sqlalchemy import Row, and_, func, insert, or_
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.db.models.bottle import Bottle
 from app.db.models.spirit_type import SpiritType
-from app.schemas.bottle import BottleCreate, BottleUpdate
+from app.db.session import run_db
+from app.schemas.bottle import (
+    BottleCreate,
+    BottleUpdate,
+    BottleBulkRequest,
+    BottleBulkResult,
+    BottleMatchResponse,
+    BottleResponse,
+)
+from app.services.availability import RecipeAvailabilityService
+from app.services.loaders import BottleLoad
+from app.services.versions import BOTTLES, CollectionVersionService
+from app.services.trigram import ENTITY_BOTTLE, TrigramIndexService
 
 class BottleService:
     @staticmethod
@@ -13,18 +29,120 @@ class BottleService:
         
         bottle = Bottle(**bottle_in.dict(), user_id=user_id)
         db.add(bottle)
+        db.flush()
+        TrigramIndexService.index_name(db, ENTITY_BOTTLE, bottle.id, bottle.name, user_id)
+        CollectionVersionService.bump(db, user_id, BOTTLES)
         db.commit()
         db.refresh(bottle)
+        RecipeAvailabilityService.bottle_changed(user_id, None, bottle.spirit_type_id)
         return bottle
 
     @staticmethod
-    def get_bottles(db: Session, user_id: int, spirit_type_id: Optional[int] = None):
-        bottles = db.query(Bottle).filter(Bottle.user_id == user_id).all()
-        return bottles
+    def encode_cursor(bottle: Bottle) -> str:
+        """
+        Build an opaque pagination cursor pointing just past the given bottle.
+        """
+        raw = json.dumps([bottle.name, bottle.id]).encode("utf-8")
+        return base64.urlsafe_b64encode(raw).decode("ascii")
 
     @staticmethod
-    def get_bottle(db: Session, bottle_id: int, user_id: int):
-        return db.query(Bottle).filter(Bottle.id == bottle_id, Bottle.user_id == user_id).first()
+    def decode_cursor(cursor: str):
+        """
+        Decode a cursor produced by encode_cursor into a (name, id) tuple.
+        """
+        try:
+            name, bottle_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        except Exception:
+            raise ValueError("Invalid pagination cursor.")
+        if not isinstance(name, str) or not isinstance(bottle_id, int):
+            raise ValueError("Invalid pagination cursor.")
+        return name, bottle_id
+
+    @staticmethod
+    def get_bottles(
+        db: Session,
+        user_id: int,
+        spirit_type_id: Optional[int] = None,
+        brand: Optional[str] = None,
+        name: Optional[str] = None,
+        min_capacity_ml: Optional[int] = None,
+        max_capacity_ml: Optional[int] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        load=BottleLoad.NONE,
+    ) -> List[Bottle]:
+        """
+        Fetch a user's bottles ordered by (name, id), with all filters applied in SQL.
+        When a cursor is given, only bottles after that position are returned.
+        `load` is one of the BottleLoad strategies.
+        """
+        query = db.query(Bottle).options(*load())
+        return BottleService._filter_query(
+            query, user_id, spirit_type_id, brand, name, min_capacity_ml, max_capacity_ml, limit, cursor
+        ).all()
+
+    @staticmethod
+    def get_bottle_rows(
+        db: Session,
+        user_id: int,
+        spirit_type_id: Optional[int] = None,
+        brand: Optional[str] = None,
+        name: Optional[str] = None,
+        min_capacity_ml: Optional[int] = None,
+        max_capacity_ml: Optional[int] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> List[Row]:
+        """
+        Same as get_bottles, but returns plain column rows with the spirit type
+        joined in, for serializers that bypass the ORM and response models.
+        Rows expose the BottleResponse fields plus spirit_type_name.
+        """
+        query = db.query(
+            Bottle.id,
+            Bottle.name,
+            Bottle.brand,
+            Bottle.flavor_profile,
+            Bottle.capacity_ml,
+            Bottle.spirit_type_id,
+            SpiritType.name.label("spirit_type_name"),
+        ).outerjoin(SpiritType, SpiritType.id == Bottle.spirit_type_id)
+        return BottleService._filter_query(
+            query, user_id, spirit_type_id, brand, name, min_capacity_ml, max_capacity_ml, limit, cursor
+        ).all()
+
+    @staticmethod
+    def _filter_query(query, user_id, spirit_type_id, brand, name, min_capacity_ml, max_capacity_ml, limit, cursor):
+        query = query.filter(Bottle.user_id == user_id)
+
+        if spirit_type_id is not None:
+            query = query.filter(Bottle.spirit_type_id == spirit_type_id)
+        if brand:
+            query = query.filter(func.lower(Bottle.brand) == brand.strip().lower())
+        if name:
+            query = query.filter(Bottle.name.istartswith(name.strip(), autoescape=True))
+        if min_capacity_ml is not None:
+            query = query.filter(Bottle.capacity_ml >= min_capacity_ml)
+        if max_capacity_ml is not None:
+            query = query.filter(Bottle.capacity_ml <= max_capacity_ml)
+
+        if cursor:
+            last_name, last_id = BottleService.decode_cursor(cursor)
+            query = query.filter(
+                or_(
+                    Bottle.name > last_name,
+                    and_(Bottle.name == last_name, Bottle.id > last_id),
+                )
+            )
+
+        query = query.order_by(Bottle.name, Bottle.id)
+        if limit is not None:
+            query = query.limit(limit)
+        return query
+
+    @staticmethod
+    def get_bottle(db: Session, bottle_id: int, user_id: int, load=BottleLoad.NONE):
+        return db.query(Bottle).options(*load()).filter(Bottle.id == bottle_id, Bottle.user_id == user_id).first()
 
     @staticmethod
     def update_bottle(db: Session, bottle_id: int, bottle_in: BottleUpdate, user_id: int):
@@ -41,19 +159,218 @@ class BottleService:
             if not spirit_type:
                 raise ValueError(f"Spirit type with ID {bottle_in.spirit_type_id} does not exist.")
         
+        old_spirit_type_id = bottle.spirit_type_id
+        old_name = bottle.name
+
         # Update only provided fields
         for field, value in bottle_in.dict(exclude_unset=True).items():
             setattr(bottle, field, value)
+        if bottle.name != old_name:
+            TrigramIndexService.index_name(db, ENTITY_BOTTLE, bottle.id, bottle.name, user_id, old_name=old_name)
 
+        CollectionVersionService.bump(db, user_id, BOTTLES)
         db.commit()
         db.refresh(bottle)
+        RecipeAvailabilityService.bottle_changed(user_id, old_spirit_type_id, bottle.spirit_type_id)
         return bottle
 
     @staticmethod
     def delete_bottle(db: Session, bottle_id: int, user_id: int):
         bottle = db.query(Bottle).filter(Bottle.id == bottle_id, Bottle.user_id == user_id).first()
         if bottle:
+            spirit_type_id = bottle.spirit_type_id
+            TrigramIndexService.remove(db, ENTITY_BOTTLE, bottle.id, bottle.name, user_id)
             db.delete(bottle)
+            CollectionVersionService.bump(db, user_id, BOTTLES)
             db.commit()
+            RecipeAvailabilityService.bottle_changed(user_id, spirit_type_id, None)
             return True
         return False
+
+    @staticmethod
+    def bulk_write(db: Session, bulk_in: BottleBulkRequest, user_id: int) -> List[Dict]:
+        """
+        Apply a batch of creates, updates and deletes in a single transaction.
+        Spirit types and target bottles are each validated with one IN query;
+        items that fail validation are reported and skipped, the rest are
+        written with batched statements and committed once.
+
+        Returns one result dict per item: creates, then updates, then deletes.
+        """
+        results = []
+
+        referenced = {item.spirit_type_id for item in bulk_in.create}
+        referenced |= {item.spirit_type_id for item in bulk_in.update if item.spirit_type_id is not None}
+        valid_spirit_types = set()
+        if referenced:
+            valid_spirit_types = {
+                spirit_type_id for (spirit_type_id,) in db.query(SpiritType.id).filter(
+                    SpiritType.id.in_(referenced), SpiritType.user_id == user_id
+                )
+            }
+
+        target_ids = {item.id for item in bulk_in.update} | set(bulk_in.delete)
+        existing = {}
+        if target_ids:
+            existing = {
+                bottle.id: bottle for bottle in db.query(Bottle).filter(
+                    Bottle.id.in_(target_ids), Bottle.user_id == user_id
+                )
+            }
+
+        def failure(op: str, index: int, bottle_id: Optional[int], error: str) -> Dict:
+            return {"op": op, "index": index, "id": bottle_id, "success": False, "error": error}
+
+        created = []
+        for index, item in enumerate(bulk_in.create):
+            if item.spirit_type_id not in valid_spirit_types:
+                results.append(failure("create", index, None, f"Spirit type with ID {item.spirit_type_id} does not exist."))
+                continue
+            created.append((index, {**item.model_dump(), "user_id": user_id}))
+
+        touched = set()
+        updated = []
+        for index, item in enumerate(bulk_in.update):
+            bottle = existing.get(item.id)
+            if bottle is None:
+                results.append(failure("update", index, item.id, "Bottle not found"))
+                continue
+            if item.id in touched:
+                results.append(failure("update", index, item.id, "Bottle appears more than once in this batch."))
+                continue
+            if item.spirit_type_id is not None and item.spirit_type_id not in valid_spirit_types:
+                results.append(failure("update", index, item.id, f"Spirit type with ID {item.spirit_type_id} does not exist."))
+                continue
+            touched.add(item.id)
+            old_spirit_type_id, old_name = bottle.spirit_type_id, bottle.name
+            for field, value in item.model_dump(exclude_unset=True, exclude={"id"}).items():
+                setattr(bottle, field, value)
+            if bottle.name != old_name:
+                TrigramIndexService.index_name(db, ENTITY_BOTTLE, bottle.id, bottle.name, user_id, old_name=old_name)
+            updated.append((index, bottle.id, old_spirit_type_id, bottle.spirit_type_id))
+
+        deleted = []
+        for index, bottle_id in enumerate(bulk_in.delete):
+            bottle = existing.get(bottle_id)
+            if bottle is None:
+                results.append(failure("delete", index, bottle_id, "Bottle not found"))
+                continue
+            if bottle_id in touched:
+                results.append(failure("delete", index, bottle_id, "Bottle appears more than once in this batch."))
+                continue
+            touched.add(bottle_id)
+            deleted.append((index, bottle_id, bottle.spirit_type_id))
+            TrigramIndexService.remove(db, ENTITY_BOTTLE, bottle_id, bottle.name, user_id)
+            db.delete(bottle)
+
+        # Creates go out as one multi-row INSERT ... RETURNING, its rows in the order of the items
+        created_ids = []
+        if created:
+            returned_ids = db.execute(
+                insert(Bottle).returning(Bottle.id, sort_by_parameter_order=True),
+                [values for _, values in created],
+            ).scalars().all()
+            for (index, values), bottle_id in zip(created, returned_ids):
+                created_ids.append((index, bottle_id, values["spirit_type_id"]))
+                TrigramIndexService.index_name(db, ENTITY_BOTTLE, bottle_id, values["name"], user_id)
+
+        # Updates and deletes are flushed as batched executemany statements
+        CollectionVersionService.bump(db, user_id, BOTTLES)
+        db.commit()
+
+        saved_ids = [bottle_id for _, bottle_id, _ in created_ids] + [bottle_id for _, bottle_id, _, _ in updated]
+        saved = {}
+        if saved_ids:
+            saved = {
+                bottle.id: bottle for bottle in db.query(Bottle).options(*BottleLoad.SPIRIT_TYPE()).filter(
+                    Bottle.id.in_(saved_ids)
+                )
+            }
+
+        for index, bottle_id, spirit_type_id in created_ids:
+            RecipeAvailabilityService.bottle_changed(user_id, None, spirit_type_id)
+            results.append({"op": "create", "index": index, "id": bottle_id, "success": True, "bottle": saved.get(bottle_id)})
+        for index, bottle_id, old_spirit_type_id, spirit_type_id in updated:
+            RecipeAvailabilityService.bottle_changed(user_id, old_spirit_type_id, spirit_type_id)
+            results.append({"op": "update", "index": index, "id": bottle_id, "success": True, "bottle": saved.get(bottle_id)})
+        for index, bottle_id, spirit_type_id in deleted:
+            RecipeAvailabilityService.bottle_changed(user_id, spirit_type_id, None)
+            results.append({"op": "delete", "index": index, "id": bottle_id, "success": True})
+
+        order = {"create": 0, "update": 1, "delete": 2}
+        results.sort(key=lambda result: (order[result["op"]], result["index"]))
+        return results
+
+
+class AsyncBottleService:
+    """
+    BottleService for async endpoints. Each method runs the sync service
+    through run_db and returns response models built while the session can
+    still load relationships.
+    """
+
+    @staticmethod
+    async def create_bottle(db: Union[AsyncSession, Session], bottle_in: BottleCreate, user_id: int) -> BottleResponse:
+        def create(session: Session) -> BottleResponse:
+            return BottleResponse.model_validate(BottleService.create_bottle(session, bottle_in, user_id))
+
+        return await run_db(db, create)
+
+    @staticmethod
+    async def bulk_write(
+        db: Union[AsyncSession, Session], bulk_in: BottleBulkRequest, user_id: int
+    ) -> List[BottleBulkResult]:
+        def write(session: Session) -> List[BottleBulkResult]:
+            results = BottleService.bulk_write(session, bulk_in, user_id)
+            return [BottleBulkResult.model_validate(result, from_attributes=True) for result in results]
+
+        return await run_db(db, write)
+
+    @staticmethod
+    async def get_bottles(db: Union[AsyncSession, Session], user_id: int, **filters) -> List[BottleResponse]:
+        """get_bottles with the spirit type loaded; takes the same filters"""
+        def fetch(session: Session) -> List[BottleResponse]:
+            bottles = BottleService.get_bottles(session, user_id, load=BottleLoad.SPIRIT_TYPE, **filters)
+            return [BottleResponse.model_validate(bottle) for bottle in bottles]
+
+        return await run_db(db, fetch)
+
+    @staticmethod
+    async def get_bottle_rows(db: Union[AsyncSession, Session], user_id: int, **filters) -> List[Row]:
+        return await run_db(db, BottleService.get_bottle_rows, user_id, **filters)
+
+    @staticmethod
+    async def get_bottle(db: Union[AsyncSession, Session], bottle_id: int, user_id: int) -> Optional[BottleResponse]:
+        def fetch(session: Session) -> Optional[BottleResponse]:
+            bottle = BottleService.get_bottle(session, bottle_id, user_id, load=BottleLoad.SPIRIT_TYPE)
+            return BottleResponse.model_validate(bottle) if bottle else None
+
+        return await run_db(db, fetch)
+
+    @staticmethod
+    async def update_bottle(
+        db: Union[AsyncSession, Session], bottle_id: int, bottle_in: BottleUpdate, user_id: int
+    ) -> Optional[BottleResponse]:
+        def update(session: Session) -> Optional[BottleResponse]:
+            bottle = BottleService.update_bottle(session, bottle_id, bottle_in, user_id)
+            return BottleResponse.model_validate(bottle) if bottle else None
+
+        return await run_db(db, update)
+
+    @staticmethod
+    async def delete_bottle(db: Union[AsyncSession, Session], bottle_id: int, user_id: int) -> bool:
+        return await run_db(db, BottleService.delete_bottle, bottle_id, user_id)
+
+    @staticmethod
+    async def match_names(
+        db: Union[AsyncSession, Session], query: str, user_id: int, limit: int = 10, threshold: float = 0.3
+    ) -> List[BottleMatchResponse]:
+        """Typo-tolerant lookup of the user's bottles by name"""
+        def match(session: Session) -> List[BottleMatchResponse]:
+            matches = TrigramIndexService.match(
+                session, ENTITY_BOTTLE, query, user_id=user_id, limit=limit, threshold=threshold,
+                load=BottleLoad.SPIRIT_TYPE,
+            )
+            return [BottleMatchResponse(bottle=bottle, similarity=score) for bottle, score in matches]
+
+        return await run_db(db, match)
@@ -0,0 +1,156 @@
+"""
+Streaming export of a user's collection.
+
+Rows are read in fixed-size batches with yield_per and turned into plain dicts
+one at a time, so the export never holds a whole collection in memory.
+"""
+import csv
+import io
+import json
+from typing import Dict, Iterable, Iterator, List
+
+from sqlalchemy.orm import Session
+
+from app.db.models.bottle import Bottle
+from app.db.models.recipe import Recipe
+from app.db.models.spirit_type import SpiritType
+from app.services.loaders import RecipeLoad
+from app.services.recipe_catalog import RecipeCatalogService
+
+COLLECTIONS = ("spirit_types", "bottles", "recipes")
+
+# Column order for CSV exports; recipes match the recipe import CSV format
+CSV_COLUMNS = {
+    "spirit_types": ["id", "name"],
+    "bottles": ["id", "name", "brand", "flavor_profile", "capacity_ml", "spirit_type_id", "spirit_type"],
+    "recipes": ["id", "name", "instructions", "ingredients", "spirit_types"],
+}
+
+
+class ExportService:
+    """Service for streaming a user's bottles, recipes and spirit types"""
+
+    # Rows fetched from the database per round trip
+    BATCH_SIZE = 1000
+
+    @staticmethod
+    def iter_spirit_types(db: Session, user_id: int) -> Iterator[Dict]:
+        query = (
+            db.query(SpiritType.id, SpiritType.name)
+            .filter(SpiritType.user_id == user_id)
+            .order_by(SpiritType.id)
+            .execution_options(stream_results=True)
+            .yield_per(ExportService.BATCH_SIZE)
+        )
+        for spirit_type_id, name in query:
+            yield {"id": spirit_type_id, "name": name}
+
+    @staticmethod
+    def iter_bottles(db: Session, user_id: int) -> Iterator[Dict]:
+        query = (
+            db.query(
+                Bottle.id,
+                Bottle.name,
+                Bottle.brand,
+                Bottle.flavor_profile,
+                Bottle.capacity_ml,
+                Bottle.spirit_type_id,
+                SpiritType.name,
+            )
+            .outerjoin(SpiritType, SpiritType.id == Bottle.spirit_type_id)
+            .filter(Bottle.user_id == user_id)
+            .order_by(Bottle.id)
+            .execution_options(stream_results=True)
+            .yield_per(ExportService.BATCH_SIZE)
+        )
+        for row in query:
+            yield {
+                "id": row[0],
+                "name": row[1],
+                "brand": row[2],
+                "flavor_profile": row[3],
+                "capacity_ml": row[4],
+                "spirit_type_id": row[5],
+                "spirit_type": row[6],
+            }
+
+    @staticmethod
+    def iter_recipes(db: Session, user_id: int) -> Iterator[Dict]:
+        # selectinload runs one extra query per yielded batch, not per recipe
+        query = (
+            db.query(Recipe)
+            .options(*RecipeLoad.SPIRIT_TYPES_BATCHED())
+            .filter(Recipe.user_id == user_id)
+            .order_by(Recipe.id)
+            .execution_options(stream_results=True)
+            .yield_per(ExportService.BATCH_SIZE)
+        )
+        for recipe in query:
+            yield {
+                "id": recipe.id,
+                "name": recipe.name,
+                "instructions": recipe.instructions,
+                "ingredients": recipe.ingredients,
+                "spirit_types": [spirit_type.name for spirit_type in recipe.spirit_types],
+            }
+        # Catalog recipes are read once and already resolved to the user's spirit types
+        for recipe in RecipeCatalogService.get_visible_recipes(db, user_id):
+            yield {
+                "id": recipe.id,
+                "name": recipe.name,
+                "instructions": recipe.instructions,
+                "ingredients": recipe.ingredients,
+                "spirit_types": [spirit_type.name for spirit_type in recipe.spirit_types],
+            }
+
+    @staticmethod
+    def iter_collection(db: Session, collection: str, user_id: int) -> Iterator[Dict]:
+        if collection == "spirit_types":
+            return ExportService.iter_spirit_types(db, user_id)
+        if collection == "bottles":
+            return ExportService.iter_bottles(db, user_id)
+        if collection == "recipes":
+            return ExportService.iter_recipes(db, user_id)
+        raise ValueError(f"Unknown collection '{collection}'")
+
+    @staticmethod
+    def stream_ndjson(db: Session, user_id: int, collections: Iterable[str]) -> Iterator[str]:
+        """
+        Yield NDJSON text, one object per line tagged with its collection type.
+        Lines are grouped into chunks of BATCH_SIZE to keep per-write overhead low.
+        """
+        buffer: List[str] = []
+        for collection in collections:
+            record_type = collection[:-1]  # "bottles" -> "bottle"
+            for record in ExportService.iter_collection(db, collection, user_id):
+                buffer.append(json.dumps({"type": record_type, **record}))
+                if len(buffer) >= ExportService.BATCH_SIZE:
+                    yield "\n".join(buffer) + "\n"
+                    buffer = []
+        if buffer:
+            yield "\n".join(buffer) + "\n"
+
+    @staticmethod
+    def stream_csv(db: Session, user_id: int, collection: str) -> Iterator[str]:
+        """
+        Yield CSV text for a single collection, header row first.
+        Nested values are flattened the way the recipe import expects:
+        ingredients as a JSON array and spirit type names joined with ';'.
+        """
+        output = io.StringIO()
+        writer = csv.writer(output)
+        columns = CSV_COLUMNS[collection]
+        writer.writerow(columns)
+
+        rows = 0
+        for record in ExportService.iter_collection(db, collection, user_id):
+            if collection == "recipes":
+                record["ingredients"] = json.dumps(record["ingredients"]) if record["ingredients"] else ""
+                record["spirit_types"] = ";".join(record["spirit_types"])
+            writer.writerow([record[column] for column in columns])
+            rows += 1
+            if rows % ExportService.BATCH_SIZE == 0:
+                yield output.getvalue()
+                output.seek(0)
+                output.truncate(0)
+        yield output.getvalue()
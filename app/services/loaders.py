@@ -0,0 +1,31 @@
+"""
+Eager-loading strategies for service queries.
+
+Endpoints pick the strategy that matches the relationships their response model
+serializes, so related rows are loaded with the parent query instead of lazily,
+one query per row. Strategies are callables returning loader options so they are
+only built once the mappers are configured.
+"""
+from sqlalchemy.orm import joinedload, selectinload, subqueryload
+
+from app.db.models.bottle import Bottle
+from app.db.models.recipe import Recipe
+
+
+class BottleLoad:
+    """Loader options for Bottle queries"""
+    # Plain rows, relationships stay lazy
+    NONE = staticmethod(lambda: ())
+    # Many-to-one spirit type joined into the same SELECT
+    SPIRIT_TYPE = staticmethod(lambda: (joinedload(Bottle.spirit_type),))
+
+
+class RecipeLoad:
+    """Loader options for Recipe queries"""
+    # Plain rows, relationships stay lazy
+    NONE = staticmethod(lambda: ())
+    # Many-to-many spirit types fetched in one extra SELECT for the whole result;
+    # selectinload would send one SELECT ... IN per 500 recipes
+    SPIRIT_TYPES = staticmethod(lambda: (subqueryload(Recipe.spirit_types),))
+    # The same, one SELECT ... IN per batch, for queries streamed with yield_per
+    SPIRIT_TYPES_BATCHED = staticmethod(lambda: (selectinload(Recipe.spirit_types),))
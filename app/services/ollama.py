@@ -1,11 +1,13 @@
 import asyncio
 import logging
-from typing import Dict, List, Any, Optional, Callable
+from typing import TYPE_CHECKING, Dict, List, Any, Optional, Callable
 from dataclasses import dataclass
-from ollama import AsyncClient
 from pydantic import BaseModel
 from app.core.settings import settings
 
+if TYPE_CHECKING:
+    from ollama import AsyncClient
+
 logger = logging.getLogger(__name__)
 
 
@@ -75,8 +77,23 @@ class OllamaService:
             model_name: Name of the model to use (defaults to settings.OLLAMA_MODEL)
         """
         self.model_name = model_name or settings.OLLAMA_MODEL
-        self.client = AsyncClient(host=settings.OLLAMA_HOST)
-        logger.info(f"Initialized Ollama service with model: {self.model_name}, host: {settings.OLLAMA_HOST}")
+        self._client: Optional["AsyncClient"] = None
+
+    @property
+    def client(self) -> "AsyncClient":
+        """The Ollama client, created on first use: importing ollama and its HTTP stack slows startup"""
+        if self._client is None:
+            from ollama import AsyncClient
+
+            self._client = AsyncClient(host=settings.OLLAMA_HOST)
+            logger.info(f"Initialized Ollama service with model: {self.model_name}, host: {settings.OLLAMA_HOST}")
+        return self._client
+
+    async def close(self):
+        """Close the client's connections, if it was ever created"""
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
     
     def check_tool_calls(self, response) -> bool:
         """Check if the response contains tool calls"""
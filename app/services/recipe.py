@@ -1,8 +1,17 @@
+from collections import defaultdict
+from sqlalchemy import Row, or_
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple, Union
 from app.db.models.recipe import Recipe
+from app.db.models.shared_table import recipes_to_spirits
 from app.db.models.spirit_type import SpiritType
-from app.schemas.recipe import RecipeCreate, RecipeUpdate
+from app.db.session import run_db
+from app.schemas.recipe import RecipeCreate, RecipeUpdate, RecipeResponse, RecipeAvailabilityResponse
+from app.services.availability import RecipeAvailabilityService
+from app.services.loaders import RecipeLoad
+from app.services.recipe_catalog import CatalogRecipe, RecipeCatalogService
+from app.services.versions import RECIPES, CollectionVersionService
 
 class RecipeService:
     @staticmethod
@@ -28,24 +37,86 @@ class RecipeService:
 
         # Save to the database
         db.add(recipe)
+        CollectionVersionService.bump(db, user_id, RECIPES)
         db.commit()
         db.refresh(recipe)
+        RecipeAvailabilityService.recipe_changed(user_id, recipe.id, [st.id for st in recipe.spirit_types])
         return recipe
 
     @staticmethod
-    def get_recipes(db: Session, user_id: int) -> List[Recipe]:
-        recipes = db.query(Recipe).filter(Recipe.user_id == user_id).all()
+    def _get_own_recipe(db: Session, recipe_id: int, user_id: int, load=RecipeLoad.NONE) -> Optional[Recipe]:
+        """
+        Find one of the user's own recipes by ID. The ID of a catalog recipe the
+        user has edited finds their copy.
+        """
+        return db.query(Recipe).options(*load()).filter(
+            or_(Recipe.id == recipe_id, Recipe.catalog_recipe_id == recipe_id),
+            Recipe.user_id == user_id,
+        ).first()
+
+    @staticmethod
+    def get_recipes(db: Session, user_id: int, load=RecipeLoad.NONE) -> List[Union[Recipe, CatalogRecipe]]:
+        """The user's own recipes followed by the catalog recipes they see"""
+        recipes = db.query(Recipe).options(*load()).filter(Recipe.user_id == user_id).all()
+        return recipes + RecipeCatalogService.get_visible_recipes(db, user_id)
+
+    @staticmethod
+    def get_recipe_rows(db: Session, user_id: int) -> Tuple[List[Row], Dict[int, List[Tuple[int, str]]]]:
+        """
+        Column-only version of get_recipes for serializers that bypass the ORM.
+        Returns the recipe rows and each recipe's (id, name) spirit type rows,
+        fetched with one query each.
+        """
+        recipes = (
+            db.query(Recipe.id, Recipe.name, Recipe.instructions, Recipe.ingredients)
+            .filter(Recipe.user_id == user_id)
+            .all()
+        )
+        spirit_types = defaultdict(list)
+        pairs = (
+            db.query(recipes_to_spirits.c.recipe_id, SpiritType.id, SpiritType.name)
+            .join(SpiritType, SpiritType.id == recipes_to_spirits.c.spirit_type_id)
+            .filter(SpiritType.user_id == user_id)
+        )
+        for recipe_id, spirit_type_id, name in pairs:
+            spirit_types[recipe_id].append((spirit_type_id, name))
+        for recipe in RecipeCatalogService.get_visible_recipes(db, user_id):
+            recipes.append((recipe.id, recipe.name, recipe.instructions, recipe.ingredients))
+            spirit_types[recipe.id] = [(spirit_type.id, spirit_type.name) for spirit_type in recipe.spirit_types]
+        return recipes, spirit_types
+
+    @staticmethod
+    def get_recipes_by_ids(
+        db: Session, recipe_ids: List[int], user_id: int, load=RecipeLoad.NONE
+    ) -> List[Union[Recipe, CatalogRecipe]]:
+        if not recipe_ids:
+            return []
+        recipes = db.query(Recipe).options(*load()).filter(Recipe.id.in_(recipe_ids), Recipe.user_id == user_id).all()
+        if len(recipes) < len(recipe_ids):
+            found = {recipe.id for recipe in recipes}
+            remaining = [recipe_id for recipe_id in recipe_ids if recipe_id not in found]
+            recipes += RecipeCatalogService.get_visible_recipes(db, user_id, remaining)
         return recipes
 
     @staticmethod
-    def get_recipe(db: Session, recipe_id: int, user_id: int) -> Optional[Recipe]:
-        return db.query(Recipe).filter(Recipe.id == recipe_id, Recipe.user_id == user_id).first()
+    def get_recipe(
+        db: Session, recipe_id: int, user_id: int, load=RecipeLoad.NONE
+    ) -> Optional[Union[Recipe, CatalogRecipe]]:
+        recipe = RecipeService._get_own_recipe(db, recipe_id, user_id, load)
+        if recipe is None:
+            return RecipeCatalogService.get_visible_recipe(db, recipe_id, user_id)
+        return recipe
 
     @staticmethod
     def update_recipe(db: Session, recipe_id: int, recipe_in: RecipeUpdate, user_id: int) -> Optional[Recipe]:
-        recipe = db.query(Recipe).filter(Recipe.id == recipe_id, Recipe.user_id == user_id).first()
+        recipe = RecipeService._get_own_recipe(db, recipe_id, user_id)
+        copied = False
         if not recipe:
-            return None
+            # The first edit of a catalog recipe goes to the user's own copy of it
+            recipe = RecipeCatalogService.materialize(db, recipe_id, user_id)
+            if not recipe:
+                return None
+            copied = True
         
         # Update spirit types if provided
         if recipe_in.spirit_type_ids is not None:
@@ -67,15 +138,106 @@ class RecipeService:
         for field, value in update_data.items():
             setattr(recipe, field, value)
         
+        CollectionVersionService.bump(db, user_id, RECIPES)
         db.commit()
         db.refresh(recipe)
+        if copied:
+            RecipeAvailabilityService.recipe_changed(user_id, recipe_id, None)
+        if copied or recipe_in.spirit_type_ids is not None:
+            RecipeAvailabilityService.recipe_changed(user_id, recipe.id, [st.id for st in recipe.spirit_types])
         return recipe
 
     @staticmethod
     def delete_recipe(db: Session, recipe_id: int, user_id: int) -> bool:
-        recipe = db.query(Recipe).filter(Recipe.id == recipe_id, Recipe.user_id == user_id).first()
+        recipe = RecipeService._get_own_recipe(db, recipe_id, user_id)
         if recipe:
+            # Deleting a copy leaves its catalog recipe hidden
+            deleted_id = recipe.id
             db.delete(recipe)
-            db.commit()
-            return True
-        return False
\ No newline at end of file
+        elif RecipeCatalogService.get_visible_recipe(db, recipe_id, user_id):
+            deleted_id = recipe_id
+            RecipeCatalogService.hide(db, recipe_id, user_id)
+        else:
+            return False
+        CollectionVersionService.bump(db, user_id, RECIPES)
+        db.commit()
+        RecipeAvailabilityService.recipe_changed(user_id, deleted_id, None)
+        return True
+
+
+class AsyncRecipeService:
+    """
+    RecipeService for async endpoints. Each method runs the sync service
+    through run_db and returns response models built while the session can
+    still load relationships.
+    """
+
+    @staticmethod
+    async def create_recipe(db: Union[AsyncSession, Session], recipe_in: RecipeCreate, user_id: int) -> RecipeResponse:
+        def create(session: Session) -> RecipeResponse:
+            return RecipeResponse.model_validate(RecipeService.create_recipe(session, recipe_in, user_id))
+
+        return await run_db(db, create)
+
+    @staticmethod
+    async def get_recipes(db: Union[AsyncSession, Session], user_id: int) -> List[RecipeResponse]:
+        def fetch(session: Session) -> List[RecipeResponse]:
+            recipes = RecipeService.get_recipes(session, user_id, load=RecipeLoad.SPIRIT_TYPES)
+            return [RecipeResponse.model_validate(recipe) for recipe in recipes]
+
+        return await run_db(db, fetch)
+
+    @staticmethod
+    async def get_recipe_rows(
+        db: Union[AsyncSession, Session], user_id: int
+    ) -> Tuple[List[Row], Dict[int, List[Tuple[int, str]]]]:
+        return await run_db(db, RecipeService.get_recipe_rows, user_id)
+
+    @staticmethod
+    async def get_available_recipes(
+        db: Union[AsyncSession, Session], user_id: int, max_missing: int = 0, limit: Optional[int] = None
+    ) -> List[RecipeAvailabilityResponse]:
+        """The recipes the user can make, fewest missing spirit types first"""
+        def fetch(session: Session) -> List[RecipeAvailabilityResponse]:
+            ranked = RecipeAvailabilityService.get_available_recipes(
+                session, user_id, max_missing=max_missing, limit=limit
+            )
+            recipes = RecipeService.get_recipes_by_ids(
+                session, [recipe_id for recipe_id, _ in ranked], user_id, load=RecipeLoad.SPIRIT_TYPES
+            )
+            recipes_by_id = {recipe.id: recipe for recipe in recipes}
+            results = []
+            for recipe_id, missing in ranked:
+                recipe = recipes_by_id.get(recipe_id)
+                if recipe is None:
+                    continue
+                results.append(RecipeAvailabilityResponse(
+                    recipe=RecipeResponse.model_validate(recipe),
+                    missing_count=len(missing),
+                    missing_spirit_types=[st for st in recipe.spirit_types if st.id in missing],
+                ))
+            return results
+
+        return await run_db(db, fetch)
+
+    @staticmethod
+    async def get_recipe(db: Union[AsyncSession, Session], recipe_id: int, user_id: int) -> Optional[RecipeResponse]:
+        def fetch(session: Session) -> Optional[RecipeResponse]:
+            recipe = RecipeService.get_recipe(session, recipe_id, user_id, load=RecipeLoad.SPIRIT_TYPES)
+            return RecipeResponse.model_validate(recipe) if recipe else None
+
+        return await run_db(db, fetch)
+
+    @staticmethod
+    async def update_recipe(
+        db: Union[AsyncSession, Session], recipe_id: int, recipe_in: RecipeUpdate, user_id: int
+    ) -> Optional[RecipeResponse]:
+        def update(session: Session) -> Optional[RecipeResponse]:
+            recipe = RecipeService.update_recipe(session, recipe_id, recipe_in, user_id)
+            return RecipeResponse.model_validate(recipe) if recipe else None
+
+        return await run_db(db, update)
+
+    @staticmethod
+    async def delete_recipe(db: Union[AsyncSession, Session], recipe_id: int, user_id: int) -> bool:
+        return await run_db(db, RecipeService.delete_recipe, recipe_id, user_id)
@@ -0,0 +1,198 @@
+"""
+Shared catalog of default recipes.
+
+The default recipes are stored once, as recipes with no owner that link to
+ownerless catalog spirit types, instead of being copied into every account.
+Seeding a user only creates the user's own spirit types, each pointing at
+the catalog spirit type it stands in for, and switches the catalog on.
+
+A user sees every catalog recipe they have not hidden, with its spirit types
+resolved to their own. Editing a catalog recipe materializes a private copy
+that remembers where it came from and hides the original; deleting one only
+hides it. The catalog recipe's ID keeps resolving to the user's copy.
+
+The catalog is read once per process and shared by every user. The cache is
+per process: it is cleared when this process syncs the catalog with the seed
+file, but not when another process does, for instance a newly deployed one
+starting up with a changed seed file. Restart API processes after such a
+deploy, as after the reseed job, so they stop serving the old catalog.
+"""
+import copy
+import threading
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.db.models.recipe import Recipe
+from app.db.models.shared_table import hidden_catalog_recipes, recipes_to_spirits
+from app.db.models.spirit_type import SpiritType
+from app.db.models.user import User
+from app.db.upsert import insert_ignore
+
+
+@dataclass(frozen=True)
+class CatalogEntry:
+    """A catalog recipe as stored, linking to catalog spirit type IDs"""
+
+    id: int
+    name: str
+    instructions: str
+    ingredients: Optional[list]
+    spirit_type_ids: Tuple[int, ...]
+
+
+@dataclass
+class CatalogRecipe:
+    """
+    A catalog recipe as one user sees it, with the user's own spirit types.
+    Has the same attributes as Recipe, so the recipe schemas accept it.
+    """
+
+    id: int
+    name: str
+    instructions: str
+    ingredients: Optional[list]
+    spirit_types: List[SpiritType]
+
+
+class RecipeCatalogService:
+    """Service for reading the shared recipe catalog and copying recipes out of it"""
+
+    _entries: Optional[Dict[int, CatalogEntry]] = None
+    _lock = threading.Lock()
+
+    @staticmethod
+    def get_entries(db: Session) -> Dict[int, CatalogEntry]:
+        """Catalog recipes by ID, read from the database once per process until clear()"""
+        entries = RecipeCatalogService._entries
+        if entries is not None:
+            return entries
+
+        spirit_type_ids: Dict[int, List[int]] = {}
+        pairs = (
+            db.query(recipes_to_spirits.c.recipe_id, recipes_to_spirits.c.spirit_type_id)
+            .join(Recipe, Recipe.id == recipes_to_spirits.c.recipe_id)
+            .filter(Recipe.user_id.is_(None))
+        )
+        for recipe_id, spirit_type_id in pairs:
+            spirit_type_ids.setdefault(recipe_id, []).append(spirit_type_id)
+
+        rows = (
+            db.query(Recipe.id, Recipe.name, Recipe.instructions, Recipe.ingredients)
+            .filter(Recipe.user_id.is_(None))
+            .order_by(Recipe.id)
+        )
+        entries = {
+            recipe_id: CatalogEntry(recipe_id, name, instructions, ingredients, tuple(spirit_type_ids.get(recipe_id, ())))
+            for recipe_id, name, instructions, ingredients in rows
+        }
+        # An empty catalog is not cached: it is created by the first seed
+        if entries:
+            with RecipeCatalogService._lock:
+                RecipeCatalogService._entries = entries
+        return entries
+
+    @staticmethod
+    def clear():
+        """Forget the loaded catalog so it is read again on next use"""
+        with RecipeCatalogService._lock:
+            RecipeCatalogService._entries = None
+
+    @staticmethod
+    def is_enabled(db: Session, user_id: int) -> bool:
+        return bool(db.query(User.recipe_catalog).filter(User.id == user_id).scalar())
+
+    @staticmethod
+    def get_hidden_ids(db: Session, user_id: int) -> Optional[Set[int]]:
+        """
+        The catalog recipes the user has hidden, or None for users without the
+        catalog, read together in one query
+        """
+        rows = (
+            db.query(User.recipe_catalog, hidden_catalog_recipes.c.recipe_id)
+            .outerjoin(hidden_catalog_recipes, hidden_catalog_recipes.c.user_id == User.id)
+            .filter(User.id == user_id)
+            .all()
+        )
+        if not rows or not rows[0].recipe_catalog:
+            return None
+        return {recipe_id for _, recipe_id in rows if recipe_id is not None}
+
+    @staticmethod
+    def get_spirit_type_map(db: Session, user_id: int) -> Dict[int, SpiritType]:
+        """The user's spirit types keyed by the catalog spirit type each stands in for"""
+        spirit_types = db.query(SpiritType).filter(
+            SpiritType.user_id == user_id, SpiritType.catalog_spirit_type_id.isnot(None)
+        )
+        return {spirit_type.catalog_spirit_type_id: spirit_type for spirit_type in spirit_types}
+
+    @staticmethod
+    def get_visible_recipes(
+        db: Session, user_id: int, recipe_ids: Optional[Iterable[int]] = None
+    ) -> List[CatalogRecipe]:
+        """
+        Catalog recipes the user has not hidden, optionally limited to recipe_ids.
+        Returns nothing for users without the catalog.
+        """
+        entries = RecipeCatalogService.get_entries(db)
+        if recipe_ids is not None:
+            entries = {recipe_id: entries[recipe_id] for recipe_id in recipe_ids if recipe_id in entries}
+        if not entries:
+            return []
+
+        hidden = RecipeCatalogService.get_hidden_ids(db, user_id)
+        if hidden is None:
+            return []
+        spirit_type_map = RecipeCatalogService.get_spirit_type_map(db, user_id)
+        return [
+            CatalogRecipe(
+                id=entry.id,
+                name=entry.name,
+                instructions=entry.instructions,
+                ingredients=entry.ingredients,
+                # Catalog spirit types the user has deleted are left out, as for their own recipes
+                spirit_types=[
+                    spirit_type_map[spirit_type_id]
+                    for spirit_type_id in entry.spirit_type_ids
+                    if spirit_type_id in spirit_type_map
+                ],
+            )
+            for entry in entries.values()
+            if entry.id not in hidden
+        ]
+
+    @staticmethod
+    def get_visible_recipe(db: Session, recipe_id: int, user_id: int) -> Optional[CatalogRecipe]:
+        if recipe_id not in RecipeCatalogService.get_entries(db):
+            return None
+        recipes = RecipeCatalogService.get_visible_recipes(db, user_id, [recipe_id])
+        return recipes[0] if recipes else None
+
+    @staticmethod
+    def hide(db: Session, recipe_id: int, user_id: int):
+        """Hide a catalog recipe from a user in the caller's transaction; hiding it twice is harmless"""
+        db.execute(insert_ignore(db, hidden_catalog_recipes).values(user_id=user_id, recipe_id=recipe_id))
+
+    @staticmethod
+    def materialize(db: Session, recipe_id: int, user_id: int) -> Optional[Recipe]:
+        """
+        Give the user their own copy of a visible catalog recipe and hide the
+        original, in the caller's transaction. Returns None if the recipe is
+        not a catalog recipe the user can see.
+        """
+        catalog_recipe = RecipeCatalogService.get_visible_recipe(db, recipe_id, user_id)
+        if catalog_recipe is None:
+            return None
+        recipe = Recipe(
+            name=catalog_recipe.name,
+            instructions=catalog_recipe.instructions,
+            # The cached catalog is shared; the copy gets its own ingredient list
+            ingredients=copy.deepcopy(catalog_recipe.ingredients),
+            spirit_types=catalog_recipe.spirit_types,
+            user_id=user_id,
+            catalog_recipe_id=recipe_id,
+        )
+        db.add(recipe)
+        RecipeCatalogService.hide(db, recipe_id, user_id)
+        return recipe
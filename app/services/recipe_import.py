@@ -0,0 +1,189 @@
+"""
+Streaming bulk import of recipes from JSON or CSV files.
+
+Records are parsed incrementally from the uploaded file and written in
+fixed-size chunks, each committed on its own, so memory use depends on the
+chunk size rather than on the file size.
+"""
+import codecs
+import csv
+import json
+import logging
+from typing import BinaryIO, Dict, Iterable, Iterator, List
+
+import ijson
+from pydantic import ValidationError
+from sqlalchemy.orm import Session
+
+from app.db.models.recipe import Recipe
+from app.db.models.shared_table import recipes_to_spirits
+from app.db.models.spirit_type import SpiritType, normalize_spirit_type_name
+from app.schemas.recipe import RecipeImportRecord
+from app.services.availability import RecipeAvailabilityService
+from app.services.trigram import ENTITY_SPIRIT_TYPE, TrigramIndexService
+from app.services.versions import RECIPES, SPIRIT_TYPES, CollectionVersionService
+
+logger = logging.getLogger(__name__)
+
+
+class RecipeImportService:
+    """Service for importing large recipe files"""
+
+    # Recipes written per transaction
+    CHUNK_SIZE = 500
+    # Number of per-record error messages kept in the progress report
+    MAX_REPORTED_ERRORS = 20
+    # Separator between spirit type names in the CSV spirit_types column
+    CSV_LIST_SEPARATOR = ";"
+
+    @staticmethod
+    def iter_json_records(stream: BinaryIO) -> Iterator[Dict]:
+        """
+        Yield recipe objects from a JSON file without loading it whole.
+        Accepts either the seed file shape ({"recipes": [...]}) or a bare array.
+        """
+        first = b""
+        while True:
+            byte = stream.read(1)
+            if not byte or not byte.isspace():
+                first = byte
+                break
+        stream.seek(0)
+        prefix = "item" if first == b"[" else "recipes.item"
+        yield from ijson.items(stream, prefix, use_float=True)
+
+    @staticmethod
+    def iter_csv_records(stream: BinaryIO) -> Iterator[Dict]:
+        """
+        Yield recipe records from a CSV file with a header row.
+        Columns: name, instructions, ingredients (a JSON array of
+        {name, quantity, unit} objects) and spirit_types (names separated by ';').
+        """
+        reader = csv.DictReader(codecs.iterdecode(stream, "utf-8-sig"))
+        for row in reader:
+            ingredients = (row.get("ingredients") or "").strip()
+            spirit_types = (row.get("spirit_types") or "").split(RecipeImportService.CSV_LIST_SEPARATOR)
+            yield {
+                "name": row.get("name"),
+                "instructions": row.get("instructions"),
+                "ingredients": json.loads(ingredients) if ingredients else None,
+                "spirit_types": [name.strip() for name in spirit_types if name.strip()],
+            }
+
+    @staticmethod
+    def _load_spirit_type_map(db: Session, user_id: int) -> Dict[str, int]:
+        rows = db.query(SpiritType.id, SpiritType.normalized_name).filter(SpiritType.user_id == user_id).all()
+        return {normalized_name: spirit_type_id for spirit_type_id, normalized_name in rows}
+
+    @staticmethod
+    def _resolve_spirit_types(db: Session, user_id: int, names: List[str], spirit_type_map: Dict[str, int]) -> List[int]:
+        spirit_type_ids = []
+        for name in names:
+            key = normalize_spirit_type_name(name)
+            if not key:
+                continue
+            if key not in spirit_type_map:
+                spirit_type = SpiritType(name=name.strip(), user_id=user_id)
+                db.add(spirit_type)
+                db.flush()
+                TrigramIndexService.index_name(db, ENTITY_SPIRIT_TYPE, spirit_type.id, spirit_type.name, user_id)
+                spirit_type_map[key] = spirit_type.id
+            if spirit_type_map[key] not in spirit_type_ids:
+                spirit_type_ids.append(spirit_type_map[key])
+        return spirit_type_ids
+
+    @staticmethod
+    def _write_chunk(db: Session, user_id: int, chunk: List[tuple]) -> int:
+        recipes = [
+            Recipe(
+                name=recipe_in.name,
+                instructions=recipe_in.instructions,
+                ingredients=[ing.model_dump() for ing in recipe_in.ingredients] if recipe_in.ingredients else None,
+                user_id=user_id,
+            )
+            for recipe_in, _ in chunk
+        ]
+        db.add_all(recipes)
+        db.flush()
+
+        written = [(recipe.id, spirit_type_ids) for recipe, (_, spirit_type_ids) in zip(recipes, chunk)]
+        associations = [
+            {"recipe_id": recipe_id, "spirit_type_id": spirit_type_id}
+            for recipe_id, spirit_type_ids in written
+            for spirit_type_id in spirit_type_ids
+        ]
+        if associations:
+            db.execute(recipes_to_spirits.insert(), associations)
+        CollectionVersionService.bump(db, user_id, RECIPES, SPIRIT_TYPES)
+        db.commit()
+        # Keep the identity map from growing with the file
+        db.expunge_all()
+
+        for recipe_id, spirit_type_ids in written:
+            RecipeAvailabilityService.recipe_changed(user_id, recipe_id, spirit_type_ids)
+        return len(written)
+
+    @staticmethod
+    def import_recipes(
+        db: Session,
+        records: Iterable[Dict],
+        user_id: int,
+        chunk_size: int = CHUNK_SIZE,
+    ) -> Iterator[Dict]:
+        """
+        Validate and insert recipe records in chunks, creating any spirit types
+        referenced by name that the user does not have yet.
+
+        Args:
+            db: Database session
+            records: Iterable of recipe dicts (name, instructions, ingredients, spirit_types)
+            user_id: ID of the user importing the recipes
+            chunk_size: Number of recipes written per transaction
+
+        Yields:
+            A progress dict after every chunk and a final one with done=True:
+            {'processed': int, 'imported': int, 'failed': int, 'errors': [...], 'done': bool}
+        """
+        progress = {"processed": 0, "imported": 0, "failed": 0, "errors": [], "done": False}
+        spirit_type_map = RecipeImportService._load_spirit_type_map(db, user_id)
+        chunk = []
+
+        def record_error(message: str):
+            progress["failed"] += 1
+            if len(progress["errors"]) < RecipeImportService.MAX_REPORTED_ERRORS:
+                progress["errors"].append(message)
+
+        try:
+            for number, record in enumerate(records, start=1):
+                progress["processed"] += 1
+                if not isinstance(record, dict):
+                    record_error(f"Record {number}: expected an object")
+                    continue
+                try:
+                    recipe_in = RecipeImportRecord.model_validate(record)
+                except ValidationError as e:
+                    error = e.errors()[0]
+                    field = ".".join(str(part) for part in error["loc"])
+                    record_error(f"Record {number}: {field}: {error['msg']}")
+                    continue
+
+                spirit_type_ids = RecipeImportService._resolve_spirit_types(
+                    db, user_id, recipe_in.spirit_types or [], spirit_type_map
+                )
+                chunk.append((recipe_in, spirit_type_ids))
+
+                if len(chunk) >= chunk_size:
+                    progress["imported"] += RecipeImportService._write_chunk(db, user_id, chunk)
+                    chunk = []
+                    yield dict(progress)
+
+            if chunk:
+                progress["imported"] += RecipeImportService._write_chunk(db, user_id, chunk)
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Recipe import for user {user_id} stopped after {progress['processed']} records: {e}")
+            progress["error"] = f"Import stopped: {str(e)}"
+
+        progress["done"] = True
+        logger.info(f"Imported {progress['imported']} recipes for user {user_id} ({progress['failed']} failed)")
+        yield progress
@@ -0,0 +1,188 @@
+"""
+Batch job bringing existing users up to date with the seed data.
+
+Run it after deploying a changed default_recipes.json:
+
+    python -m app.services.reseed [--chunk-size N]
+
+API processes keep per-user availability indexes in memory; restart them
+after the job so those are rebuilt with the users' new spirit types.
+
+Default recipes live in the shared catalog, which every process syncs with
+the seed file on startup, so new and changed recipes reach users without any
+per-user recipe writes. The per-user part is applied here, one chunk of users
+at a time, with the same handful of statements per chunk however many users
+or recipes it covers:
+
+- default spirit types added since the user's seed version are created,
+  unless the user has one of the same name; defaults the user deleted are
+  not brought back. Existing spirit types of a default's name are linked to
+  the catalog
+- catalog recipes are hidden from users who already have a recipe of the
+  same name, which covers users seeded with their own copies
+- users from before the shared catalog are switched over to it
+- each user's seed version and collection versions are updated
+
+Users already at the current seed version are skipped, as are users whose
+background seed task has not finished, so the job can be re-run at any time.
+"""
+import argparse
+import logging
+import time
+from typing import Dict, List
+
+from sqlalchemy import and_, case, insert, or_, select
+from sqlalchemy.orm import Session, aliased
+
+from app.db.models.recipe import Recipe
+from app.db.models.seed_task import SeedTask
+from app.db.models.seed_version import SeedVersion
+from app.db.models.shared_table import hidden_catalog_recipes
+from app.db.models.spirit_type import SpiritType, normalize_spirit_type_name
+from app.db.models.user import User
+from app.db.session import SessionLocal
+from app.db.upsert import insert_ignore
+from app.services.seed_service import SeedService
+from app.services.seed_tasks import PENDING, RUNNING
+from app.services.trigram import ENTITY_SPIRIT_TYPE, TrigramIndexService
+
+logger = logging.getLogger(__name__)
+
+
+class ReseedService:
+    """Service applying the current seed version to existing users in chunks"""
+
+    CHUNK_SIZE = 1000
+
+    @staticmethod
+    def get_outdated_user_ids(db: Session, after_id: int, limit: int) -> List[int]:
+        """IDs of users not at the current seed version, in ID order, after after_id"""
+        return [
+            user_id
+            for (user_id,) in db.query(User.id)
+            .outerjoin(SeedTask, SeedTask.user_id == User.id)
+            .filter(
+                User.id > after_id,
+                or_(User.seed_version.is_(None), User.seed_version != SeedService.seed_version()),
+                # A seed still in progress applies the current version itself
+                or_(SeedTask.status.is_(None), SeedTask.status.notin_([PENDING, RUNNING])),
+            )
+            .order_by(User.id)
+            .limit(limit)
+        ]
+
+    @staticmethod
+    def apply_to_users(db: Session, user_ids: List[int], spirit_type_map: Dict[str, int]) -> Dict[str, int]:
+        """
+        Apply the current seed version to a chunk of users in the caller's
+        transaction. spirit_type_map maps catalog spirit type names to IDs.
+        Returns counts of the spirit types created and catalog recipes hidden.
+        """
+        # Names are matched ignoring case and spacing, like the unique index on spirit types
+        catalog_ids = {normalize_spirit_type_name(name): spirit_type_id for name, spirit_type_id in spirit_type_map.items()}
+
+        # Link same-named spirit types to the catalog in one UPDATE
+        db.query(SpiritType).filter(
+            SpiritType.user_id.in_(user_ids),
+            SpiritType.normalized_name.in_(catalog_ids),
+            SpiritType.catalog_spirit_type_id.is_(None),
+        ).update(
+            {SpiritType.catalog_spirit_type_id: case(catalog_ids, value=SpiritType.normalized_name)},
+            synchronize_session=False,
+        )
+
+        existing = set(
+            db.query(SpiritType.user_id, SpiritType.normalized_name).filter(
+                SpiritType.user_id.in_(user_ids), SpiritType.normalized_name.in_(catalog_ids)
+            )
+        )
+        # Defaults each user's seed version already had were created for them then
+        user_versions = dict(db.query(User.id, User.seed_version).filter(User.id.in_(user_ids)))
+        version_defaults = {
+            version: set(names)
+            for version, names in db.query(SeedVersion.version, SeedVersion.spirit_types).filter(
+                SeedVersion.version.in_(set(user_versions.values()) - {None})
+            )
+        }
+        missing = []
+        for user_id in user_ids:
+            # Versions never recorded are from before seed versions were; every default counts as new
+            had = version_defaults.get(user_versions.get(user_id), set())
+            missing.extend(
+                {"name": name, "user_id": user_id, "catalog_spirit_type_id": spirit_type_id}
+                for name, spirit_type_id in spirit_type_map.items()
+                if normalize_spirit_type_name(name) not in had
+                and (user_id, normalize_spirit_type_name(name)) not in existing
+            )
+        if missing:
+            created = db.execute(
+                insert(SpiritType).returning(SpiritType.id, SpiritType.name, SpiritType.user_id), missing
+            ).all()
+            TrigramIndexService.index_names(db, ENTITY_SPIRIT_TYPE, created)
+
+        # Hide catalog recipes a user already has a recipe of the same name for
+        own = aliased(Recipe)
+        catalog = aliased(Recipe)
+        duplicates = (
+            select(own.user_id, catalog.id)
+            .distinct()
+            .join(catalog, and_(catalog.name == own.name, catalog.user_id.is_(None)))
+            .where(own.user_id.in_(user_ids))
+        )
+        hidden = db.execute(
+            insert_ignore(db, hidden_catalog_recipes).from_select(["user_id", "recipe_id"], duplicates)
+        ).rowcount
+
+        db.query(User).filter(User.id.in_(user_ids)).update(
+            {
+                User.recipe_catalog: True,
+                User.seed_version: SeedService.seed_version(),
+                User.recipes_version: User.recipes_version + 1,
+                User.spirit_types_version: User.spirit_types_version + 1,
+            },
+            synchronize_session=False,
+        )
+        return {"spirit_types": len(missing), "hidden_recipes": hidden}
+
+    @staticmethod
+    def run(db: Session, chunk_size: int = CHUNK_SIZE) -> Dict[str, int]:
+        """
+        Sync the catalog, then apply the current seed version to every
+        outdated user, committing after each chunk.
+        """
+        spirit_type_map, _ = SeedService.sync_catalog(db)
+        db.commit()
+
+        totals = {"users": 0, "spirit_types": 0, "hidden_recipes": 0}
+        after_id = 0
+        while True:
+            user_ids = ReseedService.get_outdated_user_ids(db, after_id, chunk_size)
+            if not user_ids:
+                break
+            counts = ReseedService.apply_to_users(db, user_ids, spirit_type_map)
+            db.commit()
+            after_id = user_ids[-1]
+            totals["users"] += len(user_ids)
+            for key, count in counts.items():
+                totals[key] += count
+            logger.info(f"Reseeded {totals['users']} users (through user {after_id})")
+        return totals
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Apply the current seed data to existing users")
+    parser.add_argument("--chunk-size", type=int, default=ReseedService.CHUNK_SIZE)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    session = SessionLocal()
+    try:
+        started = time.perf_counter()
+        totals = ReseedService.run(session, chunk_size=args.chunk_size)
+        logger.info(
+            f"Applied seed version {SeedService.seed_version()} to {totals['users']} users in "
+            f"{time.perf_counter() - started:.1f}s: {totals['spirit_types']} spirit types created, "
+            f"{totals['hidden_recipes']} duplicate catalog recipes hidden"
+        )
+    finally:
+        session.close()
@@ -0,0 +1,165 @@
+"""
+Per-user cache of serialized list responses.
+
+Entries hold the exact JSON bytes (plus the response headers that go with them)
+for GET /bottles, /recipes and /spirit_types, so a hit is answered without
+running a query or building Pydantic models. Keys embed the user's collection
+version, so an entry can never outlive the data it was built from; on top of
+that, CollectionVersionService drops a user's entries for a collection as soon
+as a write to it commits, which frees the memory right away.
+
+Storage goes through a CacheBackend. The default keeps entries in process
+memory with LRU eviction under a byte budget; anything offering the same
+get/set/delete_prefix operations on bytes (for example a Redis client wrapper
+using GET, SET and SCAN/DEL) can be swapped in with ResponseCacheService.configure().
+"""
+import json
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
+
+from app.core.settings import settings
+
+
+class CacheBackend:
+    """Byte-oriented key/value store used by the response cache"""
+
+    def get(self, key: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: bytes):
+        raise NotImplementedError
+
+    def delete_prefix(self, prefix: str) -> int:
+        """Delete every key starting with prefix and return how many were removed"""
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def stats(self) -> Dict:
+        return {}
+
+
+class InMemoryLRUBackend(CacheBackend):
+    """In-process backend with LRU eviction once the stored bytes exceed max_bytes"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._size = 0
+        self._evictions = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes):
+        if len(value) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous)
+            self._entries[key] = value
+            self._size += len(value)
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+                self._evictions += 1
+
+    def delete_prefix(self, prefix: str) -> int:
+        with self._lock:
+            keys = [key for key in self._entries if key.startswith(prefix)]
+            for key in keys:
+                self._size -= len(self._entries.pop(key))
+            return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+                "evictions": self._evictions,
+            }
+
+
+class ResponseCacheService:
+    """Service for caching serialized list responses per user and collection"""
+
+    _backend: CacheBackend = InMemoryLRUBackend(settings.RESPONSE_CACHE_MAX_BYTES)
+    _enabled: bool = settings.RESPONSE_CACHE_ENABLED
+    _hits = 0
+    _misses = 0
+    _invalidations = 0
+    _lock = threading.Lock()
+
+    @staticmethod
+    def configure(backend: CacheBackend, enabled: bool = True):
+        """Replace the cache backend, e.g. with a shared store for multiple workers"""
+        ResponseCacheService._backend = backend
+        ResponseCacheService._enabled = enabled
+
+    @staticmethod
+    def make_key(user_id: int, collection: str, variant: str) -> str:
+        """
+        Build a cache key. `variant` must change whenever the response would,
+        which the collection ETag already guarantees (versions plus query string).
+        """
+        return f"{user_id}:{collection}:{variant}"
+
+    @staticmethod
+    def get(key: str) -> Optional[Tuple[bytes, Dict[str, str]]]:
+        """Return (body, headers) for a cached response, or None on a miss"""
+        if not ResponseCacheService._enabled:
+            return None
+        value = ResponseCacheService._backend.get(key)
+        with ResponseCacheService._lock:
+            if value is None:
+                ResponseCacheService._misses += 1
+                return None
+            ResponseCacheService._hits += 1
+        # Stored as one line of JSON headers followed by the body
+        header_line, _, body = value.partition(b"\n")
+        return body, json.loads(header_line)
+
+    @staticmethod
+    def set(key: str, body: bytes, headers: Optional[Dict[str, str]] = None):
+        if not ResponseCacheService._enabled:
+            return
+        header_line = json.dumps(headers or {}).encode("utf-8")
+        ResponseCacheService._backend.set(key, header_line + b"\n" + body)
+
+    @staticmethod
+    def invalidate(user_id: int, collections: Iterable[str]):
+        """Drop a user's cached responses for the given collections"""
+        removed = 0
+        for collection in collections:
+            removed += ResponseCacheService._backend.delete_prefix(f"{user_id}:{collection}:")
+        with ResponseCacheService._lock:
+            ResponseCacheService._invalidations += removed
+
+    @staticmethod
+    def clear():
+        ResponseCacheService._backend.clear()
+
+    @staticmethod
+    def stats() -> Dict:
+        with ResponseCacheService._lock:
+            counters = {
+                "enabled": ResponseCacheService._enabled,
+                "hits": ResponseCacheService._hits,
+                "misses": ResponseCacheService._misses,
+                "invalidations": ResponseCacheService._invalidations,
+            }
+        return {**counters, **ResponseCacheService._backend.stats()}
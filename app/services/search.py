@@ -0,0 +1,109 @@
+import re
+from typing import List
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.db.fts import PG_DOCUMENTS
+from app.schemas.search import SearchHit
+
+# Column weights for bm25(), in FTS column order
+BOTTLE_WEIGHTS = (10.0, 5.0, 1.0)  # name, brand, flavor_profile
+RECIPE_WEIGHTS = (10.0, 1.0, 3.0)  # name, instructions, ingredient_names
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+PG_HEADLINE_OPTIONS = "StartSel=<mark>, StopSel=</mark>, MaxWords=12, MinWords=4, FragmentDelimiter=..., MaxFragments=1"
+
+# Rows a user can see: their own, plus unhidden catalog recipes if they have the catalog
+OWNER_FILTER = "c.user_id = :user_id"
+RECIPE_OWNER_FILTER = (
+    "(c.user_id = :user_id OR (c.user_id IS NULL"
+    " AND (SELECT recipe_catalog FROM users WHERE id = :user_id)"
+    " AND c.id NOT IN (SELECT recipe_id FROM hidden_catalog_recipes WHERE user_id = :user_id)))"
+)
+
+
+class SearchService:
+    """
+    Full-text search over a user's bottles and recipes, using the FTS5 indexes
+    on SQLite and the tsvector GIN indexes on PostgreSQL
+    """
+
+    @staticmethod
+    def build_match_query(query: str) -> str:
+        """
+        Turn free text into a safe FTS5 MATCH expression.
+        Every term is quoted so user input cannot inject FTS syntax, and the
+        last term is a prefix match so partially typed words still hit.
+        """
+        tokens = _TOKEN_RE.findall(query)
+        if not tokens:
+            return ""
+        terms = [f'"{token}"' for token in tokens]
+        terms[-1] += "*"
+        return " ".join(terms)
+
+    @staticmethod
+    def build_tsquery(query: str) -> str:
+        """
+        PostgreSQL counterpart of build_match_query: every term is a quoted
+        lexeme, all of them must match, and the last one is a prefix match.
+        """
+        tokens = _TOKEN_RE.findall(query)
+        if not tokens:
+            return ""
+        terms = [f"'{token}'" for token in tokens]
+        terms[-1] += ":*"
+        return " & ".join(terms)
+
+    @staticmethod
+    def _search_postgresql(db: Session, content_table: str, query: str, user_id: int, limit: int,
+                           owner_filter: str) -> List[SearchHit]:
+        tsquery = SearchService.build_tsquery(query)
+        if not tsquery:
+            return []
+        # Unqualified columns, so the expression matches the GIN index in app/db/fts.py
+        document, headline_text = PG_DOCUMENTS[content_table]
+        rows = db.execute(
+            text(
+                f"SELECT c.id, c.name, "
+                f"ts_headline('simple', {headline_text}, q, '{PG_HEADLINE_OPTIONS}') AS snippet, "
+                f"-ts_rank({document}, q) AS score "
+                f"FROM {content_table} c, to_tsquery('simple', :match) q "
+                f"WHERE ({document}) @@ q AND {owner_filter} "
+                f"ORDER BY score, c.id LIMIT :limit"
+            ),
+            {"match": tsquery, "user_id": user_id, "limit": limit},
+        ).all()
+        return [SearchHit(id=r.id, name=r.name, snippet=r.snippet or "", score=r.score) for r in rows]
+
+    @staticmethod
+    def _search(db: Session, fts_table: str, content_table: str, weights: tuple,
+                query: str, user_id: int, limit: int, owner_filter: str = OWNER_FILTER) -> List[SearchHit]:
+        if db.get_bind().dialect.name == "postgresql":
+            return SearchService._search_postgresql(db, content_table, query, user_id, limit, owner_filter)
+        match = SearchService.build_match_query(query)
+        if not match:
+            return []
+        weight_args = ", ".join(str(w) for w in weights)
+        rows = db.execute(
+            text(
+                f"SELECT c.id, c.name, "
+                f"snippet({fts_table}, -1, '<mark>', '</mark>', '...', 12) AS snippet, "
+                f"bm25({fts_table}, {weight_args}) AS score "
+                f"FROM {fts_table} JOIN {content_table} c ON c.id = {fts_table}.rowid "
+                f"WHERE {fts_table} MATCH :match AND {owner_filter} "
+                f"ORDER BY score LIMIT :limit"
+            ),
+            {"match": match, "user_id": user_id, "limit": limit},
+        ).all()
+        return [SearchHit(id=r.id, name=r.name, snippet=r.snippet or "", score=r.score) for r in rows]
+
+    @staticmethod
+    def search_bottles(db: Session, query: str, user_id: int, limit: int = 20) -> List[SearchHit]:
+        return SearchService._search(db, "bottles_fts", "bottles", BOTTLE_WEIGHTS, query, user_id, limit)
+
+    @staticmethod
+    def search_recipes(db: Session, query: str, user_id: int, limit: int = 20) -> List[SearchHit]:
+        return SearchService._search(db, "recipes_fts", "recipes", RECIPE_WEIGHTS, query, user_id, limit,
+                                     RECIPE_OWNER_FILTER)
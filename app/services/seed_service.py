@@ -1,17 +1,43 @@
 """
-Seed service for populating new user accounts with default recipes and spirit types.
+Seed service for the shared default recipe catalog and new user accounts.
+
+The default recipes are created once as the shared catalog (see
+recipe_catalog). Seeding a user creates their own default spirit types,
+linked to the catalog's, and switches the catalog on for them.
+
+Every catalog recipe stores a hash of its seed content, so the catalog is
+synced with a changed seed file by writing only the recipes that were added,
+changed or removed. The seed version, a hash of the whole seed file's
+content, is recorded on each user when their seed is applied; existing users
+are brought up to a new version by the reseed job.
 """
+import hashlib
 import json
 import logging
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import delete, insert, update
+from sqlalchemy.exc import IntegrityError, OperationalError
 from sqlalchemy.orm import Session
 
 from app.db.models.recipe import Recipe
-from app.db.models.spirit_type import SpiritType
+from app.db.models.seed_version import SeedVersion
+from app.db.models.shared_table import hidden_catalog_recipes, recipes_to_spirits
+from app.db.models.spirit_type import SpiritType, normalize_spirit_type_name
+from app.db.models.user import User
+from app.db.session import SessionLocal
+from app.db.upsert import insert_ignore, upsert
+from app.services.availability import RecipeAvailabilityService
+from app.services.recipe_catalog import RecipeCatalogService
+from app.services.trigram import ENTITY_SPIRIT_TYPE, TrigramIndexService
+from app.services.versions import RECIPES, SPIRIT_TYPES, CollectionVersionService
 
 logger = logging.getLogger(__name__)
 
+# Syncs of the catalog at startup before giving up on conflicts with other processes
+CATALOG_SYNC_ATTEMPTS = 3
+
 
 class SeedService:
     """Service for seeding default data to new user accounts"""
@@ -20,8 +46,12 @@ class SeedService:
     SEED_DATA_PATH = Path(__file__).parent.parent / "db" / "seed_data" / "default_recipes.json"
     
     @staticmethod
+    @lru_cache(maxsize=1)
     def load_seed_data() -> Dict:
-        """Load the seed data from JSON file"""
+        """
+        Load the seed data from the JSON file. The file is read and parsed once
+        per process; callers share the result and must not modify it.
+        """
         try:
             with open(SeedService.SEED_DATA_PATH, 'r', encoding='utf-8') as f:
                 return json.load(f)
@@ -33,98 +63,297 @@ class SeedService:
             raise
     
     @staticmethod
-    def seed_user_spirit_types(db: Session, user_id: int, spirit_type_names: List[str]) -> Dict[str, int]:
+    def recipe_content_hash(recipe_data: Dict) -> str:
+        """Hash of everything the seed file says about a recipe"""
+        content = json.dumps(
+            {key: recipe_data.get(key) for key in ('name', 'instructions', 'ingredients', 'spirit_types')},
+            sort_keys=True,
+            separators=(',', ':'),
+        )
+        return hashlib.sha256(content.encode('utf-8')).hexdigest()
+    
+    @staticmethod
+    @lru_cache(maxsize=1)
+    def seed_version() -> str:
+        """Version of the seed file's content, recorded on users once it is applied"""
+        seed_data = SeedService.load_seed_data()
+        digest = hashlib.sha256()
+        for name in sorted(seed_data.get('spirit_types', [])):
+            digest.update(f"spirit_type:{name}\n".encode('utf-8'))
+        for content_hash in sorted(SeedService.recipe_content_hash(r) for r in seed_data.get('recipes', [])):
+            digest.update(f"recipe:{content_hash}\n".encode('utf-8'))
+        return digest.hexdigest()[:16]
+    
+    @staticmethod
+    def seed_user_spirit_types(
+        db: Session,
+        user_id: Optional[int],
+        spirit_type_names: List[str],
+        catalog_spirit_type_map: Optional[Dict[str, int]] = None,
+    ) -> Dict[str, int]:
         """
-        Create default spirit types for a user.
+        Create default spirit types for a user, or for the catalog when user_id is None.
+        Existing spirit types, matched ignoring case and spacing, are found with
+        one query and the missing ones are created with a single multi-row
+        INSERT ... RETURNING. Catalog spirit types are inserted skipping names
+        another process added meanwhile, then read back.
+        When catalog_spirit_type_map is given, the user's spirit types are
+        linked to the catalog spirit types of the same name.
         Returns a mapping of spirit type names to their database IDs.
         """
+        catalog_spirit_type_map = catalog_spirit_type_map or {}
+        names_by_key = {}
+        for name in spirit_type_names:
+            names_by_key.setdefault(normalize_spirit_type_name(name), name)
         spirit_type_map = {}
-        
-        for spirit_name in spirit_type_names:
-            # Check if this spirit type already exists for the user
-            existing = db.query(SpiritType).filter(
-                SpiritType.name == spirit_name,
-                SpiritType.user_id == user_id
-            ).first()
-            
-            if existing:
-                spirit_type_map[spirit_name] = existing.id
-                logger.debug(f"Spirit type '{spirit_name}' already exists for user {user_id}")
-            else:
-                # Create new spirit type
-                spirit_type = SpiritType(
-                    name=spirit_name,
-                    user_id=user_id
+        for normalized_name, spirit_type_id, catalog_spirit_type_id in db.query(
+            SpiritType.normalized_name, SpiritType.id, SpiritType.catalog_spirit_type_id
+        ).filter(
+            SpiritType.normalized_name.in_(names_by_key),
+            SpiritType.user_id == user_id
+        ):
+            name = names_by_key[normalized_name]
+            spirit_type_map[name] = spirit_type_id
+            # Spirit types the user created before seeding ran still stand in for the catalog's
+            if catalog_spirit_type_id is None and name in catalog_spirit_type_map:
+                db.query(SpiritType).filter(SpiritType.id == spirit_type_id).update(
+                    {SpiritType.catalog_spirit_type_id: catalog_spirit_type_map[name]}, synchronize_session=False
                 )
-                db.add(spirit_type)
-                db.flush()  # Flush to get the ID without committing
-                spirit_type_map[spirit_name] = spirit_type.id
-                logger.debug(f"Created spirit type '{spirit_name}' for user {user_id}")
+        
+        missing = [name for name in names_by_key.values() if name not in spirit_type_map]
+        if missing and user_id is None:
+            # Concurrent catalog syncs insert the same names; the losers' rows are
+            # skipped by the catalog name index and everyone reads back the winners
+            db.execute(
+                insert_ignore(
+                    db,
+                    SpiritType.__table__,
+                    index_elements=['normalized_name'],
+                    index_where=SpiritType.__table__.c.user_id.is_(None),
+                ),
+                [
+                    {"name": name, "normalized_name": normalize_spirit_type_name(name), "user_id": None}
+                    for name in missing
+                ],
+            )
+            missing_keys = {normalize_spirit_type_name(name): name for name in missing}
+            for normalized_name, spirit_type_id in db.query(SpiritType.normalized_name, SpiritType.id).filter(
+                SpiritType.normalized_name.in_(missing_keys),
+                SpiritType.user_id.is_(None),
+            ):
+                spirit_type_map[missing_keys[normalized_name]] = spirit_type_id
+        elif missing:
+            created = db.execute(
+                insert(SpiritType).returning(SpiritType.id, SpiritType.name),
+                [
+                    {"name": name, "user_id": user_id, "catalog_spirit_type_id": catalog_spirit_type_map.get(name)}
+                    for name in missing
+                ],
+            ).all()
+            for spirit_type_id, name in created:
+                spirit_type_map[name] = spirit_type_id
+            TrigramIndexService.index_names(
+                db, ENTITY_SPIRIT_TYPE, [(spirit_type_id, name, user_id) for spirit_type_id, name in created]
+            )
+            logger.debug(f"Created {len(created)} spirit types for user {user_id}")
         
         return spirit_type_map
     
     @staticmethod
     def seed_user_recipes(
         db: Session,
-        user_id: int,
+        user_id: Optional[int],
         recipes_data: List[Dict],
         spirit_type_map: Dict[str, int]
     ) -> int:
         """
-        Create default recipes for a user.
+        Create default recipes for a user, or for the catalog when user_id is
+        None, skipping names that already exist.
+        Recipes go out as one multi-row INSERT ... RETURNING and their spirit
+        type links as one batched INSERT into recipes_to_spirits.
         Returns the number of recipes created.
         """
-        recipes_created = 0
+        names = [recipe_data['name'] for recipe_data in recipes_data]
+        existing = {
+            name for (name,) in db.query(Recipe.name).filter(
+                Recipe.name.in_(names),
+                Recipe.user_id == user_id
+            )
+        }
         
+        new_recipes = []
         for recipe_data in recipes_data:
-            # Check if recipe already exists for user (by name)
-            existing = db.query(Recipe).filter(
-                Recipe.name == recipe_data['name'],
-                Recipe.user_id == user_id
-            ).first()
-            
-            if existing:
+            if recipe_data['name'] in existing:
                 logger.debug(f"Recipe '{recipe_data['name']}' already exists for user {user_id}")
                 continue
-            
-            # Get spirit type objects for this recipe
-            spirit_types = []
+            existing.add(recipe_data['name'])
+            new_recipes.append(recipe_data)
+        if not new_recipes:
+            return 0
+        
+        created = db.execute(
+            insert(Recipe).returning(Recipe.id, Recipe.name),
+            [
+                {
+                    "name": recipe_data['name'],
+                    "instructions": recipe_data['instructions'],
+                    "ingredients": recipe_data.get('ingredients', []),  # Already in dict format from JSON
+                    "user_id": user_id,
+                }
+                for recipe_data in new_recipes
+            ],
+        ).all()
+        # RETURNING order is not guaranteed; names are unique within the batch
+        recipe_ids = {name: recipe_id for recipe_id, name in created}
+        
+        SeedService._link_spirit_types(db, new_recipes, recipe_ids, spirit_type_map)
+        
+        logger.debug(f"Created {len(created)} recipes for user {user_id}")
+        return len(created)
+    
+    @staticmethod
+    def _link_spirit_types(
+        db: Session, recipes_data: List[Dict], recipe_ids: Dict[str, int], spirit_type_map: Dict[str, int]
+    ):
+        """Insert the recipes_to_spirits rows for seeded recipes in one batch"""
+        associations = []
+        for recipe_data in recipes_data:
+            spirit_type_ids = []
             for spirit_name in recipe_data.get('spirit_types', []):
-                if spirit_name in spirit_type_map:
-                    spirit_type = db.query(SpiritType).filter(
-                        SpiritType.id == spirit_type_map[spirit_name]
-                    ).first()
-                    if spirit_type:
-                        spirit_types.append(spirit_type)
-                else:
+                if spirit_name not in spirit_type_map:
                     logger.warning(f"Spirit type '{spirit_name}' not found in map for recipe '{recipe_data['name']}'")
-            
-            # Create the recipe
-            recipe = Recipe(
-                name=recipe_data['name'],
-                instructions=recipe_data['instructions'],
-                ingredients=recipe_data.get('ingredients', []),  # Already in dict format from JSON
-                user_id=user_id,
-                spirit_types=spirit_types
+                elif spirit_type_map[spirit_name] not in spirit_type_ids:
+                    spirit_type_ids.append(spirit_type_map[spirit_name])
+            associations.extend(
+                {"recipe_id": recipe_ids[recipe_data['name']], "spirit_type_id": spirit_type_id}
+                for spirit_type_id in spirit_type_ids
             )
-            
-            db.add(recipe)
-            recipes_created += 1
-            logger.debug(f"Created recipe '{recipe_data['name']}' for user {user_id}")
+        if associations:
+            db.execute(recipes_to_spirits.insert(), associations)
+    
+    @staticmethod
+    def sync_catalog(db: Session) -> Tuple[Dict[str, int], bool]:
+        """
+        Bring the shared catalog in line with the seed file, in the caller's
+        transaction. Catalog recipes are compared by content hash, so only
+        added, changed and removed recipes are written. Edited copies of a
+        removed recipe become ordinary recipes of their owners.
+        
+        Returns a mapping of catalog spirit type names to their database IDs,
+        and whether any catalog recipe changed.
+        """
+        seed_data = SeedService.load_seed_data()
+        recipes_data = seed_data.get('recipes', [])
+        content_hashes = {
+            recipe_data['name']: SeedService.recipe_content_hash(recipe_data) for recipe_data in recipes_data
+        }
+        spirit_type_map = SeedService.seed_user_spirit_types(db, None, seed_data.get('spirit_types', []))
+        # Reseeding compares a user's version with this one to find the defaults they never got
+        db.execute(
+            insert_ignore(db, SeedVersion.__table__, index_elements=['version']),
+            {
+                "version": SeedService.seed_version(),
+                "spirit_types": sorted({normalize_spirit_type_name(name) for name in spirit_type_map}),
+            },
+        )
+        
+        existing = {
+            name: (recipe_id, content_hash)
+            for recipe_id, name, content_hash in db.query(Recipe.id, Recipe.name, Recipe.content_hash).filter(
+                Recipe.user_id.is_(None)
+            )
+        }
+        added = [r for r in recipes_data if r['name'] not in existing]
+        changed = [
+            r for r in recipes_data
+            if r['name'] in existing and existing[r['name']][1] != content_hashes[r['name']]
+        ]
+        removed_ids = [recipe_id for name, (recipe_id, _) in existing.items() if name not in content_hashes]
+        
+        upserted = added + changed
+        if upserted:
+            # One statement for new and changed recipes; the catalog name index
+            # makes a recipe another process just added an update, not a duplicate
+            rows = db.execute(
+                upsert(
+                    db,
+                    Recipe.__table__,
+                    index_elements=['name'],
+                    update_columns=['instructions', 'ingredients', 'ingredient_names', 'content_hash'],
+                    index_where=Recipe.__table__.c.user_id.is_(None),
+                ).returning(Recipe.id, Recipe.name),
+                [
+                    {
+                        "name": r['name'],
+                        "instructions": r['instructions'],
+                        "ingredients": r.get('ingredients', []),
+                        "user_id": None,
+                        "content_hash": content_hashes[r['name']],
+                    }
+                    for r in upserted
+                ],
+            ).all()
+            recipe_ids = {name: recipe_id for recipe_id, name in rows}
+            db.execute(recipes_to_spirits.delete().where(recipes_to_spirits.c.recipe_id.in_(recipe_ids.values())))
+            SeedService._link_spirit_types(db, upserted, recipe_ids, spirit_type_map)
         
-        return recipes_created
+        if removed_ids:
+            db.execute(update(Recipe).where(Recipe.catalog_recipe_id.in_(removed_ids)).values(catalog_recipe_id=None))
+            db.execute(hidden_catalog_recipes.delete().where(hidden_catalog_recipes.c.recipe_id.in_(removed_ids)))
+            db.execute(recipes_to_spirits.delete().where(recipes_to_spirits.c.recipe_id.in_(removed_ids)))
+            db.execute(delete(Recipe).where(Recipe.id.in_(removed_ids)))
+        
+        catalog_changed = bool(added or changed or removed_ids)
+        if catalog_changed:
+            # Everyone with the catalog sees the new content; their ETags must change
+            db.query(User).filter(User.recipe_catalog.is_(True)).update(
+                {User.recipes_version: User.recipes_version + 1}, synchronize_session=False
+            )
+            logger.info(
+                f"Synced recipe catalog to seed version {SeedService.seed_version()}: "
+                f"{len(added)} added, {len(changed)} changed, {len(removed_ids)} removed"
+            )
+        return spirit_type_map, catalog_changed
+    
+    @staticmethod
+    def ensure_catalog():
+        """
+        Sync the catalog with the seed file on startup, before the catalog is
+        read. Several processes starting at once may race to write it. A loser
+        can still fail on a conflicting write, or on SQLite on the lock or a
+        stale snapshot; it then syncs again against the winner's catalog,
+        which normally leaves nothing to write.
+        """
+        db = SessionLocal()
+        try:
+            for attempt in range(1, CATALOG_SYNC_ATTEMPTS + 1):
+                try:
+                    _, catalog_changed = SeedService.sync_catalog(db)
+                    db.commit()
+                    break
+                except (IntegrityError, OperationalError):
+                    db.rollback()
+                    if attempt == CATALOG_SYNC_ATTEMPTS:
+                        raise
+                    logger.info("Recipe catalog sync conflicted with another process, retrying")
+            # The catalog may have been changed by the process we lost to
+            catalog_changed = catalog_changed or attempt > 1
+        finally:
+            db.close()
+        if catalog_changed:
+            RecipeCatalogService.clear()
     
     @staticmethod
     def seed_user_data(db: Session, user_id: int) -> Dict[str, int]:
         """
-        Seed a new user account with default spirit types and recipes.
+        Seed a new user account with default spirit types and the shared recipe catalog.
         
         Args:
             db: Database session
             user_id: ID of the user to seed data for
             
         Returns:
-            Dict with counts of created items: {'spirit_types': int, 'recipes': int}
+            Dict with counts of seeded items: {'spirit_types': int, 'recipes': int}
         """
         try:
             logger.info(f"Starting data seeding for user {user_id}")
@@ -132,23 +361,32 @@ class SeedService:
             # Load seed data
             seed_data = SeedService.load_seed_data()
             
-            # Create spirit types
+            # Create or update the catalog if needed, then the user's own spirit types
+            catalog_spirit_type_map, catalog_changed = SeedService.sync_catalog(db)
             spirit_type_names = seed_data.get('spirit_types', [])
-            spirit_type_map = SeedService.seed_user_spirit_types(db, user_id, spirit_type_names)
+            spirit_type_map = SeedService.seed_user_spirit_types(
+                db, user_id, spirit_type_names, catalog_spirit_type_map
+            )
             
-            # Create recipes
-            recipes_data = seed_data.get('recipes', [])
-            recipes_created = SeedService.seed_user_recipes(db, user_id, recipes_data, spirit_type_map)
+            # Default recipes are shown from the catalog instead of being copied
+            db.query(User).filter(User.id == user_id).update(
+                {User.recipe_catalog: True, User.seed_version: SeedService.seed_version()},
+                synchronize_session=False,
+            )
             
             # Commit all changes
+            CollectionVersionService.bump(db, user_id, RECIPES, SPIRIT_TYPES)
             db.commit()
+            if catalog_changed:
+                RecipeCatalogService.clear()
+            RecipeAvailabilityService.invalidate(user_id)
             
             result = {
                 'spirit_types': len(spirit_type_map),
-                'recipes': recipes_created
+                'recipes': len(RecipeCatalogService.get_entries(db))
             }
             
-            logger.info(f"Successfully seeded user {user_id} with {result['spirit_types']} spirit types and {result['recipes']} recipes")
+            logger.info(f"Successfully seeded user {user_id} with {result['spirit_types']} spirit types and {result['recipes']} catalog recipes")
             return result
             
         except Exception as e:
@@ -160,8 +398,11 @@ class SeedService:
     def is_user_seeded(db: Session, user_id: int) -> bool:
         """
         Check if a user has already been seeded with default data.
-        A user is considered seeded if they have any recipes.
+        A user is considered seeded once a seed version has been applied to
+        them; users from before seed versions count if they have any recipes.
         """
+        seed_version = db.query(User.seed_version).filter(User.id == user_id).scalar()
+        if seed_version is not None:
+            return True
         recipe_count = db.query(Recipe).filter(Recipe.user_id == user_id).count()
         return recipe_count > 0
-
@@ -0,0 +1,181 @@
+"""
+Background seeding of new user accounts.
+
+Registration records a pending SeedTask in the same transaction as the user
+and hands the user ID to an in-process worker thread, so the response does
+not wait for the seed writes. The task row is the source of truth: a worker
+claims it with a conditional UPDATE from pending to running, so only one
+process runs a task even when several have it queued, then marks it done or
+failed. Failed attempts are retried with exponential backoff up to
+SEED_MAX_ATTEMPTS. At startup resume_pending() queues the pending tasks and
+takes back running ones whose lease (SEED_TASK_LEASE_SECONDS since their
+claim) has expired, since their worker has presumably died; tasks another
+live process is running are left alone.
+
+Seeding skips rows that already exist, so re-running a task that was
+interrupted after its data was committed is harmless.
+"""
+import logging
+import queue
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.settings import settings
+from app.db.models.seed_task import SeedTask
+from app.db.session import SessionLocal
+from app.services.seed_service import SeedService
+from app.services.user_cache import CurrentUser, UserCacheService
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+class SeedTaskService:
+    """Service for queueing, running and reporting background seed tasks"""
+
+    _queue: "queue.Queue[int]" = queue.Queue()
+    _worker: Optional[threading.Thread] = None
+    _lock = threading.Lock()
+
+    @staticmethod
+    def create_task(db: Session, user_id: int) -> SeedTask:
+        """
+        Add a pending seed task for a user to the caller's transaction.
+        Call submit() once the transaction has committed.
+        """
+        task = SeedTask(user_id=user_id, status=PENDING, attempts=0)
+        db.add(task)
+        return task
+
+    @staticmethod
+    def get_task(db: Session, user_id: int) -> Optional[SeedTask]:
+        return db.query(SeedTask).filter(SeedTask.user_id == user_id).first()
+
+    @staticmethod
+    def status_headers(current_user: CurrentUser) -> Dict[str, str]:
+        """
+        Response headers telling clients a user's default data is not in place
+        yet, so list endpoints can show a "still setting up" state.
+        """
+        if current_user.seed_status in (PENDING, RUNNING, FAILED):
+            return {"X-Seed-Status": current_user.seed_status}
+        return {}
+
+    @staticmethod
+    def submit(user_id: int, delay: float = 0):
+        """Queue a user's seed task for the worker, optionally after a delay"""
+        if delay > 0:
+            timer = threading.Timer(delay, SeedTaskService.submit, args=(user_id,))
+            timer.daemon = True
+            timer.start()
+            return
+        SeedTaskService._ensure_worker()
+        SeedTaskService._queue.put(user_id)
+
+    @staticmethod
+    def resume_pending() -> int:
+        """Queue every pending task, after taking back running tasks whose lease expired"""
+        lease_expired_before = datetime.now(timezone.utc) - timedelta(seconds=settings.SEED_TASK_LEASE_SECONDS)
+        db = SessionLocal()
+        try:
+            expired = (
+                db.query(SeedTask)
+                .filter(
+                    SeedTask.status == RUNNING,
+                    (SeedTask.started_at.is_(None)) | (SeedTask.started_at < lease_expired_before),
+                )
+                .update({SeedTask.status: PENDING}, synchronize_session=False)
+            )
+            db.commit()
+            if expired:
+                logger.warning(f"Took back {expired} seed tasks whose worker stopped running them")
+            user_ids = [user_id for (user_id,) in db.query(SeedTask.user_id).filter(SeedTask.status == PENDING)]
+        finally:
+            db.close()
+        for user_id in user_ids:
+            SeedTaskService.submit(user_id)
+        if user_ids:
+            logger.info(f"Resumed {len(user_ids)} unfinished seed tasks")
+        return len(user_ids)
+
+    @staticmethod
+    def _ensure_worker():
+        with SeedTaskService._lock:
+            if SeedTaskService._worker is None or not SeedTaskService._worker.is_alive():
+                SeedTaskService._worker = threading.Thread(
+                    target=SeedTaskService._work, name="seed-worker", daemon=True
+                )
+                SeedTaskService._worker.start()
+
+    @staticmethod
+    def _work():
+        while True:
+            user_id = SeedTaskService._queue.get()
+            try:
+                SeedTaskService.run(user_id)
+            except Exception as e:
+                logger.error(f"Seed worker failed on user {user_id}: {e}")
+            finally:
+                SeedTaskService._queue.task_done()
+
+    @staticmethod
+    def run(user_id: int) -> Optional[str]:
+        """
+        Run one attempt of a user's seed task and return its resulting status.
+        Failures are recorded on the task and retried later while attempts remain.
+        """
+        db = SessionLocal()
+        try:
+            # Claim the task; another process or an earlier queue entry may have it already
+            claimed = (
+                db.query(SeedTask)
+                .filter(SeedTask.user_id == user_id, SeedTask.status == PENDING)
+                .update(
+                    {
+                        SeedTask.status: RUNNING,
+                        SeedTask.started_at: datetime.now(timezone.utc),
+                        SeedTask.attempts: SeedTask.attempts + 1,
+                    },
+                    synchronize_session=False,
+                )
+            )
+            db.commit()
+            if claimed != 1:
+                task = SeedTaskService.get_task(db, user_id)
+                return task.status if task else None
+
+            try:
+                SeedService.seed_user_data(db, user_id)
+            except Exception as e:
+                task = SeedTaskService.get_task(db, user_id)
+                task.last_error = str(e)[:500]
+                retry_delay = None
+                if task.attempts >= settings.SEED_MAX_ATTEMPTS:
+                    task.status = FAILED
+                    logger.error(f"Giving up seeding user {user_id} after {task.attempts} attempts: {e}")
+                else:
+                    task.status = PENDING
+                    retry_delay = settings.SEED_RETRY_DELAY_SECONDS * 2 ** (task.attempts - 1)
+                    logger.warning(f"Seeding user {user_id} failed (attempt {task.attempts}), retrying in {retry_delay:g}s: {e}")
+                status = task.status
+                db.commit()
+                if retry_delay is not None:
+                    SeedTaskService.submit(user_id, delay=retry_delay)
+                return status
+
+            task = SeedTaskService.get_task(db, user_id)
+            task.status = DONE
+            task.last_error = None
+            db.commit()
+            return DONE
+        finally:
+            db.close()
+            # The cached user record carries the seed status
+            UserCacheService.invalidate(user_id)
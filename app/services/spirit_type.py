@@ -1,15 +1,29 @@
+from typing import List, Optional, Union
+from sqlalchemy import Row
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.db.models.spirit_type import SpiritType
-from app.schemas.spirit_type import SpiritTypeCreate
+from app.db.models.bottle import Bottle
+from app.db.models.spirit_type import SpiritType, normalize_spirit_type_name
+from app.db.session import run_db
+from app.schemas.spirit_type import SpiritTypeCreate, SpiritTypeMatchResponse, SpiritTypeResponse
+from app.services.availability import RecipeAvailabilityService
+from app.services.trigram import ENTITY_SPIRIT_TYPE, TrigramIndexService
+from app.services.versions import BOTTLES, RECIPES, SPIRIT_TYPES, CollectionVersionService
 
 class SpiritTypeService:
     @staticmethod
     def create_spirit_type(db: Session, spirit_type_in: SpiritTypeCreate, user_id: int) -> SpiritType:
         spirit_type = SpiritType(**spirit_type_in.dict(), user_id=user_id)
-        existing = db.query(SpiritType).filter(SpiritType.name.ilike(spirit_type_in.name), SpiritType.user_id == user_id).first()
-        if existing:
-            raise ValueError(f"Spirit type '{spirit_type_in.name}' already exists.")
         db.add(spirit_type)
+        # The unique (user_id, normalized_name) index rejects duplicates, also between concurrent creates
+        try:
+            db.flush()
+        except IntegrityError:
+            db.rollback()
+            raise ValueError(f"Spirit type '{spirit_type_in.name}' already exists.")
+        TrigramIndexService.index_name(db, ENTITY_SPIRIT_TYPE, spirit_type.id, spirit_type.name, user_id)
+        CollectionVersionService.bump(db, user_id, SPIRIT_TYPES)
         db.commit()
         db.refresh(spirit_type)
         return spirit_type
@@ -21,10 +35,22 @@ class SpiritTypeService:
             query = query.filter(SpiritType.user_id == user_id)
         return query.all()
 
+    @staticmethod
+    def get_spirit_type_rows(db: Session, user_id: int):
+        """Column-only version of get_spirit_types returning (id, name) rows"""
+        return db.query(SpiritType.id, SpiritType.name).filter(SpiritType.user_id == user_id).all()
+
     @staticmethod
     def get_spirit_type(db: Session, spirit_type_id: int, user_id: int):
         return db.query(SpiritType).filter(SpiritType.id == spirit_type_id, SpiritType.user_id == user_id).first()
 
+    @staticmethod
+    def get_spirit_type_by_name(db: Session, name: str, user_id: int) -> Optional[SpiritType]:
+        """The user's spirit type with this name, ignoring case and spacing"""
+        return db.query(SpiritType).filter(
+            SpiritType.normalized_name == normalize_spirit_type_name(name), SpiritType.user_id == user_id
+        ).first()
+
     @staticmethod
     def update_spirit_type(db: Session, spirit_type_id: int, name: str, user_id: int):
         print(f"Attempting to update SpiritType ID {spirit_type_id} to name '{name}'")  # Debug log
@@ -32,11 +58,17 @@ class SpiritTypeService:
         if not spirit_type:
             raise ValueError(f"Spirit type with ID {spirit_type_id} does not exist.")
 
-        existing = db.query(SpiritType).filter(SpiritType.name.ilike(name), SpiritType.id != spirit_type_id, SpiritType.user_id == user_id).first()
-        if existing:
+        old_name = spirit_type.name
+        spirit_type.name = name
+        try:
+            db.flush()
+        except IntegrityError:
+            db.rollback()
             raise ValueError(f"Spirit type '{name}' already exists.")
 
-        spirit_type.name = name
+        TrigramIndexService.index_name(db, ENTITY_SPIRIT_TYPE, spirit_type.id, name, user_id, old_name=old_name)
+        # Spirit type names are embedded in bottle and recipe responses
+        CollectionVersionService.bump(db, user_id, BOTTLES, RECIPES, SPIRIT_TYPES)
         db.commit()
         db.refresh(spirit_type)  # Refresh the object with the updated state from the database
 
@@ -47,7 +79,95 @@ class SpiritTypeService:
     def delete_spirit_type(db: Session, spirit_type_id: int, user_id: int) -> bool:
         spirit_type = db.query(SpiritType).filter(SpiritType.id == spirit_type_id, SpiritType.user_id == user_id).first()
         if spirit_type:
+            # Bottles must keep a valid spirit type, which the foreign key enforces
+            bottle_count = db.query(Bottle).filter(Bottle.spirit_type_id == spirit_type.id).count()
+            if bottle_count:
+                raise ValueError(f"Spirit type '{spirit_type.name}' is used by {bottle_count} bottle(s).")
+            TrigramIndexService.remove(db, ENTITY_SPIRIT_TYPE, spirit_type.id, spirit_type.name, user_id)
             db.delete(spirit_type)
+            CollectionVersionService.bump(db, user_id, BOTTLES, RECIPES, SPIRIT_TYPES)
             db.commit()
+            # Deleting a spirit type drops its recipe associations; rebuild from the DB
+            RecipeAvailabilityService.invalidate(user_id)
             return True
         return False
+
+
+class AsyncSpiritTypeService:
+    """
+    SpiritTypeService for async endpoints. Each method runs the sync service
+    through run_db and returns response models rather than ORM objects.
+    """
+
+    @staticmethod
+    async def create_spirit_type(
+        db: Union[AsyncSession, Session], spirit_type_in: SpiritTypeCreate, user_id: int
+    ) -> SpiritTypeResponse:
+        def create(session: Session) -> SpiritTypeResponse:
+            return SpiritTypeResponse.model_validate(
+                SpiritTypeService.create_spirit_type(session, spirit_type_in, user_id)
+            )
+
+        return await run_db(db, create)
+
+    @staticmethod
+    async def get_spirit_types(db: Union[AsyncSession, Session], user_id: int) -> List[SpiritTypeResponse]:
+        def fetch(session: Session) -> List[SpiritTypeResponse]:
+            return [
+                SpiritTypeResponse.model_validate(spirit_type)
+                for spirit_type in SpiritTypeService.get_spirit_types(session, user_id)
+            ]
+
+        return await run_db(db, fetch)
+
+    @staticmethod
+    async def get_spirit_type_rows(db: Union[AsyncSession, Session], user_id: int) -> List[Row]:
+        return await run_db(db, SpiritTypeService.get_spirit_type_rows, user_id)
+
+    @staticmethod
+    async def get_spirit_type_by_name(
+        db: Union[AsyncSession, Session], name: str, user_id: int
+    ) -> Optional[SpiritTypeResponse]:
+        def fetch(session: Session) -> Optional[SpiritTypeResponse]:
+            spirit_type = SpiritTypeService.get_spirit_type_by_name(session, name, user_id)
+            return SpiritTypeResponse.model_validate(spirit_type) if spirit_type else None
+
+        return await run_db(db, fetch)
+
+    @staticmethod
+    async def get_spirit_type(
+        db: Union[AsyncSession, Session], spirit_type_id: int, user_id: int
+    ) -> Optional[SpiritTypeResponse]:
+        def fetch(session: Session) -> Optional[SpiritTypeResponse]:
+            spirit_type = SpiritTypeService.get_spirit_type(session, spirit_type_id, user_id)
+            return SpiritTypeResponse.model_validate(spirit_type) if spirit_type else None
+
+        return await run_db(db, fetch)
+
+    @staticmethod
+    async def update_spirit_type(
+        db: Union[AsyncSession, Session], spirit_type_id: int, name: str, user_id: int
+    ) -> SpiritTypeResponse:
+        def update(session: Session) -> SpiritTypeResponse:
+            return SpiritTypeResponse.model_validate(
+                SpiritTypeService.update_spirit_type(session, spirit_type_id, name, user_id)
+            )
+
+        return await run_db(db, update)
+
+    @staticmethod
+    async def delete_spirit_type(db: Union[AsyncSession, Session], spirit_type_id: int, user_id: int) -> bool:
+        return await run_db(db, SpiritTypeService.delete_spirit_type, spirit_type_id, user_id)
+
+    @staticmethod
+    async def match_names(
+        db: Union[AsyncSession, Session], query: str, user_id: int, limit: int = 10, threshold: float = 0.3
+    ) -> List[SpiritTypeMatchResponse]:
+        """Typo-tolerant lookup of the user's spirit types by name"""
+        def match(session: Session) -> List[SpiritTypeMatchResponse]:
+            matches = TrigramIndexService.match(
+                session, ENTITY_SPIRIT_TYPE, query, user_id=user_id, limit=limit, threshold=threshold
+            )
+            return [SpiritTypeMatchResponse(spirit_type=spirit_type, similarity=score) for spirit_type, score in matches]
+
+        return await run_db(db, match)
@@ -0,0 +1,338 @@
+"""
+Trigram index for typo-tolerant name lookup.
+
+Names are normalized (casefolded, punctuation dropped, whitespace collapsed) and
+split into pg_trgm-style trigrams stored in `name_trigrams`. A lookup first
+counts how many names contain each of the query's trigrams, then finds
+candidates through the rarest ones only, reading at most MAX_POSTINGS postings
+however common the others are. The candidates sharing the most of them are
+scored by word similarity: the Jaccard similarity between the query and the
+closest run of words in the name, so "jamesn" still finds "Jameson Irish
+Whiskey". Only the best matches are loaded as model rows.
+"""
+import logging
+import math
+import re
+from functools import lru_cache
+from typing import Callable, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import CompoundSelect, Select, bindparam, func, literal_column, select, union_all
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.db.models.barcode_registry import BarcodeRegistry
+from app.db.models.bottle import Bottle
+from app.db.models.name_trigram import NameTrigram
+from app.db.models.spirit_type import SpiritType
+from app.db.upsert import insert_ignore
+
+logger = logging.getLogger(__name__)
+
+ENTITY_BOTTLE = "bottle"
+ENTITY_SPIRIT_TYPE = "spirit_type"
+ENTITY_BARCODE = "barcode"
+
+# Owner stored for entities that belong to no user (the barcode registry)
+GLOBAL_OWNER = 0
+
+_ENTITY_MODELS = {
+    ENTITY_BOTTLE: Bottle,
+    ENTITY_SPIRIT_TYPE: SpiritType,
+    ENTITY_BARCODE: BarcodeRegistry,
+}
+
+_APOSTROPHE_RE = re.compile(r"['’`]")
+_NON_WORD_RE = re.compile(r"[\W_]+", re.UNICODE)
+
+
+def normalize_name(name: str) -> str:
+    """Casefold, drop apostrophes, turn other punctuation into spaces and collapse whitespace"""
+    name = _APOSTROPHE_RE.sub("", name.casefold())
+    return " ".join(_NON_WORD_RE.sub(" ", name).split())
+
+
+@lru_cache(maxsize=4096)
+def _word_trigrams(word: str) -> FrozenSet[str]:
+    padded = f"  {word} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+def name_trigrams(name: str) -> Set[str]:
+    """Trigrams of each word, padded with two leading spaces and one trailing space"""
+    grams = set()
+    for word in normalize_name(name).split():
+        grams |= _word_trigrams(word)
+    return grams
+
+
+def similarity(a: Set[str], b: Set[str]) -> float:
+    """Jaccard similarity of two trigram sets"""
+    if not a or not b:
+        return 0.0
+    shared = len(a & b)
+    return shared / (len(a) + len(b) - shared)
+
+
+def word_similarity(query: str, name: str, query_grams: Optional[Set[str]] = None) -> float:
+    """
+    Best similarity between the query and any run of consecutive words in the
+    name with the same number of words as the query, or the whole name.
+    query_grams saves recomputing the query's trigrams when scoring many names.
+    """
+    if query_grams is None:
+        query_grams = name_trigrams(query)
+    # A name's trigrams are the union of its words' trigrams
+    word_grams = [_word_trigrams(word) for word in normalize_name(name).split()]
+    width = min(len(normalize_name(query).split()), len(word_grams))
+    best = similarity(query_grams, set().union(*word_grams))
+    for start in range(len(word_grams) - width + 1):
+        best = max(best, similarity(query_grams, set().union(*word_grams[start:start + width])))
+    return best
+
+
+@lru_cache(maxsize=64)
+def _posting_counts_statement(grams: int) -> CompoundSelect:
+    """
+    Postings of trigrams trigram_0 ... trigram_<grams - 1> of an entity and
+    owner, counted up to max_postings each. Built once per number of trigrams
+    so lookups reuse the compiled statement.
+    """
+    table = NameTrigram.__table__
+    return union_all(*(
+        select(literal_column(str(i)), func.count()).select_from(
+            select(table.c.entity_id)
+            .where(
+                table.c.entity == bindparam("entity"),
+                table.c.user_id == bindparam("user_id"),
+                table.c.trigram == bindparam(f"trigram_{i}"),
+            )
+            .limit(bindparam("max_postings"))
+            .subquery()
+        )
+        for i in range(grams)
+    ))
+
+
+@lru_cache(maxsize=64)
+def _candidates_statement(grams: int) -> Select:
+    """
+    Entities with the most postings among trigram_0 ... trigram_<grams - 1>,
+    reading at most per_trigram postings of each, best first
+    """
+    table = NameTrigram.__table__
+    matched = union_all(*(
+        select(gram_postings.c.entity_id).select_from(gram_postings)
+        for gram_postings in (
+            select(table.c.entity_id)
+            .where(
+                table.c.entity == bindparam("entity"),
+                table.c.user_id == bindparam("user_id"),
+                table.c.trigram == bindparam(f"trigram_{i}"),
+            )
+            .limit(bindparam("per_trigram"))
+            .subquery()
+            for i in range(grams)
+        )
+    )).subquery()
+    shared = func.count()
+    return (
+        select(matched.c.entity_id, shared)
+        .group_by(matched.c.entity_id)
+        .order_by(shared.desc(), matched.c.entity_id)
+        .limit(bindparam("candidates"))
+    )
+
+
+class TrigramIndexService:
+    """Service maintaining and querying the name trigram index"""
+
+    # Number of candidates re-scored per requested result
+    CANDIDATE_FACTOR = 5
+    # Postings counted per trigram to tell rare trigrams from common ones
+    MAX_COUNTED_POSTINGS = 500
+    # Most trigram postings a lookup reads to find its candidates
+    MAX_POSTINGS = 5000
+
+    @staticmethod
+    def index_name(
+        db: Session,
+        entity: str,
+        entity_id: int,
+        name: str,
+        user_id: Optional[int] = None,
+        old_name: Optional[str] = None,
+    ):
+        """
+        Store the trigrams for an entity's name, replacing those of old_name when
+        the name changed. Does not commit, so it joins the caller's transaction.
+        """
+        if old_name is not None:
+            TrigramIndexService.remove(db, entity, entity_id, old_name, user_id)
+        owner = GLOBAL_OWNER if user_id is None else user_id
+        db.add_all([
+            NameTrigram(entity=entity, user_id=owner, trigram=gram, entity_id=entity_id)
+            for gram in name_trigrams(name or "")
+        ])
+
+    @staticmethod
+    def index_names(db: Session, entity: str, names: Iterable[Tuple[int, str, Optional[int]]]):
+        """
+        Store the trigrams for many new (entity_id, name, user_id) entries with
+        one batched INSERT, for bulk writers. Trigrams already stored are
+        skipped. Does not commit.
+        """
+        rows = [
+            {"entity": entity, "user_id": GLOBAL_OWNER if user_id is None else user_id, "trigram": gram, "entity_id": entity_id}
+            for entity_id, name, user_id in names
+            for gram in name_trigrams(name or "")
+        ]
+        if rows:
+            db.execute(insert_ignore(db, NameTrigram.__table__), rows)
+
+    @staticmethod
+    def remove(db: Session, entity: str, entity_id: int, name: str, user_id: Optional[int] = None):
+        """Delete the trigrams stored for an entity's current name. Does not commit."""
+        grams = name_trigrams(name or "")
+        if not grams:
+            return
+        db.query(NameTrigram).filter(
+            NameTrigram.entity == entity,
+            NameTrigram.user_id == (GLOBAL_OWNER if user_id is None else user_id),
+            NameTrigram.trigram.in_(grams),
+            NameTrigram.entity_id == entity_id,
+        ).delete(synchronize_session=False)
+
+    @staticmethod
+    def match(
+        db: Session,
+        entity: str,
+        query: str,
+        user_id: Optional[int] = None,
+        limit: int = 10,
+        threshold: float = 0.3,
+        load: Optional[Callable[[], tuple]] = None,
+    ) -> List[Tuple[object, float]]:
+        """
+        Find the entities whose names best match a possibly misspelled query.
+
+        Args:
+            db: Database session
+            entity: One of ENTITY_BOTTLE, ENTITY_SPIRIT_TYPE, ENTITY_BARCODE
+            query: Name as typed by the user
+            user_id: Restrict to this owner (None searches the global registry)
+            limit: Maximum number of results
+            threshold: Minimum similarity between 0 and 1
+            load: Loader strategy for the matched rows, such as BottleLoad.SPIRIT_TYPE
+                when the caller serializes their relationships
+
+        Returns:
+            List of (model instance, similarity), best match first
+        """
+        query_grams = name_trigrams(query)
+        if not query_grams:
+            return []
+
+        owner = GLOBAL_OWNER if user_id is None else user_id
+        grams = sorted(query_grams)
+        counts = db.execute(
+            _posting_counts_statement(len(grams)),
+            {
+                "entity": entity,
+                "user_id": owner,
+                "max_postings": TrigramIndexService.MAX_COUNTED_POSTINGS,
+                **{f"trigram_{i}": gram for i, gram in enumerate(grams)},
+            },
+        ).all()
+        frequencies = {grams[int(i)]: count for i, count in counts}
+
+        # A candidate sharing c trigrams has similarity at most c / len(query_grams),
+        # so every match shares at least one of any len(query_grams) - min_shared + 1
+        # of the query's trigrams. Candidates are looked up through the rarest ones;
+        # word-start trigrams such as "  r" go last among equally common ones
+        min_shared = max(1, math.ceil(threshold * len(query_grams)))
+        rarest = sorted(grams, key=lambda gram: (frequencies[gram], gram.startswith(" "), gram))
+        candidate_grams = [gram for gram in rarest[:len(grams) - min_shared + 1] if frequencies[gram]]
+        if not candidate_grams:
+            return []
+
+        # Each of them contributes at most its share of MAX_POSTINGS postings
+        candidates = db.execute(
+            _candidates_statement(len(candidate_grams)),
+            {
+                "entity": entity,
+                "user_id": owner,
+                "per_trigram": TrigramIndexService.MAX_POSTINGS // len(candidate_grams),
+                "candidates": limit * TrigramIndexService.CANDIDATE_FACTOR,
+                **{f"trigram_{i}": gram for i, gram in enumerate(candidate_grams)},
+            },
+        ).all()
+        if not candidates:
+            return []
+
+        # Score on the names alone, then load only the rows that are returned
+        model = _ENTITY_MODELS[entity]
+        scored = []
+        for entity_id, name in db.query(model.id, model.name).filter(
+            model.id.in_([entity_id for entity_id, _ in candidates])
+        ):
+            score = word_similarity(query, name, query_grams)
+            if score >= threshold:
+                scored.append((entity_id, score))
+        scored.sort(key=lambda item: (-item[1], item[0]))
+        scored = scored[:limit]
+        if not scored:
+            return []
+
+        rows = {
+            row.id: row
+            for row in db.query(model)
+            .options(*(load() if load is not None else ()))
+            .filter(model.id.in_([entity_id for entity_id, _ in scored]))
+        }
+        return [(rows[entity_id], score) for entity_id, score in scored]
+
+    @staticmethod
+    def rebuild(db: Session) -> int:
+        """
+        Rebuild the whole index from the bottles, spirit types and barcode registry.
+        Returns the number of names indexed. Does not commit.
+        """
+        db.query(NameTrigram).delete(synchronize_session=False)
+        indexed = 0
+        sources = [
+            (ENTITY_BOTTLE, db.query(Bottle.id, Bottle.name, Bottle.user_id)),
+            (ENTITY_SPIRIT_TYPE, db.query(SpiritType.id, SpiritType.name, SpiritType.user_id).filter(
+                SpiritType.user_id.isnot(None)  # Catalog spirit types are not looked up by name
+            )),
+            (ENTITY_BARCODE, db.query(BarcodeRegistry.id, BarcodeRegistry.name, BarcodeRegistry.created_by_user_id)),
+        ]
+        for entity, rows in sources:
+            mappings = []
+            for entity_id, name, user_id in rows.yield_per(1000):
+                owner = GLOBAL_OWNER if entity == ENTITY_BARCODE else user_id
+                mappings.extend(
+                    {"entity": entity, "entity_id": entity_id, "trigram": gram, "user_id": owner}
+                    for gram in name_trigrams(name or "")
+                )
+                indexed += 1
+                if len(mappings) >= 10000:
+                    db.bulk_insert_mappings(NameTrigram, mappings)
+                    mappings = []
+            if mappings:
+                db.bulk_insert_mappings(NameTrigram, mappings)
+        return indexed
+
+
+def ensure_trigram_index(engine: Engine):
+    """Populate the trigram index on startup if it is empty but there are names to index"""
+    with Session(bind=engine) as db:
+        if db.query(NameTrigram.entity).first() is not None:
+            return
+        has_names = any(
+            db.query(model.id).first() is not None for model in _ENTITY_MODELS.values()
+        )
+        if not has_names:
+            return
+        indexed = TrigramIndexService.rebuild(db)
+        db.commit()
+        logger.info(f"Built trigram index for {indexed} names")
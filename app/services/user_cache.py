@@ -0,0 +1,128 @@
+"""
+Cache of authenticated users.
+
+get_current_user resolves the JWT subject through this cache, so most
+authenticated requests never query the users table. Entries are small
+CurrentUser records rather than ORM objects; they expire after a TTL, the
+cache is bounded in size, and a user's entry is dropped as soon as a change
+to that user commits (profile changes, deletes). Like the other in-process
+caches, other workers only see such changes once their entry expires, so
+the records only carry identity: collection versions, which change on every
+write, are read from the database when an ETag is built.
+"""
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.settings import settings
+from app.db.models.user import User
+
+
+@dataclass(frozen=True)
+class CurrentUser:
+    """Detached snapshot of the authenticated user"""
+
+    id: int
+    username: str
+    email: str
+    is_admin: bool
+    seed_status: Optional[str] = None  # Status of the background seed task, None if there is none
+
+    @classmethod
+    def from_user(cls, user: User, seed_status: Optional[str] = None) -> "CurrentUser":
+        return cls(
+            id=user.id,
+            username=user.username,
+            email=user.email,
+            is_admin=bool(user.is_admin),
+            seed_status=seed_status,
+        )
+
+
+class UserCacheService:
+    """Bounded TTL cache from token subject (username) to CurrentUser"""
+
+    _entries: "OrderedDict[str, Tuple[float, CurrentUser]]" = OrderedDict()
+    _usernames: Dict[int, str] = {}
+    _ttl = settings.AUTH_USER_CACHE_TTL_SECONDS
+    _max_size = settings.AUTH_USER_CACHE_MAX_SIZE
+    _hits = 0
+    _misses = 0
+    _lock = threading.Lock()
+
+    @staticmethod
+    def get(username: str) -> Optional[CurrentUser]:
+        with UserCacheService._lock:
+            entry = UserCacheService._entries.get(username)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    UserCacheService._remove(username)
+                UserCacheService._misses += 1
+                return None
+            UserCacheService._entries.move_to_end(username)
+            UserCacheService._hits += 1
+            return entry[1]
+
+    @staticmethod
+    def put(user: CurrentUser):
+        if UserCacheService._ttl <= 0:
+            return
+        with UserCacheService._lock:
+            UserCacheService._remove(user.username)
+            UserCacheService._entries[user.username] = (time.monotonic() + UserCacheService._ttl, user)
+            UserCacheService._usernames[user.id] = user.username
+            while len(UserCacheService._entries) > UserCacheService._max_size:
+                oldest = next(iter(UserCacheService._entries))
+                UserCacheService._remove(oldest)
+
+    @staticmethod
+    def invalidate(user_id: int):
+        with UserCacheService._lock:
+            username = UserCacheService._usernames.get(user_id)
+            if username is not None:
+                UserCacheService._remove(username)
+
+    @staticmethod
+    def clear():
+        with UserCacheService._lock:
+            UserCacheService._entries.clear()
+            UserCacheService._usernames.clear()
+
+    @staticmethod
+    def stats() -> Dict:
+        with UserCacheService._lock:
+            return {
+                "entries": len(UserCacheService._entries),
+                "hits": UserCacheService._hits,
+                "misses": UserCacheService._misses,
+            }
+
+    @staticmethod
+    def _remove(username: str):
+        # Caller holds the lock
+        entry = UserCacheService._entries.pop(username, None)
+        if entry is not None:
+            UserCacheService._usernames.pop(entry[1].id, None)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changed_users(session: Session, flush_context):
+    for obj in list(session.dirty) + list(session.deleted):
+        if isinstance(obj, User):
+            session.info.setdefault("changed_users", set()).add(obj.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_users(session: Session):
+    for user_id in session.info.pop("changed_users", ()):
+        UserCacheService.invalidate(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changed_users(session: Session):
+    session.info.pop("changed_users", None)
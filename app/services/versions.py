@@ -0,0 +1,72 @@
+from collections import Counter
+from typing import Dict, Union
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.db.models.user import User
+from app.db.routing import ReadYourWritesService
+from app.db.session import run_db
+from app.services.response_cache import ResponseCacheService
+
+BOTTLES = "bottles"
+RECIPES = "recipes"
+SPIRIT_TYPES = "spirit_types"
+
+_VERSION_COLUMNS = {
+    BOTTLES: User.bottles_version,
+    RECIPES: User.recipes_version,
+    SPIRIT_TYPES: User.spirit_types_version,
+}
+
+
+class CollectionVersionService:
+    """Per-user change counters for the bottle, recipe and spirit type collections"""
+
+    @staticmethod
+    def bump(db: Session, user_id: int, *collections: str):
+        """
+        Increment the version of each given collection in the caller's transaction.
+        The increment happens in SQL so concurrent writers never lose a bump.
+        """
+        values = {_VERSION_COLUMNS[name]: _VERSION_COLUMNS[name] + 1 for name in collections}
+        db.query(User).filter(User.id == user_id).update(values, synchronize_session=False)
+        # Cached responses for these collections are dropped once the write commits;
+        # bumps are counted so the availability index can follow the versions
+        db.info.setdefault("changed_collections", {}).setdefault(user_id, Counter()).update(collections)
+
+    @staticmethod
+    def get_versions(db: Session, user_id: int, *collections: str) -> Dict[str, int]:
+        """
+        Current version of each given collection, read from the database with one
+        primary key lookup. Versions are never cached per worker, since a worker
+        only hears about the writes it made itself.
+        """
+        row = (
+            db.query(*(_VERSION_COLUMNS[name] for name in collections))
+            .filter(User.id == user_id)
+            .one_or_none()
+        )
+        return {name: (row[i] if row is not None else 0) or 0 for i, name in enumerate(collections)}
+
+
+class AsyncCollectionVersionService:
+    """CollectionVersionService for async endpoints, run through run_db"""
+
+    @staticmethod
+    async def get_versions(db: Union[AsyncSession, Session], user_id: int, *collections: str) -> Dict[str, int]:
+        return await run_db(db, CollectionVersionService.get_versions, user_id, *collections)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_cached_responses(session: Session):
+    changed = session.info.pop("changed_collections", None)
+    for user_id, collections in (changed or {}).items():
+        ResponseCacheService.invalidate(user_id, collections)
+        # Until the replicas catch up, the user's reads go to the primary
+        ReadYourWritesService.mark(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changed_collections(session: Session):
+    session.info.pop("changed_collections", None)
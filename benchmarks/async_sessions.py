@@ -0,0 +1,112 @@
+"""
+Benchmark the CRUD endpoints on AsyncSession against the sync threadpool path.
+
+Fires concurrent uncached reads (GET /bottles/{id} and GET /recipes/{id})
+mixed with bottle updates at the app in-process, once per value of
+ASYNC_DB_SESSIONS. Each mode runs in its own process, since the setting is
+read when the engines are created, and reports requests/s and latency:
+
+    python -m benchmarks.async_sessions --concurrency 200 --requests 5000
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+PASSWORD = "benchmark123"
+
+
+def percentile(samples, pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+async def run_requests(app, headers: dict, bottle_ids, recipe_ids, concurrency: int, requests: int):
+    import httpx
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def one(i: int):
+            async with semaphore:
+                start = time.perf_counter()
+                if i % 10 == 0:
+                    bottle_id = bottle_ids[i % len(bottle_ids)]
+                    response = await client.put(f"/bottles/{bottle_id}", headers=headers, json={"capacity_ml": 700 + i % 50})
+                elif i % 2:
+                    response = await client.get(f"/recipes/{recipe_ids[i % len(recipe_ids)]}", headers=headers)
+                else:
+                    response = await client.get(f"/bottles/{bottle_ids[i % len(bottle_ids)]}", headers=headers)
+                return time.perf_counter() - start, response.status_code
+
+        start = time.perf_counter()
+        results = await asyncio.gather(*[one(i) for i in range(requests)])
+        return time.perf_counter() - start, results
+
+
+def run_mode(concurrency: int, requests: int, bottles: int):
+    """Runs in the child process, with ASYNC_DB_SESSIONS already in the environment"""
+    from fastapi.testclient import TestClient
+    from app.main import app
+    from app.services.seed_tasks import SeedTaskService
+
+    with TestClient(app) as client:
+        client.post("/auth/register", json={"username": "bench", "email": "bench@example.com", "password": PASSWORD})
+        token = client.post("/auth/login", json={"username_or_email": "bench", "password": PASSWORD}).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        SeedTaskService._queue.join()
+        spirit_type_id = client.get("/spirit_types", headers=headers).json()[0]["id"]
+        bulk = {"create": [{"name": f"Bottle {i:05d}", "spirit_type_id": spirit_type_id} for i in range(bottles)]}
+        bottle_ids = [r["id"] for r in client.post("/bottles/bulk", headers=headers, json=bulk).json()["results"]]
+        recipe_ids = [recipe["id"] for recipe in client.get("/recipes", headers=headers).json()]
+
+    elapsed, results = asyncio.run(run_requests(app, headers, bottle_ids, recipe_ids, concurrency, requests))
+    latencies = [latency for latency, status in results if status == 200]
+    errors = len(results) - len(latencies)
+    label = "async sessions" if os.environ["ASYNC_DB_SESSIONS"] == "true" else "sync threadpool"
+    print(
+        f"{label:16} req/s {len(latencies) / elapsed:8.1f}  "
+        f"p50 {statistics.median(latencies) * 1000:7.1f} ms  p99 {percentile(latencies, 99) * 1000:7.1f} ms  "
+        f"errors {errors}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--bottles", type=int, default=500)
+    parser.add_argument("--mode", choices=["async", "sync"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        run_mode(args.concurrency, args.requests, args.bottles)
+        return
+
+    print(f"{args.requests} requests, concurrency {args.concurrency}")
+    for mode in ("sync", "async"):
+        env = dict(os.environ)
+        env.setdefault("SECRET_KEY", "benchmark")
+        env.setdefault("H_ALGORITHM", "HS256")
+        env.setdefault("OLLAMA_HOST", "http://localhost:11434")
+        env.setdefault("OLLAMA_MODEL", "benchmark")
+        env.setdefault("PASSWORD_HASH_WORKERS", "0")
+        env.setdefault("BCRYPT_ROUNDS", "4")
+        env.setdefault("DB_MIGRATE_ON_STARTUP", "true")
+        env["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/bench.db"
+        env["ASYNC_DB_SESSIONS"] = "true" if mode == "async" else "false"
+        subprocess.run(
+            [sys.executable, "-m", "benchmarks.async_sessions", "--mode", mode,
+             "--concurrency", str(args.concurrency), "--requests", str(args.requests), "--bottles", str(args.bottles)],
+            env=env,
+            check=True,
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Check the cost of importing the app, which every worker boot and script pays.
+
+Imports app.main in fresh interpreters under `python -X importtime` and
+reports the median total import time and the slowest modules. Exits non-zero
+if the median is over --budget-ms, if a module that should only load on
+first use (the Ollama client, Alembic) was imported, or if importing created
+the database file:
+
+    python -m benchmarks.import_time --runs 5 --budget-ms 2500
+
+tests/test_import_time.py runs the same checks with the default budget.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from typing import List, Tuple
+
+# Median import time allowed, in milliseconds. The same code measures 1.2 to
+# 1.9 s on a shared machine depending on its load, so this leaves headroom;
+# IMPORT_TIME_BUDGET_MS sets a tighter budget on a quiet one
+BUDGET_MS = float(os.environ.get("IMPORT_TIME_BUDGET_MS", 2500))
+
+# Loaded by the code that needs them, never by importing the app
+LAZY_MODULES = ("ollama", "alembic")
+
+
+def import_app(env: dict) -> dict:
+    """Cumulative import time in microseconds of each imported module"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        modules[name] = int(cumulative)
+    return modules
+
+
+def measure(runs: int, budget_ms: float) -> Tuple[float, dict, List[str]]:
+    """
+    Import the app runs times. Returns the median import time in ms, the last
+    run's per-module times and the failed checks
+    """
+    database_path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    env = dict(os.environ)
+    env.setdefault("SECRET_KEY", "benchmark")
+    env.setdefault("H_ALGORITHM", "HS256")
+    env.setdefault("OLLAMA_HOST", "http://localhost:11434")
+    env.setdefault("OLLAMA_MODEL", "benchmark")
+    env["DATABASE_URL"] = f"sqlite:///{database_path}"
+
+    results = [import_app(env) for _ in range(runs)]
+    total_ms = statistics.median(result["app.main"] for result in results) / 1000
+
+    failures = []
+    if total_ms > budget_ms:
+        failures.append(f"import took {total_ms:.0f} ms, over the {budget_ms:.0f} ms budget")
+    eager = [name for name in LAZY_MODULES if name in results[-1]]
+    if eager:
+        failures.append(f"imported at startup: {', '.join(eager)}")
+    if os.path.exists(database_path):
+        failures.append("importing the app created the database")
+    return total_ms, results[-1], failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=BUDGET_MS)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    total_ms, modules, failures = measure(args.runs, args.budget_ms)
+    slowest = sorted(modules.items(), key=lambda item: item[1], reverse=True)[1:args.top + 1]
+
+    print(f"import app.main: median {total_ms:.0f} ms over {args.runs} runs (budget {args.budget_ms:.0f} ms)")
+    for name, cumulative in slowest:
+        print(f"  {cumulative / 1000:8.1f} ms  {name}")
+    for failure in failures:
+        print(f"FAIL {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Benchmark list response serialization: ORM + Pydantic + stdlib json (the
+FastAPI response_model path), ORM + Pydantic dump_json (the default path of
+the list endpoints) and column rows + orjson (FAST_JSON_RESPONSES).
+
+Runs against a throwaway SQLite database and reports rows/sec per path:
+
+    python -m benchmarks.list_serialization --sizes 1000 10000 100000
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ.setdefault("H_ALGORITHM", "HS256")
+os.environ.setdefault("OLLAMA_HOST", "http://localhost:11434")
+os.environ.setdefault("OLLAMA_MODEL", "benchmark")
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base import Base
+from app.db.models.bottle import Bottle
+from app.db.models.recipe import Recipe
+from app.db.models.shared_table import recipes_to_spirits
+from app.db.models.spirit_type import SpiritType
+from app.db.models.user import User
+from app.core.cache import serialize_list
+from app.core.fast_json import encode_bottle_rows, encode_recipe_rows
+from app.schemas.bottle import BottleResponse
+from app.schemas.recipe import RecipeResponse
+from app.services.bottle import BottleService
+from app.services.loaders import BottleLoad, RecipeLoad
+from app.services.recipe import RecipeService
+
+SPIRIT_TYPES = 20
+INGREDIENTS = [
+    {"name": "Gin", "quantity": "2", "unit": "oz"},
+    {"name": "Lime juice", "quantity": "0.75", "unit": "oz"},
+    {"name": "Simple syrup", "quantity": "0.5", "unit": "oz"},
+]
+
+
+def populate(session, size: int):
+    session.add(User(id=1, username="bench", email="bench@example.com", hashed_password="x"))
+    session.execute(insert(SpiritType), [{"id": i, "name": f"Spirit {i}", "user_id": 1} for i in range(1, SPIRIT_TYPES + 1)])
+    session.execute(insert(Bottle), [
+        {
+            "name": f"Bottle {i:06d}",
+            "brand": f"Brand {i % 50}",
+            "flavor_profile": "Oak, vanilla, caramel",
+            "capacity_ml": 750,
+            "spirit_type_id": i % SPIRIT_TYPES + 1,
+            "user_id": 1,
+        }
+        for i in range(size)
+    ])
+    session.execute(insert(Recipe), [
+        {"id": i + 1, "name": f"Recipe {i:06d}", "instructions": "Shake with ice and strain.", "ingredients": INGREDIENTS, "user_id": 1}
+        for i in range(size)
+    ])
+    session.execute(insert(recipes_to_spirits), [
+        {"recipe_id": i + 1, "spirit_type_id": (i + offset) % SPIRIT_TYPES + 1}
+        for i in range(size)
+        for offset in (0, 7)
+    ])
+    session.commit()
+
+
+def measure(session, fn, repeat: int):
+    """Best-of-repeat wall time; the session is cleared so every run loads fresh objects"""
+    best = float("inf")
+    size = 0
+    for _ in range(repeat):
+        session.expunge_all()
+        start = time.perf_counter()
+        size = len(fn())
+        best = min(best, time.perf_counter() - start)
+    return best, size
+
+
+def run(size: int, repeat: int):
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{directory}/bench.db")
+        Base.metadata.create_all(engine)
+        session = sessionmaker(bind=engine)()
+        populate(session, size)
+
+        bottles_adapter = TypeAdapter(list[BottleResponse])
+        recipes_adapter = TypeAdapter(list[RecipeResponse])
+        paths = {
+            "bottles": {
+                "orm + pydantic + json": lambda: json.dumps(jsonable_encoder(bottles_adapter.validate_python(
+                    BottleService.get_bottles(session, 1, load=BottleLoad.SPIRIT_TYPE), from_attributes=True
+                ))),
+                "orm + pydantic dump_json": lambda: serialize_list(
+                    BottleResponse, BottleService.get_bottles(session, 1, load=BottleLoad.SPIRIT_TYPE)
+                ),
+                "rows + orjson": lambda: encode_bottle_rows(BottleService.get_bottle_rows(session, 1)),
+            },
+            "recipes": {
+                "orm + pydantic + json": lambda: json.dumps(jsonable_encoder(recipes_adapter.validate_python(
+                    RecipeService.get_recipes(session, 1, load=RecipeLoad.SPIRIT_TYPES), from_attributes=True
+                ))),
+                "orm + pydantic dump_json": lambda: serialize_list(
+                    RecipeResponse, RecipeService.get_recipes(session, 1, load=RecipeLoad.SPIRIT_TYPES)
+                ),
+                "rows + orjson": lambda: encode_recipe_rows(*RecipeService.get_recipe_rows(session, 1)),
+            },
+        }
+
+        for collection, variants in paths.items():
+            baseline = None
+            for label, fn in variants.items():
+                elapsed, body_size = measure(session, fn, repeat)
+                baseline = baseline or elapsed
+                print(
+                    f"{collection:8} {size:>7} rows  {label:26} {size / elapsed:>12,.0f} rows/s"
+                    f"  {elapsed * 1000:>9.1f} ms  {body_size / 1024:>9.0f} KiB  x{baseline / elapsed:.1f}"
+                )
+        session.close()
+        engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    for size in args.sizes:
+        run(size, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
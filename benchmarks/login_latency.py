@@ -0,0 +1,111 @@
+"""
+Benchmark login latency under concurrent load.
+
+Fires bursts of concurrent POST /auth/login requests against the app in-process
+while a second stream of cheap authenticated reads (GET /spirit_types) runs,
+and reports p50/p99 for both. Runs once with bcrypt on the shared threadpool
+(PASSWORD_HASH_WORKERS=0, how logins behaved before the hashing pool) and
+once with the process pool:
+
+    python -m benchmarks.login_latency --concurrency 32 --requests 256 --rounds 10
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+DATABASE_DIR = tempfile.mkdtemp()
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{DATABASE_DIR}/bench.db")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ.setdefault("H_ALGORITHM", "HS256")
+os.environ.setdefault("OLLAMA_HOST", "http://localhost:11434")
+os.environ.setdefault("OLLAMA_MODEL", "benchmark")
+os.environ.setdefault("DB_MIGRATE_ON_STARTUP", "true")
+
+import httpx
+
+PASSWORD = "benchmark123"
+
+
+def percentile(samples, pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+async def timed(client, method: str, url: str, **kwargs):
+    start = time.perf_counter()
+    response = await client.request(method, url, **kwargs)
+    return time.perf_counter() - start, response.status_code
+
+
+async def run_mode(app, workers: int, concurrency: int, requests: int, headers: dict):
+    from app.core.auth import password_hasher
+
+    password_hasher.shutdown()
+    password_hasher.workers = workers
+    password_hasher.max_pending = max(password_hasher.max_pending, concurrency)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        # Warm up the pool so process start-up is not measured
+        await client.post("/auth/login", json={"username_or_email": "bench", "password": PASSWORD})
+
+        semaphore = asyncio.Semaphore(concurrency)
+        done = asyncio.Event()
+
+        async def login():
+            async with semaphore:
+                return await timed(client, "POST", "/auth/login", json={"username_or_email": "bench", "password": PASSWORD})
+
+        async def reads():
+            samples = []
+            while not done.is_set():
+                samples.append((await timed(client, "GET", "/spirit_types", headers=headers))[0])
+            return samples
+
+        reader = asyncio.create_task(reads())
+        start = time.perf_counter()
+        results = await asyncio.gather(*[login() for _ in range(requests)])
+        elapsed = time.perf_counter() - start
+        done.set()
+        read_samples = await reader
+
+    latencies = [latency for latency, status in results if status == 200]
+    shed = sum(1 for _, status in results if status == 503)
+    label = "threadpool" if workers == 0 else f"process pool ({workers})"
+    print(
+        f"{label:18} logins/s {len(latencies) / elapsed:7.1f}  "
+        f"login p50 {statistics.median(latencies) * 1000:7.1f} ms  p99 {percentile(latencies, 99) * 1000:7.1f} ms  "
+        f"shed {shed:3}  reads p50 {statistics.median(read_samples) * 1000:6.1f} ms  "
+        f"p99 {percentile(read_samples, 99) * 1000:7.1f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=256)
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+    os.environ["BCRYPT_ROUNDS"] = str(args.rounds)
+
+    from fastapi.testclient import TestClient
+    from app.core.auth import password_hasher
+    from app.main import app
+
+    with TestClient(app) as client:
+        client.post("/auth/register", json={"username": "bench", "email": "bench@example.com", "password": PASSWORD})
+        token = client.post("/auth/login", json={"username_or_email": "bench", "password": PASSWORD}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    print(f"bcrypt rounds {args.rounds}, {args.requests} logins, concurrency {args.concurrency}")
+    for workers in (0, args.workers):
+        asyncio.run(run_mode(app, workers, args.concurrency, args.requests, headers))
+    password_hasher.shutdown()
+
+
+if __name__ == "__main__":
+    main()
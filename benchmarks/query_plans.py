@@ -0,0 +1,212 @@
+"""
+Check that the hot service queries use indexes on a large database.
+
+Fills a throwaway database with --rows bottles, recipes and recipe/spirit
+type links spread over one user per thousand rows, runs ANALYZE, then calls
+the request-path methods of the bottle, recipe, spirit type, availability
+and export services for one user while recording every SELECT, UPDATE and
+DELETE they issue. Each recorded statement is run again under EXPLAIN, and
+the script exits non-zero if any plan scans a whole table:
+
+    python -m benchmarks.query_plans --rows 1000000
+
+SQLite is used by default; pass --database-url with an empty PostgreSQL
+database to check its plans instead.
+"""
+import argparse
+import os
+import re
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ.setdefault("H_ALGORITHM", "HS256")
+os.environ.setdefault("OLLAMA_HOST", "http://localhost:11434")
+os.environ.setdefault("OLLAMA_MODEL", "benchmark")
+
+from sqlalchemy import event, insert, text
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base import Base
+from app.db.models.bottle import Bottle
+from app.db.models.recipe import Recipe
+from app.db.models.shared_table import recipes_to_spirits
+from app.db.models.spirit_type import SpiritType
+from app.db.models.user import User
+from app.db.session import create_db_engine
+from app.schemas.bottle import BottleCreate, BottleUpdate
+from app.schemas.recipe import RecipeCreate, RecipeUpdate
+from app.schemas.spirit_type import SpiritTypeCreate
+from app.services.availability import RecipeAvailabilityService
+from app.services.bottle import BottleService
+from app.services.export import ExportService
+from app.services.loaders import BottleLoad, RecipeLoad
+from app.services.recipe import RecipeService
+from app.services.spirit_type import SpiritTypeService
+
+ROWS_PER_USER = 1000
+SPIRIT_TYPES_PER_USER = 20
+CHUNK = 50_000
+INGREDIENTS = [{"name": "Gin", "quantity": "2", "unit": "oz"}]
+
+# SQLite reports "SCAN <table>" (older versions "SCAN TABLE <table>") for a
+# full pass over a table or index, and "SEARCH" for a bounded lookup
+SQLITE_SCAN_RE = re.compile(r"^SCAN (?:TABLE )?(\w+)")
+POSTGRESQL_SCAN_RE = re.compile(r"Seq Scan on (\w+)")
+
+
+def insert_chunked(session, table, rows):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == CHUNK:
+            session.execute(insert(table), batch)
+            batch = []
+    if batch:
+        session.execute(insert(table), batch)
+
+
+def populate(session, rows: int) -> int:
+    users = max(1, rows // ROWS_PER_USER)
+    spirit_types = users * SPIRIT_TYPES_PER_USER
+    insert_chunked(session, User, (
+        {"id": i, "username": f"user{i}", "email": f"user{i}@example.com", "hashed_password": "x"}
+        for i in range(1, users + 1)
+    ))
+    insert_chunked(session, SpiritType, (
+        {"id": i, "name": f"Spirit {i % SPIRIT_TYPES_PER_USER}", "user_id": (i - 1) // SPIRIT_TYPES_PER_USER + 1}
+        for i in range(1, spirit_types + 1)
+    ))
+
+    def spirit_type_of(i: int) -> int:
+        # One of the owning user's spirit types, each used by some of their bottles
+        user_id = i % users + 1
+        return (user_id - 1) * SPIRIT_TYPES_PER_USER + i // users % SPIRIT_TYPES_PER_USER + 1
+
+    insert_chunked(session, Bottle, (
+        {
+            "id": i,
+            "name": f"Bottle {i:07d}",
+            "brand": f"Brand {i % 50}",
+            "capacity_ml": 750,
+            "spirit_type_id": spirit_type_of(i),
+            "user_id": i % users + 1,
+        }
+        for i in range(1, rows + 1)
+    ))
+    insert_chunked(session, Recipe, (
+        {"id": i, "name": f"Recipe {i:07d}", "instructions": "Stir.", "ingredients": INGREDIENTS, "user_id": i % users + 1}
+        for i in range(1, rows + 1)
+    ))
+    insert_chunked(session, recipes_to_spirits, (
+        {"recipe_id": i, "spirit_type_id": spirit_type_of(i)} for i in range(1, rows + 1)
+    ))
+    if session.bind.dialect.name == "postgresql":
+        # The IDs above were explicit, so move the sequences past them
+        for table in ("users", "spirit_types", "bottles", "recipes"):
+            session.execute(text(f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), (SELECT max(id) FROM {table}))"))
+    session.commit()
+    return users
+
+
+def exercise(db, user_id: int):
+    """The service calls behind the CRUD, availability and export endpoints"""
+    bottles = BottleService.get_bottles(db, user_id, load=BottleLoad.SPIRIT_TYPE, limit=50)
+    cursor = BottleService.encode_cursor(bottles[-1])
+    BottleService.get_bottles(db, user_id, limit=50, cursor=cursor)
+    BottleService.get_bottles(db, user_id, name="Bottle 00", brand="Brand 1", spirit_type_id=bottles[0].spirit_type_id)
+    BottleService.get_bottle_rows(db, user_id, limit=50)
+    BottleService.get_bottle(db, bottles[0].id, user_id, load=BottleLoad.SPIRIT_TYPE)
+    bottle = BottleService.create_bottle(db, BottleCreate(name="New bottle", spirit_type_id=bottles[0].spirit_type_id), user_id)
+    BottleService.update_bottle(db, bottle.id, BottleUpdate(capacity_ml=700), user_id)
+    BottleService.delete_bottle(db, bottle.id, user_id)
+
+    spirit_types = SpiritTypeService.get_spirit_types(db, user_id)
+    SpiritTypeService.get_spirit_type_rows(db, user_id)
+    SpiritTypeService.get_spirit_type(db, spirit_types[0].id, user_id)
+    spirit_type = SpiritTypeService.create_spirit_type(db, SpiritTypeCreate(name="New spirit"), user_id)
+    SpiritTypeService.update_spirit_type(db, spirit_type.id, "Renamed spirit", user_id)
+    SpiritTypeService.delete_spirit_type(db, spirit_type.id, user_id)
+    try:
+        SpiritTypeService.delete_spirit_type(db, spirit_types[0].id, user_id)
+    except ValueError:
+        db.rollback()
+
+    recipes = RecipeService.get_recipes(db, user_id, load=RecipeLoad.SPIRIT_TYPES)
+    RecipeService.get_recipe_rows(db, user_id)
+    RecipeService.get_recipe(db, recipes[0].id, user_id, load=RecipeLoad.SPIRIT_TYPES)
+    RecipeService.get_recipes_by_ids(db, [recipe.id for recipe in recipes[:5]], user_id)
+    recipe = RecipeService.create_recipe(
+        db,
+        RecipeCreate(name="New recipe", instructions="Shake.", ingredients=INGREDIENTS, spirit_type_ids=[spirit_types[0].id]),
+        user_id,
+    )
+    RecipeService.update_recipe(db, recipe.id, RecipeUpdate(spirit_type_ids=[spirit_types[1].id]), user_id)
+    RecipeService.delete_recipe(db, recipe.id, user_id)
+
+    RecipeAvailabilityService.invalidate(user_id)
+    RecipeAvailabilityService.get_available_recipes(db, user_id)
+    for _ in ExportService.stream_ndjson(db, user_id, ["spirit_types", "bottles", "recipes"]):
+        pass
+
+
+def full_scans(conn, statement: str, parameters) -> list:
+    if conn.dialect.name == "sqlite":
+        plan = [row[-1] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)]
+        scans = [line for line in plan if SQLITE_SCAN_RE.match(line) and SQLITE_SCAN_RE.match(line).group(1) in Base.metadata.tables]
+    else:
+        plan = [row[0] for row in conn.exec_driver_sql(f"EXPLAIN {statement}", parameters)]
+        scans = [line.strip() for line in plan if POSTGRESQL_SCAN_RE.search(line)]
+    return scans
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--database-url", default=None)
+    args = parser.parse_args()
+
+    url = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+    engine = create_db_engine(url)
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    start = time.perf_counter()
+    with Session() as session:
+        users = populate(session, args.rows)
+    with engine.begin() as conn:
+        conn.execute(text("ANALYZE"))
+    print(f"{args.rows} rows per table, {users} users, loaded in {time.perf_counter() - start:.1f}s")
+
+    statements = {}
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and statement.lstrip().split(None, 1)[0].upper() in ("SELECT", "UPDATE", "DELETE"):
+            statements.setdefault(statement, parameters)
+
+    with Session() as db:
+        exercise(db, users // 2 + 1)
+    event.remove(engine, "before_cursor_execute", record)
+
+    failures = 0
+    with engine.connect() as conn:
+        if conn.dialect.name == "postgresql":
+            # The planner prefers sequential scans of small tables even with an
+            # index; this way a remaining Seq Scan means no index fits the query
+            conn.exec_driver_sql("SET enable_seqscan = off")
+        for statement, parameters in statements.items():
+            scans = full_scans(conn, statement, parameters)
+            if scans:
+                failures += 1
+                print(f"FULL SCAN {'; '.join(scans)}\n    {' '.join(statement.split())}\n")
+    engine.dispose()
+
+    print(f"{len(statements)} distinct statements, {failures} with a full table scan")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+"""
+Benchmark SQLite read throughput while writes are in flight.
+
+Reader threads list a user's bottles and recipes through the services, one
+session per read like a request, while writer threads create and update
+bottles and create recipes, committing each one. Runs once with SQLite's
+defaults (rollback journal, the connection profile disabled) and once with
+the profile from settings (WAL, synchronous=NORMAL, mmap, cache size, busy
+timeout, foreign keys), each against its own throwaway database file, and
+reports reads/s, read p50/p99, writes/s and lock errors:
+
+    python -m benchmarks.sqlite_concurrency --readers 8 --writers 2 --seconds 10
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import threading
+import time
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ.setdefault("H_ALGORITHM", "HS256")
+os.environ.setdefault("OLLAMA_HOST", "http://localhost:11434")
+os.environ.setdefault("OLLAMA_MODEL", "benchmark")
+
+from sqlalchemy import insert
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base import Base
+from app.db.fts import create_fts_tables
+from app.db.models.bottle import Bottle
+from app.db.models.recipe import Recipe
+from app.db.models.shared_table import recipes_to_spirits
+from app.db.models.spirit_type import SpiritType
+from app.db.models.user import User
+from app.db.session import create_db_engine
+from app.schemas.bottle import BottleCreate, BottleUpdate
+from app.schemas.recipe import RecipeCreate
+from app.services.bottle import BottleService
+from app.services.recipe import RecipeService
+
+SPIRIT_TYPES = 20
+INGREDIENTS = [
+    {"name": "Gin", "quantity": "2", "unit": "oz"},
+    {"name": "Lime juice", "quantity": "0.75", "unit": "oz"},
+    {"name": "Simple syrup", "quantity": "0.5", "unit": "oz"},
+]
+
+
+def percentile(samples, pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def populate(session, bottles: int, recipes: int):
+    session.add(User(id=1, username="bench", email="bench@example.com", hashed_password="x"))
+    session.flush()
+    session.execute(insert(SpiritType), [{"id": i, "name": f"Spirit {i}", "user_id": 1} for i in range(1, SPIRIT_TYPES + 1)])
+    session.execute(insert(Bottle), [
+        {
+            "name": f"Bottle {i:06d}",
+            "brand": f"Brand {i % 50}",
+            "flavor_profile": "Oak, vanilla, caramel",
+            "capacity_ml": 750,
+            "spirit_type_id": i % SPIRIT_TYPES + 1,
+            "user_id": 1,
+        }
+        for i in range(bottles)
+    ])
+    session.execute(insert(Recipe), [
+        {"id": i, "name": f"Recipe {i:06d}", "instructions": "Shake with ice and strain.", "ingredients": INGREDIENTS, "user_id": 1}
+        for i in range(1, recipes + 1)
+    ])
+    session.execute(insert(recipes_to_spirits), [
+        {"recipe_id": i, "spirit_type_id": i % SPIRIT_TYPES + 1} for i in range(1, recipes + 1)
+    ])
+    session.commit()
+
+
+def run_mode(profile: bool, readers: int, writers: int, seconds: float, bottles: int, recipes: int):
+    path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    engine = create_db_engine(f"sqlite:///{path}", sqlite_profile=profile, pool_size=readers + writers)
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        create_fts_tables(conn)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    with Session() as session:
+        populate(session, bottles, recipes)
+
+    stop = threading.Event()
+    lock = threading.Lock()
+    read_samples, write_samples = [], []
+    errors = {"locked": 0}
+
+    def reader(worker: int):
+        samples = []
+        turn = worker
+        while not stop.is_set():
+            start = time.perf_counter()
+            try:
+                with Session() as db:
+                    if turn % 2:
+                        RecipeService.get_recipes(db, 1)
+                    else:
+                        BottleService.get_bottles(db, 1, limit=100)
+            except OperationalError:
+                with lock:
+                    errors["locked"] += 1
+                continue
+            samples.append(time.perf_counter() - start)
+            turn += 1
+        with lock:
+            read_samples.extend(samples)
+
+    def writer(worker: int):
+        samples = []
+        turn = 0
+        while not stop.is_set():
+            start = time.perf_counter()
+            try:
+                with Session() as db:
+                    spirit_type_id = turn % SPIRIT_TYPES + 1
+                    if turn % 3 == 0:
+                        BottleService.create_bottle(
+                            db, BottleCreate(name=f"New {worker}-{turn}", spirit_type_id=spirit_type_id), 1
+                        )
+                    elif turn % 3 == 1:
+                        BottleService.update_bottle(
+                            db, turn % bottles + 1, BottleUpdate(capacity_ml=700 + turn % 100), 1
+                        )
+                    else:
+                        RecipeService.create_recipe(
+                            db,
+                            RecipeCreate(
+                                name=f"New {worker}-{turn}",
+                                instructions="Stir with ice.",
+                                ingredients=INGREDIENTS,
+                                spirit_type_ids=[spirit_type_id],
+                            ),
+                            1,
+                        )
+            except OperationalError:
+                with lock:
+                    errors["locked"] += 1
+                continue
+            samples.append(time.perf_counter() - start)
+            turn += 1
+        with lock:
+            write_samples.extend(samples)
+
+    threads = [threading.Thread(target=reader, args=(i,)) for i in range(readers)]
+    threads += [threading.Thread(target=writer, args=(i,)) for i in range(writers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    engine.dispose()
+
+    label = "tuned profile" if profile else "sqlite defaults"
+    print(
+        f"{label:16} reads/s {len(read_samples) / seconds:8.1f}  "
+        f"read p50 {statistics.median(read_samples) * 1000:6.1f} ms  p99 {percentile(read_samples, 99) * 1000:7.1f} ms  "
+        f"writes/s {len(write_samples) / seconds:6.1f}  "
+        f"write p99 {percentile(write_samples, 99) * 1000:7.1f} ms  locked {errors['locked']}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--bottles", type=int, default=5000)
+    parser.add_argument("--recipes", type=int, default=500)
+    args = parser.parse_args()
+
+    print(f"{args.readers} readers, {args.writers} writers, {args.seconds:g}s per mode")
+    for profile in (False, True):
+        run_mode(profile, args.readers, args.writers, args.seconds, args.bottles, args.recipes)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Check fuzzy name lookup latency on a large barcode registry.
+
+Fills a throwaway database with --rows registry entries named like real
+bottles (a brand followed by common words such as "Reserve" or "Bourbon
+Whiskey"), indexes their trigrams, then times TrigramIndexService.match for
+misspelled and partial queries. Reports the median time per query and exits
+non-zero if any median is over --budget-ms:
+
+    python -m benchmarks.trigram_lookup --rows 100000 --budget-ms 10
+
+SQLite is used by default; pass --database-url with an empty PostgreSQL
+database to time it instead. A database that already has registry entries
+is reused as is.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ.setdefault("H_ALGORITHM", "HS256")
+os.environ.setdefault("OLLAMA_HOST", "http://localhost:11434")
+os.environ.setdefault("OLLAMA_MODEL", "benchmark")
+
+from sqlalchemy import insert, text
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base import Base
+from app.db.models.barcode_registry import BarcodeRegistry
+from app.db.models.name_trigram import NameTrigram
+# Register the models the indexed ones have relationships to
+from app.db.models.recipe import Recipe  # noqa: F401
+from app.db.models.user import User  # noqa: F401
+from app.db.session import create_db_engine
+from app.services.trigram import ENTITY_BARCODE, TrigramIndexService
+
+CHUNK = 10_000
+BRANDS = [
+    "Jameson", "Maker's Mark", "Hendrick's", "Buffalo Trace", "Tanqueray", "Bombay Sapphire",
+    "Glenfiddich", "Glenlivet", "Lagavulin", "Laphroaig", "Woodford Reserve", "Wild Turkey",
+    "Four Roses", "Bulleit", "Jack Daniel's", "Johnnie Walker", "Bacardi", "Havana Club",
+    "Appleton Estate", "Mount Gay", "Patron", "Don Julio", "Casamigos", "Grey Goose",
+    "Absolut", "Ketel One", "Beefeater", "Monkey 47", "Redbreast", "Bushmills",
+]
+WORDS = [
+    "Reserve", "Single Barrel", "Small Batch", "Bourbon Whiskey", "Rye Whiskey", "Straight",
+    "Kentucky", "London Dry Gin", "Gin", "Rum", "Dark Rum", "White Rum", "Spiced Rum", "Vodka",
+    "Tequila", "Blanco", "Reposado", "Anejo", "Single Malt Scotch", "Blended Scotch", "Irish Whiskey",
+    "Cask Strength", "Barrel Proof", "Aged 12 Years", "Aged 18 Years", "Limited Edition", "Original",
+    "Black Label", "Gold", "Select", "Private Selection", "Double Oak", "Port Finish", "Sherry Cask",
+]
+SYLLABLES = ["bar", "ton", "mac", "glen", "kil", "dun", "ard", "ber", "mor", "lin", "ash", "wood",
+             "ford", "ville", "ridge", "stone", "hill", "brook", "haven", "dale", "castle", "vale"]
+QUERIES = ["jamesn", "makers mark", "hendriks gin", "buffalo trace reserve", "glenfidich 12",
+           "woodford reserv", "bourbon", "spiced rum", "londn dry gin", "four roses single barrel"]
+
+
+def registry_names(rows: int):
+    """Names like real bottles: a few well-known brands and many generated ones, with common words"""
+    generator = random.Random(42)
+    brands = BRANDS + [
+        "".join(generator.choice(SYLLABLES) for _ in range(generator.randint(2, 3))).title()
+        for _ in range(rows // 20)
+    ]
+    for _ in range(rows):
+        words = generator.sample(WORDS, generator.randint(1, 3))
+        yield " ".join([generator.choice(brands)] + words)
+
+
+def populate(session, rows: int):
+    batch = []
+    for i, name in enumerate(registry_names(rows), start=1):
+        batch.append({"id": i, "barcode": f"{i:013d}", "name": name})
+        if len(batch) >= CHUNK:
+            session.execute(insert(BarcodeRegistry), batch)
+            TrigramIndexService.index_names(session, ENTITY_BARCODE, [(r["id"], r["name"], None) for r in batch])
+            batch = []
+    if batch:
+        session.execute(insert(BarcodeRegistry), batch)
+        TrigramIndexService.index_names(session, ENTITY_BARCODE, [(r["id"], r["name"], None) for r in batch])
+    session.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--runs", type=int, default=21)
+    parser.add_argument("--budget-ms", type=float, default=10.0)
+    parser.add_argument("--database-url")
+    args = parser.parse_args()
+
+    database_url = args.database_url or f"sqlite:///{tempfile.mkdtemp()}/bench.db"
+    engine = create_db_engine(database_url)
+    Base.metadata.create_all(engine, tables=[BarcodeRegistry.__table__, NameTrigram.__table__])
+    session = sessionmaker(bind=engine)()
+
+    if session.query(BarcodeRegistry.id).first() is None:
+        started = time.perf_counter()
+        populate(session, args.rows)
+        with engine.connect() as connection:
+            connection.execute(text("ANALYZE"))
+            connection.commit()
+        print(f"Indexed {args.rows} registry names in {time.perf_counter() - started:.1f}s")
+    else:
+        print(f"Reusing the {session.query(BarcodeRegistry).count()} registry names already in the database")
+
+    over = []
+    for query in QUERIES:
+        times = []
+        for _ in range(args.runs):
+            session.expunge_all()
+            start = time.perf_counter()
+            matches = TrigramIndexService.match(session, ENTITY_BARCODE, query, limit=10)
+            times.append((time.perf_counter() - start) * 1000)
+        median = statistics.median(times)
+        best = f"{matches[0][0].name} ({matches[0][1]:.2f})" if matches else "-"
+        print(f"  {median:7.2f} ms  {query!r:28} {len(matches):2} matches, best {best}")
+        if median > args.budget_ms:
+            over.append(query)
+
+    session.close()
+    engine.dispose()
+    if over:
+        print(f"FAIL over the {args.budget_ms:.0f} ms budget: {', '.join(over)}")
+    sys.exit(1 if over else 0)
+
+
+if __name__ == "__main__":
+    main()
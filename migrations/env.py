@@ -16,6 +16,10 @@ from app.db.models.recipe import Recipe  # Import Recipe model
 from app.db.models.spirit_type import SpiritType  # Import SpiritType model
 from app.db.models.shared_table import recipes_to_spirits
 from app.db.models.user import User
+from app.db.models.barcode_registry import BarcodeRegistry
+from app.db.models.name_trigram import NameTrigram
+from app.db.models.seed_task import SeedTask
+from app.db.models.seed_version import SeedVersion
 
 target_metadata = Base.metadata
 
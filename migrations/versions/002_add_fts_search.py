@@ -0,0 +1,31 @@
+"""add fts5 search tables
+
+Revision ID: 002_add_fts_search
+Revises: 001_convert_ingredients
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+
+from app.db.fts import LEGACY_FTS_TABLES, LEGACY_PG_DOCUMENTS, create_fts_tables, drop_fts_tables
+
+# revision identifiers, used by Alembic.
+revision = '002_add_fts_search'
+down_revision = '001_convert_ingredients'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """
+    Create FTS5 virtual tables over bottles and recipes, plus the triggers
+    that keep them in sync. Only applies to SQLite.
+    """
+    create_fts_tables(op.get_bind(), LEGACY_FTS_TABLES, LEGACY_PG_DOCUMENTS)
+
+
+def downgrade() -> None:
+    """
+    Drop the FTS5 tables and triggers.
+    """
+    drop_fts_tables(op.get_bind())
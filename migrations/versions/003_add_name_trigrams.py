@@ -0,0 +1,79 @@
+"""add name trigram index
+
+Revision ID: 003_add_name_trigrams
+Revises: 002_add_fts_search
+Create Date: 2026-10-17
+
+"""
+import re
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '003_add_name_trigrams'
+down_revision = '002_add_fts_search'
+branch_labels = None
+depends_on = None
+
+# Table shapes and trigram rules as of this revision, so later model or
+# service changes do not alter what the backfill writes
+bottles = sa.table('bottles', sa.column('id', sa.Integer), sa.column('name', sa.String), sa.column('user_id', sa.Integer))
+spirit_types = sa.table(
+    'spirit_types', sa.column('id', sa.Integer), sa.column('name', sa.String), sa.column('user_id', sa.Integer)
+)
+barcode_registry = sa.table('barcode_registry', sa.column('id', sa.Integer), sa.column('name', sa.String))
+
+# Owner stored for the barcode registry, which belongs to no user
+GLOBAL_OWNER = 0
+
+_APOSTROPHE_RE = re.compile(r"['’`]")
+_NON_WORD_RE = re.compile(r"[\W_]+", re.UNICODE)
+
+
+def _name_trigrams(name: str) -> set:
+    """Trigrams of each normalized word, padded with two leading spaces and one trailing space"""
+    name = _APOSTROPHE_RE.sub("", name.casefold())
+    grams = set()
+    for word in _NON_WORD_RE.sub(" ", name).split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def upgrade() -> None:
+    """
+    Create the name_trigrams table used for fuzzy name lookup and
+    populate it from existing bottles, spirit types and barcodes.
+    """
+    name_trigrams = op.create_table(
+        'name_trigrams',
+        sa.Column('entity', sa.String(), primary_key=True),
+        sa.Column('user_id', sa.Integer(), primary_key=True),
+        sa.Column('trigram', sa.String(), primary_key=True),
+        sa.Column('entity_id', sa.Integer(), primary_key=True),
+    )
+
+    conn = op.get_bind()
+    sources = [
+        ('bottle', sa.select(bottles.c.id, bottles.c.name, bottles.c.user_id)),
+        ('spirit_type', sa.select(spirit_types.c.id, spirit_types.c.name, spirit_types.c.user_id).where(
+            spirit_types.c.user_id.isnot(None)
+        )),
+        ('barcode', sa.select(barcode_registry.c.id, barcode_registry.c.name, sa.literal(GLOBAL_OWNER))),
+    ]
+    for entity, names in sources:
+        rows = [
+            {'entity': entity, 'user_id': user_id, 'trigram': gram, 'entity_id': entity_id}
+            for entity_id, name, user_id in conn.execute(names)
+            for gram in _name_trigrams(name or '')
+        ]
+        if rows:
+            conn.execute(name_trigrams.insert(), rows)
+
+
+def downgrade() -> None:
+    """
+    Drop the name_trigrams table.
+    """
+    op.drop_table('name_trigrams')
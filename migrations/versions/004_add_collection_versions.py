@@ -0,0 +1,36 @@
+"""add per-user collection versions
+
+Revision ID: 004_add_collection_versions
+Revises: 003_add_name_trigrams
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '004_add_collection_versions'
+down_revision = '003_add_name_trigrams'
+branch_labels = None
+depends_on = None
+
+COLUMNS = ['bottles_version', 'recipes_version', 'spirit_types_version']
+
+
+def upgrade() -> None:
+    """
+    Add change counters for each user's collections, used to answer
+    conditional GETs on the list endpoints.
+    """
+    with op.batch_alter_table('users') as batch_op:
+        for column in COLUMNS:
+            batch_op.add_column(sa.Column(column, sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade() -> None:
+    """
+    Drop the collection version columns.
+    """
+    with op.batch_alter_table('users') as batch_op:
+        for column in COLUMNS:
+            batch_op.drop_column(column)
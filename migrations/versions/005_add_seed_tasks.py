@@ -0,0 +1,45 @@
+"""add seed tasks
+
+Revision ID: 005_add_seed_tasks
+Revises: 004_add_collection_versions
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '005_add_seed_tasks'
+down_revision = '004_add_collection_versions'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """
+    Create the table tracking background seeding of new user accounts.
+    Existing users were seeded during registration and get no row.
+    """
+    op.create_table(
+        'seed_tasks',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('status', sa.String(), nullable=False),
+        sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('last_error', sa.String(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_seed_tasks_id', 'seed_tasks', ['id'])
+    op.create_index('ix_seed_tasks_user_id', 'seed_tasks', ['user_id'], unique=True)
+
+
+def downgrade() -> None:
+    """
+    Drop the seed task table.
+    """
+    op.drop_index('ix_seed_tasks_user_id', table_name='seed_tasks')
+    op.drop_index('ix_seed_tasks_id', table_name='seed_tasks')
+    op.drop_table('seed_tasks')
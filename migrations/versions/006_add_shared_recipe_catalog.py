@@ -0,0 +1,80 @@
+"""add shared recipe catalog
+
+Revision ID: 006_add_shared_recipe_catalog
+Revises: 005_add_seed_tasks
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.db.fts import LEGACY_FTS_TABLES, LEGACY_PG_DOCUMENTS, create_fts_tables
+
+# revision identifiers, used by Alembic.
+revision = '006_add_shared_recipe_catalog'
+down_revision = '005_add_seed_tasks'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """
+    Let recipes and spirit types exist without an owner so the default
+    catalog is stored once, link users' spirit types and recipe copies back
+    to the catalog, and track which catalog recipes each user has hidden.
+    Existing users keep their own copies of the defaults and are not
+    switched over to the catalog.
+    """
+    with op.batch_alter_table('recipes') as batch_op:
+        batch_op.alter_column('user_id', existing_type=sa.Integer(), nullable=True)
+        batch_op.add_column(sa.Column('catalog_recipe_id', sa.Integer(), nullable=True))
+        batch_op.create_foreign_key('fk_recipes_catalog_recipe_id', 'recipes', ['catalog_recipe_id'], ['id'])
+        batch_op.create_index('ix_recipes_catalog_recipe_id', ['catalog_recipe_id'])
+
+    with op.batch_alter_table('spirit_types') as batch_op:
+        batch_op.alter_column('user_id', existing_type=sa.Integer(), nullable=True)
+        batch_op.add_column(sa.Column('catalog_spirit_type_id', sa.Integer(), nullable=True))
+        batch_op.create_foreign_key(
+            'fk_spirit_types_catalog_spirit_type_id', 'spirit_types', ['catalog_spirit_type_id'], ['id']
+        )
+        batch_op.create_index('ix_spirit_types_catalog_spirit_type_id', ['catalog_spirit_type_id'])
+
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.add_column(sa.Column('recipe_catalog', sa.Boolean(), nullable=False, server_default=sa.false()))
+
+    op.create_table(
+        'hidden_catalog_recipes',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('recipe_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.ForeignKeyConstraint(['recipe_id'], ['recipes.id']),
+        sa.PrimaryKeyConstraint('user_id', 'recipe_id'),
+    )
+
+    # SQLite batch mode rebuilds the recipes table, dropping its FTS sync triggers
+    create_fts_tables(op.get_bind(), LEGACY_FTS_TABLES, LEGACY_PG_DOCUMENTS)
+
+
+def downgrade() -> None:
+    """
+    Drop the catalog columns and table. Ownerless catalog rows must be
+    removed first, or the NOT NULL constraints cannot be restored.
+    """
+    op.drop_table('hidden_catalog_recipes')
+
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.drop_column('recipe_catalog')
+
+    with op.batch_alter_table('spirit_types') as batch_op:
+        batch_op.drop_index('ix_spirit_types_catalog_spirit_type_id')
+        batch_op.drop_constraint('fk_spirit_types_catalog_spirit_type_id', type_='foreignkey')
+        batch_op.drop_column('catalog_spirit_type_id')
+        batch_op.alter_column('user_id', existing_type=sa.Integer(), nullable=False)
+
+    with op.batch_alter_table('recipes') as batch_op:
+        batch_op.drop_index('ix_recipes_catalog_recipe_id')
+        batch_op.drop_constraint('fk_recipes_catalog_recipe_id', type_='foreignkey')
+        batch_op.drop_column('catalog_recipe_id')
+        batch_op.alter_column('user_id', existing_type=sa.Integer(), nullable=False)
+
+    create_fts_tables(op.get_bind(), LEGACY_FTS_TABLES, LEGACY_PG_DOCUMENTS)
@@ -0,0 +1,51 @@
+"""add seed versions
+
+Revision ID: 007_add_seed_versions
+Revises: 006_add_shared_recipe_catalog
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.db.fts import LEGACY_FTS_TABLES, LEGACY_PG_DOCUMENTS, create_fts_tables
+
+# revision identifiers, used by Alembic.
+revision = '007_add_seed_versions'
+down_revision = '006_add_shared_recipe_catalog'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """
+    Store a content hash on catalog recipes and the applied seed version on
+    users, and make catalog recipe names unique so concurrent catalog syncs
+    cannot duplicate a recipe. Existing users have no seed version and are
+    picked up by the reseed job.
+    """
+    with op.batch_alter_table('recipes') as batch_op:
+        batch_op.add_column(sa.Column('content_hash', sa.String(), nullable=True))
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.add_column(sa.Column('seed_version', sa.String(), nullable=True))
+    op.create_index(
+        'ux_recipes_catalog_name',
+        'recipes',
+        ['name'],
+        unique=True,
+        sqlite_where=sa.text('user_id IS NULL'),
+        postgresql_where=sa.text('user_id IS NULL'),
+    )
+
+
+def downgrade() -> None:
+    """
+    Drop the seed version columns and the catalog name index.
+    """
+    op.drop_index('ux_recipes_catalog_name', table_name='recipes')
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.drop_column('seed_version')
+    with op.batch_alter_table('recipes') as batch_op:
+        batch_op.drop_column('content_hash')
+    # Rebuilding the recipes table on SQLite drops its FTS sync triggers
+    create_fts_tables(op.get_bind(), LEGACY_FTS_TABLES, LEGACY_PG_DOCUMENTS)
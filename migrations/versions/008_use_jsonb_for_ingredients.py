@@ -0,0 +1,46 @@
+"""use jsonb for recipe ingredients
+
+Revision ID: 008_use_jsonb_for_ingredients
+Revises: 007_add_seed_versions
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '008_use_jsonb_for_ingredients'
+down_revision = '007_add_seed_versions'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """
+    Store recipe ingredients as JSONB on PostgreSQL. SQLite has a single
+    JSON storage format, so there is nothing to change there.
+    """
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.alter_column(
+        'recipes',
+        'ingredients',
+        existing_type=sa.JSON(),
+        type_=postgresql.JSONB(),
+        existing_nullable=True,
+        postgresql_using='ingredients::jsonb',
+    )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.alter_column(
+        'recipes',
+        'ingredients',
+        existing_type=postgresql.JSONB(),
+        type_=sa.JSON(),
+        existing_nullable=True,
+        postgresql_using='ingredients::json',
+    )
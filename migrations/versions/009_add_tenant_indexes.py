@@ -0,0 +1,42 @@
+"""add tenant indexes
+
+Revision ID: 009_add_tenant_indexes
+Revises: 008_use_jsonb_for_ingredients
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '009_add_tenant_indexes'
+down_revision = '008_use_jsonb_for_ingredients'
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ('ix_bottles_user_id_id', 'bottles', ['user_id', 'id']),
+    ('ix_bottles_user_id_name', 'bottles', ['user_id', 'name', 'id']),
+    ('ix_bottles_spirit_type_id', 'bottles', ['spirit_type_id']),
+    ('ix_recipes_user_id_id', 'recipes', ['user_id', 'id']),
+    ('ix_recipes_user_id_name', 'recipes', ['user_id', 'name']),
+    ('ix_spirit_types_user_id_id', 'spirit_types', ['user_id', 'id']),
+    ('ix_spirit_types_user_id_name', 'spirit_types', ['user_id', 'name']),
+    ('ix_recipes_to_spirits_recipe_id', 'recipes_to_spirits', ['recipe_id', 'spirit_type_id']),
+    ('ix_hidden_catalog_recipes_recipe_id', 'hidden_catalog_recipes', ['recipe_id']),
+]
+
+
+def upgrade() -> None:
+    """
+    Index the owner column together with the ID and name every service query
+    filters or orders on, bottles by spirit type for the spirit type delete
+    check, and the recipe/spirit type links and hidden catalog recipes by
+    recipe, which recipe deletes look up to check foreign keys.
+    """
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns)
+
+
+def downgrade() -> None:
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,109 @@
+"""normalize spirit type names
+
+Revision ID: 010_normalize_spirit_type_names
+Revises: 009_add_tenant_indexes
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.db.models.spirit_type import normalize_spirit_type_name
+
+# revision identifiers, used by Alembic.
+revision = '010_normalize_spirit_type_names'
+down_revision = '009_add_tenant_indexes'
+branch_labels = None
+depends_on = None
+
+spirit_types = sa.table(
+    'spirit_types',
+    sa.column('id', sa.Integer),
+    sa.column('name', sa.String),
+    sa.column('normalized_name', sa.String),
+    sa.column('user_id', sa.Integer),
+)
+bottles = sa.table('bottles', sa.column('spirit_type_id', sa.Integer))
+recipes_to_spirits = sa.table(
+    'recipes_to_spirits', sa.column('recipe_id', sa.Integer), sa.column('spirit_type_id', sa.Integer)
+)
+name_trigrams = sa.table('name_trigrams', sa.column('entity', sa.String), sa.column('entity_id', sa.Integer))
+users = sa.table(
+    'users',
+    sa.column('id', sa.Integer),
+    sa.column('bottles_version', sa.Integer),
+    sa.column('recipes_version', sa.Integer),
+    sa.column('spirit_types_version', sa.Integer),
+)
+
+
+def _merge(conn, duplicate_id: int, kept_id: int) -> None:
+    """Point everything at kept_id and delete the duplicate spirit type"""
+    conn.execute(bottles.update().where(bottles.c.spirit_type_id == duplicate_id).values(spirit_type_id=kept_id))
+    linked = sa.select(recipes_to_spirits.c.recipe_id).where(recipes_to_spirits.c.spirit_type_id == kept_id)
+    conn.execute(
+        recipes_to_spirits.update()
+        .where(recipes_to_spirits.c.spirit_type_id == duplicate_id, recipes_to_spirits.c.recipe_id.notin_(linked))
+        .values(spirit_type_id=kept_id)
+    )
+    conn.execute(recipes_to_spirits.delete().where(recipes_to_spirits.c.spirit_type_id == duplicate_id))
+    conn.execute(
+        name_trigrams.delete().where(name_trigrams.c.entity == 'spirit_type', name_trigrams.c.entity_id == duplicate_id)
+    )
+    conn.execute(spirit_types.delete().where(spirit_types.c.id == duplicate_id))
+
+
+def upgrade() -> None:
+    """
+    Store each spirit type's name casefolded with whitespace collapsed and make
+    it unique per user. A user's existing spirit types that differ only in
+    case or spacing are merged into the oldest one, which takes over their
+    bottles and recipes.
+    """
+    op.add_column('spirit_types', sa.Column('normalized_name', sa.String(), nullable=True))
+
+    conn = op.get_bind()
+    kept = {}
+    merged_user_ids = set()
+    rows = conn.execute(
+        sa.select(spirit_types.c.id, spirit_types.c.name, spirit_types.c.user_id).order_by(spirit_types.c.id)
+    ).all()
+    for spirit_type_id, name, user_id in rows:
+        normalized_name = normalize_spirit_type_name(name)
+        # Catalog spirit types have no owner and are not covered by the unique index
+        key = (user_id, normalized_name)
+        if user_id is not None and key in kept:
+            _merge(conn, spirit_type_id, kept[key])
+            merged_user_ids.add(user_id)
+            continue
+        kept[key] = spirit_type_id
+        conn.execute(
+            spirit_types.update().where(spirit_types.c.id == spirit_type_id).values(normalized_name=normalized_name)
+        )
+
+    if merged_user_ids:
+        # Merging changed these users' collections, so their ETags must change too
+        conn.execute(
+            users.update()
+            .where(users.c.id.in_(merged_user_ids))
+            .values(
+                bottles_version=users.c.bottles_version + 1,
+                recipes_version=users.c.recipes_version + 1,
+                spirit_types_version=users.c.spirit_types_version + 1,
+            )
+        )
+
+    with op.batch_alter_table('spirit_types') as batch_op:
+        batch_op.alter_column('normalized_name', existing_type=sa.String(), nullable=False)
+    op.create_index(
+        'ux_spirit_types_user_id_normalized_name', 'spirit_types', ['user_id', 'normalized_name'], unique=True
+    )
+
+
+def downgrade() -> None:
+    """
+    Drop the normalized names. Merged spirit types are not restored.
+    """
+    op.drop_index('ux_spirit_types_user_id_normalized_name', table_name='spirit_types')
+    with op.batch_alter_table('spirit_types') as batch_op:
+        batch_op.drop_column('normalized_name')
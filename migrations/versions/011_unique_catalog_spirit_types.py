@@ -0,0 +1,98 @@
+"""unique catalog spirit types
+
+Revision ID: 011_unique_catalog_spirit_types
+Revises: 010_normalize_spirit_type_names
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '011_unique_catalog_spirit_types'
+down_revision = '010_normalize_spirit_type_names'
+branch_labels = None
+depends_on = None
+
+spirit_types = sa.table(
+    'spirit_types',
+    sa.column('id', sa.Integer),
+    sa.column('normalized_name', sa.String),
+    sa.column('user_id', sa.Integer),
+    sa.column('catalog_spirit_type_id', sa.Integer),
+)
+bottles = sa.table('bottles', sa.column('spirit_type_id', sa.Integer))
+recipes_to_spirits = sa.table(
+    'recipes_to_spirits', sa.column('recipe_id', sa.Integer), sa.column('spirit_type_id', sa.Integer)
+)
+users = sa.table(
+    'users',
+    sa.column('recipes_version', sa.Integer),
+    sa.column('recipe_catalog', sa.Boolean),
+)
+
+
+def _merge(conn, duplicate_id: int, kept_id: int) -> None:
+    """Point everything at kept_id and delete the duplicate catalog spirit type"""
+    conn.execute(bottles.update().where(bottles.c.spirit_type_id == duplicate_id).values(spirit_type_id=kept_id))
+    linked = sa.select(recipes_to_spirits.c.recipe_id).where(recipes_to_spirits.c.spirit_type_id == kept_id)
+    conn.execute(
+        recipes_to_spirits.update()
+        .where(recipes_to_spirits.c.spirit_type_id == duplicate_id, recipes_to_spirits.c.recipe_id.notin_(linked))
+        .values(spirit_type_id=kept_id)
+    )
+    conn.execute(recipes_to_spirits.delete().where(recipes_to_spirits.c.spirit_type_id == duplicate_id))
+    conn.execute(
+        spirit_types.update()
+        .where(spirit_types.c.catalog_spirit_type_id == duplicate_id)
+        .values(catalog_spirit_type_id=kept_id)
+    )
+    conn.execute(spirit_types.delete().where(spirit_types.c.id == duplicate_id))
+
+
+def upgrade() -> None:
+    """
+    Make catalog spirit type names unique, ignoring case and spacing. The
+    per-user index does not cover them, since their user_id is NULL, so
+    concurrent catalog syncs could insert the same one twice. Duplicates are
+    merged into the oldest, which takes over their recipe links and the
+    users' spirit types standing in for them.
+    """
+    conn = op.get_bind()
+    kept = {}
+    rows = conn.execute(
+        sa.select(spirit_types.c.id, spirit_types.c.normalized_name)
+        .where(spirit_types.c.user_id.is_(None))
+        .order_by(spirit_types.c.id)
+    ).all()
+    merged = False
+    for spirit_type_id, normalized_name in rows:
+        if normalized_name in kept:
+            _merge(conn, spirit_type_id, kept[normalized_name])
+            merged = True
+        else:
+            kept[normalized_name] = spirit_type_id
+
+    if merged:
+        # Catalog recipes now link to other spirit types for everyone who has the catalog
+        conn.execute(
+            users.update()
+            .where(users.c.recipe_catalog.is_(True))
+            .values(recipes_version=users.c.recipes_version + 1)
+        )
+
+    op.create_index(
+        'ux_spirit_types_catalog_normalized_name',
+        'spirit_types',
+        ['normalized_name'],
+        unique=True,
+        sqlite_where=sa.text('user_id IS NULL'),
+        postgresql_where=sa.text('user_id IS NULL'),
+    )
+
+
+def downgrade() -> None:
+    """
+    Drop the catalog spirit type name index. Merged spirit types are not restored.
+    """
+    op.drop_index('ux_spirit_types_catalog_normalized_name', table_name='spirit_types')
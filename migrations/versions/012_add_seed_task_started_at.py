@@ -0,0 +1,33 @@
+"""add seed task started_at
+
+Revision ID: 012_add_seed_task_started_at
+Revises: 011_unique_catalog_spirit_types
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '012_add_seed_task_started_at'
+down_revision = '011_unique_catalog_spirit_types'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """
+    Record when a worker claimed a seed task, so a running task is only taken
+    over once its lease has expired. Tasks already running have no start time
+    and are treated as expired.
+    """
+    with op.batch_alter_table('seed_tasks') as batch_op:
+        batch_op.add_column(sa.Column('started_at', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    """
+    Drop the claim time.
+    """
+    with op.batch_alter_table('seed_tasks') as batch_op:
+        batch_op.drop_column('started_at')
@@ -0,0 +1,58 @@
+"""add seed versions table
+
+Revision ID: 013_add_seed_versions_table
+Revises: 012_add_seed_task_started_at
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '013_add_seed_versions_table'
+down_revision = '012_add_seed_task_started_at'
+branch_labels = None
+depends_on = None
+
+spirit_types = sa.table(
+    'spirit_types',
+    sa.column('normalized_name', sa.String),
+    sa.column('user_id', sa.Integer),
+)
+users = sa.table('users', sa.column('seed_version', sa.String))
+
+
+def upgrade() -> None:
+    """
+    Create the table recording the default spirit types of each seed version.
+    The versions users are at are recorded with the catalog's current spirit
+    types, which were synced from the seed file the running code last loaded;
+    the new seed file is only synced once the app starts after this migration.
+    """
+    seed_versions = op.create_table(
+        'seed_versions',
+        sa.Column('version', sa.String(), nullable=False),
+        sa.Column('spirit_types', sa.JSON(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint('version'),
+    )
+    conn = op.get_bind()
+    catalog_names = sorted(
+        name for (name,) in conn.execute(
+            sa.select(spirit_types.c.normalized_name).where(spirit_types.c.user_id.is_(None))
+        )
+    )
+    versions = [
+        version for (version,) in conn.execute(
+            sa.select(users.c.seed_version).distinct().where(users.c.seed_version.is_not(None))
+        )
+    ]
+    if versions:
+        op.bulk_insert(seed_versions, [{'version': version, 'spirit_types': catalog_names} for version in versions])
+
+
+def downgrade() -> None:
+    """
+    Drop the seed versions table.
+    """
+    op.drop_table('seed_versions')
@@ -0,0 +1,69 @@
+"""index recipe ingredient names
+
+Revision ID: 014_index_ingredient_names
+Revises: 013_add_seed_versions_table
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.db.fts import LEGACY_FTS_TABLES, LEGACY_PG_DOCUMENTS, create_fts_tables, drop_fts_tables
+
+# revision identifiers, used by Alembic.
+revision = '014_index_ingredient_names'
+down_revision = '013_add_seed_versions_table'
+branch_labels = None
+depends_on = None
+
+recipes = sa.table(
+    'recipes',
+    sa.column('id', sa.Integer),
+    sa.column('ingredients', sa.JSON),
+    sa.column('ingredient_names', sa.String),
+)
+
+
+def _join_ingredient_names(ingredients):
+    names = [
+        ingredient['name']
+        for ingredient in ingredients or []
+        if isinstance(ingredient, dict) and isinstance(ingredient.get('name'), str)
+    ]
+    return ', '.join(names) or None
+
+
+def upgrade() -> None:
+    """
+    Store each recipe's ingredient names in recipes.ingredient_names and
+    search recipes on those instead of the whole ingredients JSON, whose keys
+    and units matched every recipe.
+    """
+    op.add_column('recipes', sa.Column('ingredient_names', sa.String(), nullable=True))
+
+    conn = op.get_bind()
+    rows = conn.execute(sa.select(recipes.c.id, recipes.c.ingredients).where(recipes.c.ingredients.isnot(None))).all()
+    names = [
+        {'recipe_id': recipe_id, 'ingredient_names': _join_ingredient_names(ingredients)}
+        for recipe_id, ingredients in rows
+    ]
+    if names:
+        conn.execute(
+            recipes.update().where(recipes.c.id == sa.bindparam('recipe_id')),
+            names,
+        )
+
+    # Recreated rather than altered: the FTS5 columns and the tsvector expression change
+    drop_fts_tables(conn)
+    create_fts_tables(conn)
+
+
+def downgrade() -> None:
+    """
+    Go back to searching the whole ingredients JSON and drop the names.
+    """
+    conn = op.get_bind()
+    drop_fts_tables(conn)
+    with op.batch_alter_table('recipes') as batch_op:
+        batch_op.drop_column('ingredient_names')
+    create_fts_tables(conn, LEGACY_FTS_TABLES, LEGACY_PG_DOCUMENTS)
@@ -0,0 +1,54 @@
+"""
+Shared setup for the API tests: the app runs in-process against a throwaway
+SQLite database, migrated on startup, with cheap bcrypt in the threadpool.
+The environment is set before anything imports the app's settings.
+"""
+import os
+import tempfile
+
+os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/tests.db"
+os.environ.setdefault("SECRET_KEY", "test")
+os.environ.setdefault("H_ALGORITHM", "HS256")
+os.environ.setdefault("OLLAMA_HOST", "http://localhost:11434")
+os.environ.setdefault("OLLAMA_MODEL", "test")
+os.environ.setdefault("PASSWORD_HASH_WORKERS", "0")
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+os.environ["DB_MIGRATE_ON_STARTUP"] = "true"
+os.environ["RESPONSE_CACHE_ENABLED"] = "false"
+
+from typing import Callable, Dict
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.seed_tasks import SeedTaskService
+
+PASSWORD = "password123"
+
+
+@pytest.fixture(scope="module")
+def client():
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture(scope="module")
+def register(client) -> Callable[[str], Dict[str, str]]:
+    """
+    Register a user, wait for their default data to be seeded and return
+    the Authorization header to send as them
+    """
+
+    def register(username: str) -> Dict[str, str]:
+        response = client.post(
+            "/auth/register", json={"username": username, "email": f"{username}@example.com", "password": PASSWORD}
+        )
+        assert response.status_code == 200, response.text
+        token = client.post(
+            "/auth/login", json={"username_or_email": username, "password": PASSWORD}
+        ).json()["access_token"]
+        SeedTaskService._queue.join()
+        return {"Authorization": f"Bearer {token}"}
+
+    return register
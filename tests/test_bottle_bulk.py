@@ -0,0 +1,26 @@
+"""
+POST /bottles/bulk: an invalid item gets a failed result of its own while
+the rest of the batch is still written.
+"""
+
+
+def test_bulk_create_with_one_bad_item(client, register):
+    headers = register("bulk")
+    spirit_type_id = client.get("/spirit_types", headers=headers).json()[0]["id"]
+
+    response = client.post("/bottles/bulk", headers=headers, json={
+        "create": [
+            {"name": "Good One", "spirit_type_id": spirit_type_id},
+            {"name": "Bad One", "spirit_type_id": 999999},
+            {"name": "Good Two", "spirit_type_id": spirit_type_id},
+        ],
+    })
+
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert (body["created"], body["failed"]) == (2, 1)
+    assert [result["success"] for result in body["results"]] == [True, False, True]
+    assert body["results"][1]["index"] == 1
+    assert "999999" in body["results"][1]["error"]
+    names = sorted(bottle["name"] for bottle in client.get("/bottles", headers=headers).json())
+    assert names == ["Good One", "Good Two"]
@@ -0,0 +1,42 @@
+"""
+Keyset pagination of GET /bottles: following X-Next-Cursor visits every
+bottle once in list order, and a cursor the API did not issue is a 400.
+"""
+import pytest
+
+
+@pytest.fixture(scope="module")
+def headers(client, register):
+    headers = register("pager")
+    spirit_type_id = client.get("/spirit_types", headers=headers).json()[0]["id"]
+    for name in ["Eagle Rare", "Blanton's", "Weller", "Buffalo Trace", "Stagg"]:
+        response = client.post("/bottles", headers=headers, json={"name": name, "spirit_type_id": spirit_type_id})
+        assert response.status_code == 200, response.text
+    return headers
+
+
+def test_cursor_round_trip(client, headers):
+    everything = [bottle["id"] for bottle in client.get("/bottles", headers=headers).json()]
+
+    paged = []
+    params = {"limit": 2}
+    while True:
+        response = client.get("/bottles", headers=headers, params=params)
+        assert response.status_code == 200
+        page = response.json()
+        assert len(page) <= 2
+        paged.extend(bottle["id"] for bottle in page)
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+        params = {"limit": 2, "cursor": cursor}
+
+    assert paged == everything
+    assert len(paged) == 5
+
+
+@pytest.mark.parametrize("cursor", ["garbage", "WyJvbmx5IG9uZSJd"])
+def test_bad_cursor(client, headers, cursor):
+    response = client.get("/bottles", headers=headers, params={"limit": 2, "cursor": cursor})
+
+    assert response.status_code == 400
@@ -0,0 +1,27 @@
+"""
+Conditional GET of the list endpoints: a matching If-None-Match is answered
+with 304 until the collection changes, after which the fresh list comes back
+under a new ETag.
+"""
+
+
+def test_not_modified_until_written(client, register):
+    headers = register("etags")
+    spirit_type_id = client.get("/spirit_types", headers=headers).json()[0]["id"]
+    client.post("/bottles", headers=headers, json={"name": "Eagle Rare", "spirit_type_id": spirit_type_id})
+
+    first = client.get("/bottles", headers=headers)
+    etag = first.headers["ETag"]
+    conditional = {**headers, "If-None-Match": etag}
+
+    not_modified = client.get("/bottles", headers=conditional)
+    assert not_modified.status_code == 304
+    assert not_modified.headers["ETag"] == etag
+    assert not_modified.content == b""
+
+    client.post("/bottles", headers=headers, json={"name": "Weller", "spirit_type_id": spirit_type_id})
+
+    fresh = client.get("/bottles", headers=conditional)
+    assert fresh.status_code == 200
+    assert fresh.headers["ETag"] != etag
+    assert sorted(bottle["name"] for bottle in fresh.json()) == ["Eagle Rare", "Weller"]
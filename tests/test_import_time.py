@@ -0,0 +1,10 @@
+"""
+Import-time budget: importing the app must stay under benchmarks.import_time's
+budget, leave the lazily loaded modules alone and not touch the database.
+"""
+from benchmarks.import_time import BUDGET_MS, measure
+
+
+def test_import_time_budget():
+    total_ms, _, failures = measure(runs=3, budget_ms=BUDGET_MS)
+    assert not failures, f"import app.main: median {total_ms:.0f} ms; " + "; ".join(failures)
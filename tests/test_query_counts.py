@@ -0,0 +1,81 @@
+"""
+Regression test for N+1 queries in the list endpoints: GET /bottles and
+GET /recipes must run a fixed number of statements however many rows they
+return. Runs the app in-process against the throwaway SQLite database set
+up in conftest.py, with 1,000 bottles and 1,000 recipes.
+"""
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event, insert
+
+from app.db.models.bottle import Bottle
+from app.db.models.recipe import Recipe
+from app.db.models.shared_table import recipes_to_spirits
+from app.db.session import SessionLocal, async_engine, engine
+from app.main import app
+from app.services.seed_tasks import SeedTaskService
+
+ROWS = 1000
+PASSWORD = "password123"
+
+
+@pytest.fixture(scope="module")
+def client():
+    with TestClient(app) as client:
+        user_id = client.post(
+            "/auth/register", json={"username": "counter", "email": "counter@example.com", "password": PASSWORD}
+        ).json()["id"]
+        token = client.post(
+            "/auth/login", json={"username_or_email": "counter", "password": PASSWORD}
+        ).json()["access_token"]
+        client.headers["Authorization"] = f"Bearer {token}"
+        SeedTaskService._queue.join()
+
+        spirit_type_ids = [spirit_type["id"] for spirit_type in client.get("/spirit_types").json()]
+        db = SessionLocal()
+        try:
+            db.execute(insert(Bottle), [
+                {"name": f"Bottle {i:04d}", "spirit_type_id": spirit_type_ids[i % len(spirit_type_ids)], "user_id": user_id}
+                for i in range(ROWS)
+            ])
+            recipe_ids = db.execute(
+                insert(Recipe).returning(Recipe.id, sort_by_parameter_order=True),
+                [{"name": f"Recipe {i:04d}", "instructions": "Stir.", "ingredients": [], "user_id": user_id} for i in range(ROWS)],
+            ).scalars().all()
+            db.execute(insert(recipes_to_spirits), [
+                {"recipe_id": recipe_id, "spirit_type_id": spirit_type_ids[(i + offset) % len(spirit_type_ids)]}
+                for i, recipe_id in enumerate(recipe_ids)
+                for offset in (0, 1)
+            ])
+            db.commit()
+        finally:
+            db.close()
+        yield client
+
+
+@pytest.fixture
+def statements():
+    """Statements run on the app's engines while the test runs"""
+    executed = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    engines = [engine] + ([async_engine.sync_engine] if async_engine is not None else [])
+    for instrumented in engines:
+        event.listen(instrumented, "before_cursor_execute", record)
+    yield executed
+    for instrumented in engines:
+        event.remove(instrumented, "before_cursor_execute", record)
+
+
+@pytest.mark.parametrize("path, rows, queries", [("/bottles", ROWS, 2), ("/recipes", ROWS, 5)])
+def test_list_query_count(client, statements, path, rows, queries):
+    client.get(path)  # Warm the user cache, so only the endpoint's own statements are counted
+    statements.clear()
+
+    response = client.get(path)
+
+    assert response.status_code == 200
+    assert len(response.json()) >= rows
+    assert len(statements) == queries, "\n".join(statements)
@@ -0,0 +1,36 @@
+"""
+GET /recipes/available: recipes are ranked by how many of their spirit types
+the user has no bottle of, and the ranking follows bottle writes.
+"""
+
+
+def test_available_recipes_follow_bottles(client, register):
+    headers = register("mixer")
+    recipes = client.get("/recipes", headers=headers).json()
+    target = next(recipe for recipe in recipes if recipe["spirit_types"])
+    owned = {spirit_type["id"] for spirit_type in target["spirit_types"]}
+    bottle_ids = [
+        client.post("/bottles", headers=headers, json={"name": f"Bottle {spirit_type_id}", "spirit_type_id": spirit_type_id}).json()["id"]
+        for spirit_type_id in owned
+    ]
+
+    makeable = client.get("/recipes/available", headers=headers).json()
+    assert all(result["missing_count"] == 0 for result in makeable)
+    assert {result["recipe"]["id"] for result in makeable if result["recipe"]["spirit_types"]} == {
+        recipe["id"] for recipe in recipes
+        if recipe["spirit_types"] and {spirit_type["id"] for spirit_type in recipe["spirit_types"]} <= owned
+    }
+    assert target["id"] in {result["recipe"]["id"] for result in makeable}
+
+    nearly = client.get("/recipes/available", headers=headers, params={"max_missing": 1}).json()
+    missing_counts = [result["missing_count"] for result in nearly]
+    assert missing_counts == sorted(missing_counts)
+    assert set(missing_counts) <= {0, 1}
+    for result in nearly:
+        missing = {spirit_type["id"] for spirit_type in result["missing_spirit_types"]}
+        assert len(missing) == result["missing_count"]
+        assert not missing & owned
+
+    client.delete(f"/bottles/{bottle_ids[0]}", headers=headers)
+    after_delete = client.get("/recipes/available", headers=headers).json()
+    assert target["id"] not in {result["recipe"]["id"] for result in after_delete}
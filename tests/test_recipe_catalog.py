@@ -0,0 +1,35 @@
+"""
+Copy-on-write of the shared recipe catalog: a user's first edit of a catalog
+recipe creates their own copy and hides the original from them only.
+"""
+
+
+def test_first_edit_copies_catalog_recipe(client, register):
+    editor = register("catalog_editor")
+    bystander = register("catalog_bystander")
+    original = client.get("/recipes", headers=editor).json()[0]
+
+    response = client.put(f"/recipes/{original['id']}", headers=editor, json={"name": "My " + original["name"]})
+
+    assert response.status_code == 200, response.text
+    copy = response.json()
+    assert copy["id"] != original["id"]
+    assert copy["name"] == "My " + original["name"]
+    assert copy["instructions"] == original["instructions"]
+    assert copy["ingredients"] == original["ingredients"]
+    assert copy["spirit_types"] == original["spirit_types"]
+
+    recipes = {recipe["id"]: recipe for recipe in client.get("/recipes", headers=editor).json()}
+    assert original["id"] not in recipes
+    assert recipes[copy["id"]]["name"] == copy["name"]
+    # The catalog recipe's ID keeps leading to the copy
+    assert client.get(f"/recipes/{original['id']}", headers=editor).json()["id"] == copy["id"]
+
+    # Further edits change the copy instead of making another one
+    again = client.put(f"/recipes/{copy['id']}", headers=editor, json={"instructions": "Stir."}).json()
+    assert again["id"] == copy["id"]
+
+    others = {recipe["id"]: recipe for recipe in client.get("/recipes", headers=bystander).json()}
+    assert others[original["id"]]["name"] == original["name"]
+    assert others[original["id"]]["instructions"] == original["instructions"]
+    assert copy["id"] not in others
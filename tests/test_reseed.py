@@ -0,0 +1,45 @@
+"""
+Incremental reseeding: a user at an older seed version gets the default
+spirit types added since that version, but not defaults they deleted, and
+running the job again changes nothing.
+"""
+from app.db.models.seed_version import SeedVersion
+from app.db.models.spirit_type import normalize_spirit_type_name
+from app.db.models.user import User
+from app.db.session import SessionLocal
+from app.services.reseed import ReseedService
+from app.services.seed_service import SeedService
+
+
+def test_reseed_adds_new_defaults_only(client, register):
+    headers = register("outdated")
+    spirit_types = client.get("/spirit_types", headers=headers).json()
+    added, deleted = spirit_types[0], spirit_types[1]
+    for spirit_type in (added, deleted):
+        assert client.delete(f"/spirit_types/{spirit_type['id']}", headers=headers).status_code == 200
+
+    db = SessionLocal()
+    try:
+        # An older seed version that did not have the first default yet
+        db.add(SeedVersion(
+            version="older",
+            spirit_types=[
+                normalize_spirit_type_name(spirit_type["name"])
+                for spirit_type in spirit_types
+                if spirit_type is not added
+            ],
+        ))
+        db.query(User).filter(User.username == "outdated").update({User.seed_version: "older"})
+        db.commit()
+
+        totals = ReseedService.run(db)
+        assert totals["users"] >= 1
+        assert db.query(User.seed_version).filter(User.username == "outdated").scalar() == SeedService.seed_version()
+        assert ReseedService.run(db)["users"] == 0
+    finally:
+        db.close()
+
+    names = {spirit_type["name"] for spirit_type in client.get("/spirit_types", headers=headers).json()}
+    assert added["name"] in names
+    assert deleted["name"] not in names
+    assert names == {spirit_type["name"] for spirit_type in spirit_types} - {deleted["name"]}
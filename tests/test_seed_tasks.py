@@ -0,0 +1,55 @@
+"""
+Background seed tasks: a task is claimed by one run only, even when another
+run of it starts while the first is still seeding.
+"""
+import threading
+
+from app.db.models.seed_task import SeedTask
+from app.db.models.user import User
+from app.db.session import SessionLocal
+from app.services.seed_service import SeedService
+from app.services.seed_tasks import DONE, PENDING, RUNNING, SeedTaskService
+
+
+def test_seed_task_claimed_once(client, register, monkeypatch):
+    headers = register("claimed")
+    assert client.get("/seed/status", headers=headers).json()["status"] == DONE
+
+    db = SessionLocal()
+    try:
+        user_id = db.query(User.id).filter(User.username == "claimed").scalar()
+        db.query(SeedTask).filter(SeedTask.user_id == user_id).update({SeedTask.status: PENDING, SeedTask.attempts: 0})
+        db.commit()
+    finally:
+        db.close()
+
+    seeding = threading.Event()
+    release = threading.Event()
+    seeded = []
+    seed_user_data = SeedService.seed_user_data
+
+    def slow_seed_user_data(db, user_id):
+        seeded.append(user_id)
+        seeding.set()
+        release.wait(10)
+        return seed_user_data(db, user_id)
+
+    monkeypatch.setattr(SeedService, "seed_user_data", staticmethod(slow_seed_user_data))
+    results = {}
+    first = threading.Thread(target=lambda: results.update(first=SeedTaskService.run(user_id)))
+    first.start()
+    assert seeding.wait(10)
+
+    # A second queue entry or process finds the task already claimed
+    assert SeedTaskService.run(user_id) == RUNNING
+    release.set()
+    first.join(10)
+
+    assert results["first"] == DONE
+    assert SeedTaskService.run(user_id) == DONE
+    assert seeded == [user_id]
+    db = SessionLocal()
+    try:
+        assert SeedTaskService.get_task(db, user_id).attempts == 1
+    finally:
+        db.close()
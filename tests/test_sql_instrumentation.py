@@ -0,0 +1,40 @@
+"""
+Strict SQL instrumentation: with SQL_STRICT_MAX_REPEATS set, a request that
+runs the same statement more often than that fails with a 500 naming it.
+"""
+import pytest
+from fastapi import Depends
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core.settings import settings
+from app.db.session import get_db
+from app.main import app
+
+REPEATED_STATEMENT = "SELECT 1 AS repeated"
+
+
+@pytest.fixture(scope="module")
+def repeat_path(client):
+    """A throwaway endpoint that runs REPEATED_STATEMENT ?times times"""
+
+    def repeat(times: int, db: Session = Depends(get_db)):
+        for _ in range(times):
+            db.execute(text(REPEATED_STATEMENT))
+        return {"times": times}
+
+    app.add_api_route("/test/repeat", repeat)
+    route = app.router.routes[-1]
+    yield "/test/repeat"
+    app.router.routes.remove(route)
+
+
+@pytest.mark.parametrize("max_repeats, times, status_code", [(0, 5, 200), (3, 3, 200), (3, 4, 500)])
+def test_strict_max_repeats(client, repeat_path, monkeypatch, max_repeats, times, status_code):
+    monkeypatch.setattr(settings, "SQL_STRICT_MAX_REPEATS", max_repeats)
+
+    response = client.get(repeat_path, params={"times": times})
+
+    assert response.status_code == status_code, response.text
+    if status_code == 500:
+        assert REPEATED_STATEMENT in response.json()["detail"]
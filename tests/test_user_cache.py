@@ -0,0 +1,30 @@
+"""
+Cache of authenticated users: repeat requests are authenticated without
+loading the user, and a committed change to the user applies to the very
+next request instead of once the entry expires.
+"""
+from app.db.models.user import User
+from app.db.session import SessionLocal
+from app.services.user_cache import UserCacheService
+
+
+def test_user_cache_hit_and_invalidation(client, register):
+    headers = register("cached")
+    client.get("/bottles", headers=headers)
+    assert UserCacheService.get("cached") is not None
+
+    before = UserCacheService.stats()
+    assert client.get("/cache/stats", headers=headers).status_code == 403
+    after = UserCacheService.stats()
+    assert after["misses"] == before["misses"]
+    assert after["hits"] > before["hits"]
+
+    db = SessionLocal()
+    try:
+        db.query(User).filter(User.username == "cached").one().is_admin = True
+        db.commit()
+    finally:
+        db.close()
+
+    assert UserCacheService.get("cached") is None
+    assert client.get("/cache/stats", headers=headers).status_code == 200